@@ -0,0 +1,42 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+import os
+import time
+
+from conda_build.utils import _EnvRewriter
+
+PREFIX = "/opt/conda-bld/pkg_1700000000000/_h_env_placehold_placehold_placehold"
+SRC_DIR = "/opt/conda-bld/pkg_1700000000000/work"
+# a few lines of typical (verbose) compiler output
+OUTPUT = (
+    f"[ 42%] Building CXX object src/CMakeFiles/lib.dir/module.cpp.o\n"
+    f"/usr/bin/c++ -I{SRC_DIR}/include -isystem {PREFIX}/include -O2 -fPIC "
+    f"-o src/CMakeFiles/lib.dir/module.cpp.o -c {SRC_DIR}/src/module.cpp\n"
+    f"/usr/bin/c++ -shared -o {PREFIX}/lib/libmodule.so -Wl,-rpath,{PREFIX}/lib\n"
+).encode() * 20_000
+CHUNK_SIZE = 1 << 16
+
+
+def _rewrite(env):
+    rewriter = _EnvRewriter(env)
+    for i in range(0, len(OUTPUT), CHUNK_SIZE):
+        rewriter.feed(OUTPUT[i : i + CHUNK_SIZE])
+    rewriter.flush()
+
+
+def time_rewrite_stdout():
+    _rewrite({"PREFIX": PREFIX, "SRC_DIR": SRC_DIR})
+
+
+def time_rewrite_stdout_full_env():
+    _rewrite({**os.environ, "PREFIX": PREFIX, "SRC_DIR": SRC_DIR})
+
+
+def track_rewrite_stdout_throughput():
+    env = {**os.environ, "PREFIX": PREFIX, "SRC_DIR": SRC_DIR}
+    start = time.perf_counter()
+    _rewrite(env)
+    return len(OUTPUT) / (time.perf_counter() - start) / 1e6
+
+
+track_rewrite_stdout_throughput.unit = "MB/s"
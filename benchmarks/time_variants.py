@@ -0,0 +1,70 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+from conda_build.variants import explode_variants, iter_explode_variants
+
+# roughly the shape of conda-forge's pinning: most keys have a single value, the
+#    multi-valued ones are either zipped together or vary independently
+PIN_SPEC = {f"lib{i}": [f"{i}.0"] for i in range(250)}
+PIN_SPEC.update(
+    {
+        "python": [
+            "3.9.* *_cpython",
+            "3.10.* *_cpython",
+            "3.11.* *_cpython",
+            "3.12.* *_cpython",
+            "3.13.* *_cp313",
+        ],
+        "python_impl": ["cpython"] * 5,
+        "numpy": ["2.0", "2.0", "2.0", "2.0", "2.1"],
+        "cuda_compiler": ["None", "nvcc", "cuda-nvcc"],
+        "cuda_compiler_version": ["None", "11.8", "12.6"],
+        "cudnn": ["undefined", "8", "9"],
+        "c_compiler_version": ["13", "13", "13"],
+        "cxx_compiler_version": ["13", "13", "13"],
+        "zip_keys": [
+            ["python", "python_impl", "numpy"],
+            [
+                "cuda_compiler",
+                "cuda_compiler_version",
+                "cudnn",
+                "c_compiler_version",
+                "cxx_compiler_version",
+            ],
+        ],
+    }
+)
+# independently varying keys, of which a recipe typically uses one or two
+PIN_SPEC.update(
+    {
+        name: ["1", "2"]
+        for name in (
+            "boost",
+            "hdf5",
+            "libabseil",
+            "libprotobuf",
+            "openssl",
+            "libgrpc",
+            "fmt",
+            "icu",
+        )
+    }
+)
+
+USED_KEYS = {"python", "openssl", "target_platform"}
+
+
+def time_explode_all_keys():
+    explode_variants(PIN_SPEC)
+
+
+def time_explode_used_keys():
+    list(iter_explode_variants(PIN_SPEC, used_keys=USED_KEYS))
+
+
+def peakmem_explode_all_keys():
+    explode_variants(PIN_SPEC)
+
+
+def peakmem_iterate_used_keys():
+    for _ in iter_explode_variants(PIN_SPEC, used_keys=USED_KEYS):
+        pass
@@ -35,6 +35,7 @@ from .utils import (
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from typing import Any, Literal
 
     StatsDict = dict[str, Any]
@@ -74,6 +75,36 @@ def render(
     )
 
 
+def render_many(
+    recipe_paths: Iterable[str | os.PathLike | Path],
+    config: Config | None = None,
+    variants: dict[str, Any] | None = None,
+    workers: int | None = None,
+    permit_unsatisfiable_variants: bool = True,
+    finalize: bool = True,
+    bypass_env_check: bool = False,
+    **kwargs,
+) -> Iterator[tuple[str | os.PathLike | Path, list[MetaDataTuple] | BaseException]]:
+    """Render many recipes concurrently, sharing variant config files and the build index.
+
+    Yields ``(recipe_path, result)`` tuples as each recipe finishes rendering. ``result``
+    is the list of ``MetaDataTuple`` that :func:`render` would return for that recipe, or
+    the exception that was raised while rendering it."""
+    from .render import render_recipes
+
+    config = get_or_merge_config(config, **kwargs)
+
+    yield from render_recipes(
+        recipe_paths,
+        config=config,
+        variants=variants,
+        workers=workers,
+        permit_unsatisfiable_variants=permit_unsatisfiable_variants,
+        finalize=finalize,
+        bypass_env_check=bypass_env_check,
+    )
+
+
 def output_yaml(
     metadata: MetaData,
     file_path: str | os.PathLike | Path | None = None,
@@ -222,18 +253,50 @@ def build(
 
 
 def test(
-    recipedir_or_package_or_metadata: str | os.PathLike | Path | MetaData,
+    recipedir_or_package_or_metadata: str
+    | os.PathLike
+    | Path
+    | MetaData
+    | Iterable[str | os.PathLike | Path],
     move_broken: bool = True,
     config: Config | None = None,
     stats: StatsDict | None = None,
+    jobs: int | None = None,
+    results_file: str | os.PathLike | Path | None = None,
     **kwargs,
 ) -> bool:
     """Run tests on either packages (.tar.bz2 or extracted) or recipe folders
 
     For a recipe folder, it renders the recipe enough to know what package to download, and obtains
-    it from your currently configured channels."""
+    it from your currently configured channels.
+
+    A list of package files is tested concurrently by up to ``jobs`` processes (see
+    :func:`test_many`), returning True only if all of them pass.  The result of each
+    package is appended to ``results_file`` as a JSON line."""
     from conda_build.build import test
 
+    if not isinstance(
+        recipedir_or_package_or_metadata, (str, os.PathLike, MetaData)
+    ) and not hasattr(recipedir_or_package_or_metadata, "config"):
+        import json
+        from contextlib import nullcontext
+
+        passed = True
+        with open(results_file, "a") if results_file else nullcontext() as results:
+            for result in test_many(
+                recipedir_or_package_or_metadata,
+                move_broken=move_broken,
+                config=config,
+                stats=stats,
+                jobs=jobs,
+                **kwargs,
+            ):
+                passed = passed and result["passed"]
+                if results:
+                    results.write(json.dumps(result, default=str) + "\n")
+                    results.flush()
+        return passed
+
     if hasattr(recipedir_or_package_or_metadata, "config"):
         config = recipedir_or_package_or_metadata.config
     else:
@@ -256,6 +319,31 @@ def test(
         )
 
 
+def test_many(
+    packages: Iterable[str | os.PathLike | Path],
+    move_broken: bool = True,
+    config: Config | None = None,
+    stats: StatsDict | None = None,
+    jobs: int | None = None,
+    **kwargs,
+) -> Iterator[dict[str, Any]]:
+    """Test many package files concurrently, each in its own process, croot and test prefix.
+
+    Yields a result record per package as each test finishes: ``package``, ``passed``,
+    ``error`` (the failure message or None), ``duration`` (in seconds) and ``stats``.
+    The per-package stats are also merged into ``stats``."""
+    from .build import test_packages
+
+    config = get_or_merge_config(config, **kwargs)
+
+    for result in test_packages(
+        packages, config=config, move_broken=move_broken, jobs=jobs
+    ):
+        if stats is not None:
+            stats.update(result["stats"])
+        yield result
+
+
 def list_skeletons() -> list[str]:
     """List available skeletons for generating conda recipes from external sources.
 
@@ -346,7 +434,7 @@ def develop(
 
 
 def convert(
-    package_file: str,
+    package_file: str | Iterable[str],
     output_dir: str = ".",
     show_imports: bool = False,
     platforms: str | Iterable[str] | None = None,
@@ -355,31 +443,37 @@ def convert(
     verbose: bool = False,
     quiet: bool = True,
     dry_run: bool = False,
+    jobs: int | None = None,
 ) -> None:
     """Convert changes a package from one platform to another.  It applies only to things that are
-    portable, such as pure python, or header-only C/C++ libraries."""
+    portable, such as pure python, or header-only C/C++ libraries.
+
+    Several packages can be converted at once; each is extracted only once and up to
+    ``jobs`` conversions run concurrently."""
     from .convert import conda_convert
 
+    package_files = ensure_list(package_file)
     platforms = ensure_list(platforms)
     dependencies = ensure_list(dependencies)
-    if package_file.endswith("tar.bz2"):
-        return conda_convert(
-            package_file,
-            output_dir=output_dir,
-            show_imports=show_imports,
-            platforms=platforms,
-            force=force,
-            verbose=verbose,
-            quiet=quiet,
-            dry_run=dry_run,
-            dependencies=dependencies,
-        )
-    elif package_file.endswith(".whl"):
-        raise RuntimeError(
-            "Conversion from wheel packages is not implemented yet, stay tuned."
-        )
-    else:
-        raise RuntimeError(f"cannot convert: {package_file}")
+    for package_file in package_files:
+        if package_file.endswith(".whl"):
+            raise RuntimeError(
+                "Conversion from wheel packages is not implemented yet, stay tuned."
+            )
+        elif not package_file.endswith((".tar.bz2", ".conda")):
+            raise RuntimeError(f"cannot convert: {package_file}")
+    return conda_convert(
+        package_files,
+        output_dir=output_dir,
+        show_imports=show_imports,
+        platforms=platforms,
+        force=force,
+        verbose=verbose,
+        quiet=quiet,
+        dry_run=dry_run,
+        dependencies=dependencies,
+        jobs=jobs,
+    )
 
 
 def test_installable(channel: str = "defaults") -> bool:
@@ -19,6 +19,7 @@ import sys
 import time
 import warnings
 from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from os.path import dirname, isdir, isfile, islink, join
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -57,6 +58,7 @@ from .post import (
     post_build,
     post_process,
 )
+from .profiling import phase, timed, timer
 from .render import (
     add_upstream_pins,
     bldpkg_path,
@@ -90,7 +92,7 @@ if on_win:
     from . import windows
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Iterator
     from typing import Any
 
 if "bsd" in sys.platform:
@@ -995,10 +997,8 @@ def get_all_replacements(variant):
     return repl
 
 
+@timed("prefix_detection")
 def get_files_with_prefix(m, replacements, files_in, prefix):
-    import time
-
-    start = time.time()
     # It is nonsensical to replace anything in a symlink.
     files = sorted(f for f in files_in if not os.path.islink(os.path.join(prefix, f)))
     ignore_files = m.ignore_prefix_files()
@@ -1080,10 +1080,8 @@ def get_files_with_prefix(m, replacements, files_in, prefix):
     all_matches = {}
 
     # variant = m.config.variant if 'replacements' in m.config.variant else m.config.variants
-    replacement_tags = ""
-    if len(replacements):
-        last = len(replacements) - 1
-        for index, replacement in enumerate(replacements):
+    with phase("prefix_replacements", package=m.name()):
+        for replacement in replacements:
             all_matches = have_regex_files(
                 files=[
                     file
@@ -1101,26 +1099,7 @@ def get_files_with_prefix(m, replacements, files_in, prefix):
                 regex_rg=replacement["regex_rg"] if "regex_rg" in replacement else None,
                 debug=m.config.debug,
             )
-            replacement_tags = (
-                replacement_tags
-                + '"'
-                + replacement["tag"]
-                + ('"' if index == last else '", ')
-            )
-    perform_replacements(all_matches, prefix)
-    end = time.time()
-    total_replacements = sum(
-        map(lambda i: len(all_matches[i]["submatches"]), all_matches)
-    )
-    print(
-        "INFO :: Time taken to mark (prefix){}\n"
-        "        {} replacements in {} files was {:.2f} seconds".format(
-            f" and mark+peform ({replacement_tags})" if replacement_tags else "",
-            total_replacements,
-            len(all_matches),
-            end - start,
-        )
-    )
+        perform_replacements(all_matches, prefix)
     return sorted(files_with_prefix)
 
 
@@ -1535,6 +1514,7 @@ def _recurse_symlink_to_size(path, seen=None):
     return 0
 
 
+@timed("hash")
 def build_info_files_json_v1(m, prefix, files, files_with_prefix):
     no_link_files = m.get_value("build/no_link")
     files_json = []
@@ -1606,7 +1586,7 @@ def create_info_files_json_v1(m, info_dir, prefix, files, files_with_prefix):
     return checksums
 
 
-def post_process_files(m: MetaData, initial_prefix_files):
+def post_process_files(m: MetaData, initial_prefix_files, stats=None):
     package_name = m.name()
     host_prefix = m.config.host_prefix
     missing = []
@@ -1651,8 +1631,10 @@ def post_process_files(m: MetaData, initial_prefix_files):
     new_files = sorted(current_prefix_files - initial_prefix_files)
 
     # filter_files will remove .git, trash directories, and conda-meta directories
-    new_files = utils.filter_files(new_files, prefix=host_prefix)
-    post_build(m, new_files, build_python=python)
+    new_files = normalized = utils.filter_files(new_files, prefix=host_prefix)
+    changed = post_build(m, new_files, build_python=python)
+    if stats is not None:
+        stats[stats_key(m, f"post_build_{m.name()}")] = changed
 
     entry_point_script_names = get_entry_point_script_names(
         m.get_value("build/entry_points")
@@ -1673,14 +1655,18 @@ def post_process_files(m: MetaData, initial_prefix_files):
     elif m.python_version_independent:
         # For non noarch: python ones, we don't need to handle entry points in a special way.
         noarch_python.populate_files(m, pkg_files, host_prefix, [])
+    if m.python_version_independent:
+        # one of the above moved or rewrote files since fix_files normalized them
+        normalized = ()
 
     current_prefix_files = utils.prefix_files(prefix=host_prefix)
     new_files = current_prefix_files - initial_prefix_files
-    fix_permissions(new_files, host_prefix)
+    fix_permissions(new_files, host_prefix, normalized=normalized)
 
     return new_files
 
 
+@timed("bundle")
 def bundle_conda(
     output,
     metadata: MetaData,
@@ -1875,7 +1861,7 @@ def bundle_conda(
             log.warning(
                 "Glob %s from always_include_files does not match any files", pat
             )
-    files = post_process_files(metadata, initial_files)
+    files = post_process_files(metadata, initial_files, stats=stats)
 
     if output.get("name") and output.get("name") != "conda":
         assert "bin/conda" not in files and "Scripts/conda.exe" not in files, (
@@ -1916,19 +1902,25 @@ def bundle_conda(
             f"zstd:compression-level={metadata.config.zstd_compression_level}",
         )
     with TemporaryDirectory() as tmp:
-        conda_package_handling.api.create(
-            metadata.config.host_prefix,
-            files,
-            basename + ext,
-            out_folder=tmp,
-            **cph_kwargs,
-        )
+        with phase("compress", package=basename + ext):
+            conda_package_handling.api.create(
+                metadata.config.host_prefix,
+                files,
+                basename + ext,
+                out_folder=tmp,
+                **cph_kwargs,
+            )
         tmp_archives = [os.path.join(tmp, basename + ext)]
 
         # we're done building, perform some checks
         for tmp_path in tmp_archives:
-            if tmp_path.endswith(CondaPkgFormat.V1.ext):
-                tarcheck.check_all(tmp_path, metadata.config)
+            # comparing info/files with the contents of a .conda means decompressing
+            #     all of it, only its info/ is checked
+            tarcheck.check_all(
+                tmp_path,
+                metadata.config,
+                check_files=tmp_path.endswith(CondaPkgFormat.V1.ext),
+            )
             output_filename = os.path.basename(tmp_path)
 
             # we do the import here because we want to respect logger level context
@@ -2298,6 +2290,7 @@ def create_build_envs(m: MetaData, notest):
         )
 
 
+@timed("build")
 def build(
     m: MetaData,
     stats,
@@ -2562,13 +2555,14 @@ def build(
 
                         # this should raise if any problems occur while building
                         try:
-                            utils.check_call_env(
-                                cmd,
-                                env=env,
-                                rewrite_stdout_env=rewrite_env,
-                                cwd=src_dir,
-                                stats=build_stats,
-                            )
+                            with phase("build_script", package=m.name()):
+                                utils.check_call_env(
+                                    cmd,
+                                    env=env,
+                                    rewrite_stdout_env=rewrite_env,
+                                    cwd=src_dir,
+                                    stats=build_stats,
+                                )
                         except subprocess.CalledProcessError as exc:
                             raise BuildScriptException(str(exc), caused_by=exc) from exc
                         utils.remove_pycache_from_scripts(m.config.host_prefix)
@@ -2794,8 +2788,8 @@ def build(
                     for built_package in newly_built_packages:
                         new_pkgs[built_package] = (output_d, m)
 
-                    # must rebuild index because conda has no way to incrementally add our last
-                    #    package to the index.
+                    # re-index the local channel so our last package is available to the
+                    #    outputs that follow.  Remote channel data is kept.
 
                     index_subdir = (
                         "noarch"
@@ -2810,8 +2804,8 @@ def build(
                             channel_urls=m.config.channel_urls,
                             debug=m.config.debug,
                             verbose=m.config.verbose,
-                            clear_cache=True,
                             omit_defaults=False,
+                            refresh_local=True,
                         )
                     get_build_index(
                         subdir=index_subdir,
@@ -2820,8 +2814,8 @@ def build(
                         channel_urls=m.config.channel_urls,
                         debug=m.config.debug,
                         verbose=m.config.verbose,
-                        clear_cache=True,
                         omit_defaults=False,
+                        refresh_local=True,
                     )
     else:
         if not provision_only:
@@ -2877,7 +2871,7 @@ def warn_on_use_of_SRC_DIR(metadata):
             )
 
 
-def _construct_metadata_for_test_from_package(package, config):
+def _construct_metadata_for_test_from_package(package, config, update_index=True):
     recipe_dir, need_cleanup = utils.get_recipe_abspath(package)
     config.need_cleanup = need_cleanup
     config.recipe_dir = recipe_dir
@@ -2929,11 +2923,14 @@ def _construct_metadata_for_test_from_package(package, config):
         local_pkg_location = os.path.join(local_dir, os.path.basename(package))
         utils.copy_into(package, local_pkg_location)
         local_pkg_location = local_dir
+        # the copy always needs indexing
+        update_index = True
 
     local_channel = os.path.dirname(local_pkg_location)
 
     # update indices in the channel
-    _delegated_update_index(local_channel, verbose=config.debug, threads=1)
+    if update_index:
+        _delegated_update_index(local_channel, verbose=config.debug, threads=1)
 
     try:
         metadata = render_recipe(
@@ -3015,8 +3012,10 @@ def _extract_test_files_from_package(metadata):
                     try_download(metadata, no_download_source=False)
 
 
-def construct_metadata_for_test(recipedir_or_package, config):
-    return _construct_metadata_for_test_from_package(recipedir_or_package, config)
+def construct_metadata_for_test(recipedir_or_package, config, update_index=True):
+    return _construct_metadata_for_test_from_package(
+        recipedir_or_package, config, update_index=update_index
+    )
 
 
 def _set_env_variables_for_build(m, env):
@@ -3242,18 +3241,22 @@ def write_test_scripts(
     return test_run_script, test_env_script
 
 
+@timed("test")
 def test(
     recipedir_or_package_or_metadata: str | os.PathLike | Path | MetaData,
     config: Config,
     stats: dict,
     move_broken: bool = True,
     provision_only: bool = False,
+    update_index: bool = True,
 ) -> bool:
     """
     Execute any test scripts for the given package.
 
     :param m: Package's metadata.
     :type m: Metadata
+    :param update_index: Whether to index the channel of a package file first.  Pass
+        False when the channel was already indexed (see :func:`test_packages`).
     """
     log = utils.get_logger(__name__)
     # we want to know if we're dealing with package input.  If so, we can move the input on success.
@@ -3275,7 +3278,7 @@ def test(
         utils.rm_rf(metadata.config.test_dir)
     else:
         metadata, hash_input = construct_metadata_for_test(
-            recipedir_or_package_or_metadata, config
+            recipedir_or_package_or_metadata, config, update_index=update_index
         )
 
     trace = "-x " if metadata.config.debug else ""
@@ -3384,12 +3387,18 @@ def test(
         if (metadata.noarch or metadata.noarch_python)
         else metadata.config.host_subdir
     )
-    # ensure that the test prefix isn't kept between variants
-    utils.rm_rf(metadata.config.test_prefix)
+    reuse_test_env = metadata.config.reuse_test_env
+    if reuse_test_env:
+        # solve against an empty prefix as usual, the kept env is only updated afterwards
+        solve_prefix = metadata.config.test_prefix + "_solve"
+    else:
+        # ensure that the test prefix isn't kept between variants
+        utils.rm_rf(metadata.config.test_prefix)
+        solve_prefix = metadata.config.test_prefix
 
     try:
         precs = environ.get_package_records(
-            metadata.config.test_prefix,
+            solve_prefix,
             tuple(specs),
             "host",
             subdir=subdir,
@@ -3428,7 +3437,7 @@ def test(
         else str(context.path_conflict)
     )
     with env_var("CONDA_PATH_CONFLICT", conflict_verbosity, reset_context):
-        environ.create_env(
+        (environ.update_env if reuse_test_env else environ.create_env)(
             metadata.config.test_prefix,
             precs,
             config=metadata.config,
@@ -3517,6 +3526,84 @@ def test(
     return True
 
 
+def _package_channel(package: str | os.PathLike | Path) -> str | None:
+    """The channel a package file resides in, or None when it isn't in a channel."""
+    subdir_path = os.path.dirname(os.path.abspath(package))
+    if os.path.basename(subdir_path) in utils.DEFAULT_SUBDIRS:
+        return os.path.dirname(subdir_path)
+    return None
+
+
+def _test_package(
+    package: str, config: Config, move_broken: bool, update_index: bool
+) -> dict[str, Any]:
+    """Test one package in its own croot, returning a result record for test_packages."""
+    croot = config.croot
+    start = time.time()
+    stats: dict[str, Any] = {}
+    result = {"package": str(package), "passed": False, "error": None}
+    try:
+        with config:
+            test(
+                package,
+                config=config,
+                stats=stats,
+                move_broken=move_broken,
+                update_index=update_index,
+            )
+        result["passed"] = True
+    except (Exception, SystemExit) as exc:
+        result["error"] = str(exc) or type(exc).__name__
+    if result["passed"] and not config.dirty and not config.keep_old_work:
+        utils.rm_rf(croot)
+    result["duration"] = time.time() - start
+    result["stats"] = stats
+    return result
+
+
+def test_packages(
+    packages: Iterable[str | os.PathLike | Path],
+    config: Config,
+    move_broken: bool = True,
+    jobs: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Test many package files concurrently, each in its own process and croot.
+
+    The channels the packages reside in are indexed once up front.  Yields one result
+    record per package (``package``, ``passed``, ``error``, ``duration`` and ``stats``)
+    as each test finishes.
+    """
+    packages = [str(package) for package in packages]
+    channels = {
+        channel for package in packages if (channel := _package_channel(package))
+    }
+    for channel in sorted(channels):
+        _delegated_update_index(channel, verbose=config.debug)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = []
+        for index, package in enumerate(packages):
+            package_config = config.copy()
+            package_config.croot = join(config.croot, "_test_jobs", str(index))
+            futures.append(
+                executor.submit(
+                    _test_package,
+                    package,
+                    package_config,
+                    move_broken,
+                    _package_channel(package) is None,
+                )
+            )
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # the caller stopped early (e.g. on the first failure), skip the rest
+            for future in futures:
+                future.cancel()
+
+
 def tests_failed(
     package_or_metadata: str | os.PathLike | Path | MetaData,
     move_broken: bool,
@@ -3577,6 +3664,8 @@ def build_tree(
     built_packages = OrderedDict()
     retried_recipes = []
     initial_time = time.time()
+    skip_existing_stats.update(checks=0, time=0.0, skipped=set())
+    timer.reset(profile=bool(config.profile))
 
     if build_only:
         post = False
@@ -3655,7 +3744,8 @@ def build_tree(
                 if post is None:
                     utils.rm_rf(metadata.config.host_prefix)
                     utils.rm_rf(metadata.config.build_prefix)
-                    utils.rm_rf(metadata.config.test_prefix)
+                    if not metadata.config.reuse_test_env:
+                        utils.rm_rf(metadata.config.test_prefix)
                 if metadata.name() not in metadata.config.build_folder:
                     metadata.config.compute_build_id(
                         metadata.name(), metadata.version(), reset=True
@@ -3915,11 +4005,43 @@ def build_tree(
         )
     )
 
+    if config.skip_existing:
+        print(
+            "Skipped {skipped} existing package(s); {checks} check(s) took {elapsed}".format(
+                skipped=len(skip_existing_stats["skipped"]),
+                checks=skip_existing_stats["checks"],
+                elapsed=utils.seconds2human(skip_existing_stats["time"]),
+            )
+        )
+        stats["skip_existing"] = {
+            "skipped": len(skip_existing_stats["skipped"]),
+            "checks": skip_existing_stats["checks"],
+            "time": skip_existing_stats["time"],
+        }
+
+    phases = timer.summary()
+    if phases:
+        print("Time spent per phase:")
+        for name, phase_stats in sorted(
+            phases.items(), key=lambda item: item[1]["time"], reverse=True
+        ):
+            print(
+                f"   {name}: {utils.seconds2human(phase_stats['time'])} "
+                f"({phase_stats['count']} call(s))"
+            )
+
     stats["total"] = {
         "time": total_time,
         "memory": max_memory_used,
         "disk": total_disk,
     }
+    stats["phases"] = phases
+    # makes the stats file loadable in chrome://tracing and Perfetto
+    stats["traceEvents"] = timer.trace_events()
+
+    if config.profile:
+        timer.dump_profile(config.profile)
+        print(f"Profile of the build phases written to {config.profile}")
 
     if config.stats_file:
         with open(config.stats_file, "w") as f:
@@ -4056,13 +4178,38 @@ def clean_build(config, folders=None):
         utils.rm_rf(folder)
 
 
-def is_package_built(metadata, env, include_local=True):
+# (subdir, version, build) of every package found in the configured channels, by name.
+#    Cached per (channels, subdir) and dropped when the local channel changes.
+_package_name_index: dict[tuple, tuple[tuple, dict[str, set]]] = {}
+# mtime of each bldpkgs dir after it was last indexed
+_indexed_bldpkgs_dirs: dict[str, int] = {}
+# summary of the is_package_built checks done by --skip-existing, reset by build_tree
+skip_existing_stats = {"checks": 0, "time": 0.0, "skipped": set()}
+
+
+def _update_bldpkgs_dirs_index(config):
+    """Index the bldpkgs dirs whose contents changed since they were last indexed.
+
+    Returns the mtimes of the dirs, which change whenever a package is added or removed.
+    """
     # bldpkgs_dirs is typically {'$ENVIRONMENT/conda-bld/noarch', '$ENVIRONMENT/conda-bld/osx-arm64'}
     # could pop subdirs (last path element) and call update_index() once
-    for d in metadata.config.bldpkgs_dirs:
+    state = []
+    for d in sorted(config.bldpkgs_dirs):
         if not os.path.isdir(d):
             os.makedirs(d)
-        _delegated_update_index(d, verbose=metadata.config.debug, warn=False, threads=1)
+        mtime = os.stat(d).st_mtime_ns
+        if _indexed_bldpkgs_dirs.get(d) != mtime:
+            _delegated_update_index(d, verbose=config.debug, warn=False, threads=1)
+            # indexing writes into the dir, record the mtime it left behind
+            mtime = _indexed_bldpkgs_dirs[d] = os.stat(d).st_mtime_ns
+        state.append((d, mtime))
+    return tuple(state)
+
+
+def is_package_built(metadata, env, include_local=True):
+    start = time.time()
+    local_state = _update_bldpkgs_dirs_index(metadata.config) if include_local else ()
     subdir = getattr(metadata.config, f"{env}_subdir")
 
     urls = [
@@ -4072,10 +4219,30 @@ def is_package_built(metadata, env, include_local=True):
     if metadata.config.channel_urls:
         urls.extend(metadata.config.channel_urls)
 
-    spec = MatchSpec(
-        name=metadata.name(), version=metadata.version(), build=metadata.build_id()
-    )
+    key = (tuple(urls), subdir)
+    cached_state, names = _package_name_index.get(key, (None, None))
+    if names is None or cached_state != local_state:
+        names = {}
+        _package_name_index[key] = (local_state, names)
 
-    from conda.api import SubdirData
+    name = metadata.name()
+    if name not in names:
+        from conda.api import SubdirData
+
+        names[name] = {
+            (prec.subdir, prec.version, prec.build)
+            for prec in SubdirData.query_all(
+                name, channels=urls, subdirs=(subdir, "noarch")
+            )
+        }
+
+    version, build = metadata.version(), metadata.build_id()
+    built = any(
+        (subdir_, version, build) in names[name] for subdir_ in (subdir, "noarch")
+    )
 
-    return bool(SubdirData.query_all(spec, channels=urls, subdirs=(subdir, "noarch")))
+    skip_existing_stats["checks"] += 1
+    skip_existing_stats["time"] += time.time() - start
+    if built:
+        skip_existing_stats["skipped"].add((subdir, name, version, build))
+    return built
@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
 import sys
 import warnings
+from contextlib import nullcontext
 from glob import glob
 from itertools import chain
 from os.path import abspath, expanduser, expandvars
@@ -24,6 +26,7 @@ from ..config import (
     get_or_merge_config,
     zstd_compression_level_default,
 )
+from ..exceptions import CondaBuildUserError
 from ..utils import LoggingContext
 from .actions import KeyValueAction, PackageTypeNormalize
 from .main_render import get_render_parser
@@ -93,6 +96,20 @@ def parse_args(args: Sequence[str] | None) -> tuple[ArgumentParser, Namespace]:
         help="Test package (assumes package is already built).  RECIPE_PATH argument must be a "
         "path to built package file.",
     )
+    parser.add_argument(
+        "--test-results",
+        metavar="FILE",
+        help="With --test, append the result of each tested package to FILE as a JSON "
+        "line (use - for stdout).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="With --test, the number of packages to test concurrently (in separate "
+        "processes).",
+    )
     parser.add_argument(
         "--no-test",
         action="store_true",
@@ -461,7 +478,35 @@ def parse_args(args: Sequence[str] | None) -> tuple[ArgumentParser, Namespace]:
     )
     parser.add_argument(
         "--stats-file",
-        help="File path to save build statistics to.  Stats are in JSON format",
+        help=(
+            "File path to save build statistics to.  Stats are in JSON format and "
+            "include per-phase timings as Chrome trace events."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        help=(
+            "File path to save cProfile data of the build phases to (pstats format). "
+            "Profiling slows down the build."
+        ),
+    )
+    parser.add_argument(
+        "--verify-rpaths",
+        action="store_true",
+        help=(
+            "Cross-check the ELF rpaths read and rewritten by conda-build against "
+            "patchelf and LIEF, and warn when they disagree."
+        ),
+    )
+    parser.add_argument(
+        "--reuse-test-env",
+        action="store_true",
+        help=(
+            "Keep the test environment between the tests of outputs and variants and "
+            "only install or remove the packages that differ, instead of recreating it "
+            "for every test.  Falls back to a fresh environment when that fails."
+        ),
+        default=context.conda_build.get("reuse_test_env", "false").lower() == "true",
     )
     parser.add_argument(
         "--extra-deps",
@@ -559,6 +604,41 @@ def test_action(recipe: os.PathLike, config: Config) -> bool:
     return api.test(recipe, move_broken=False, config=config)
 
 
+def test_many_action(
+    packages: list[str],
+    config: Config,
+    jobs: int | None,
+    results_file: str | None,
+    keep_going: bool = False,
+) -> list[str]:
+    """Test many packages concurrently action
+
+    :param packages: Paths to packages
+    :param config: Config object used for various options
+    :param jobs: Number of packages to test at once
+    :param results_file: File to append a JSON line per result to, or - for stdout
+    :param keep_going: Keep testing after a failure instead of raising on the first one
+    :return: The packages whose tests failed
+    """
+    failed = []
+    if results_file and results_file != "-":
+        context_manager = open(results_file, "a")
+    else:
+        context_manager = nullcontext(sys.stdout if results_file else None)
+    with context_manager as results:
+        for result in api.test_many(
+            packages, move_broken=False, config=config, jobs=jobs
+        ):
+            if results:
+                results.write(json.dumps(result, default=str) + "\n")
+                results.flush()
+            if not result["passed"]:
+                if not keep_going:
+                    raise CondaBuildUserError(result["error"])
+                failed.append(result["package"])
+    return failed
+
+
 def check_action(recipe: os.PathLike, config: Config):
     return api.check(recipe, config=config)
 
@@ -597,15 +677,24 @@ def execute(args: Sequence[str] | None = None) -> int:
             glob(abspath(recipe), recursive=True) if "*" in recipe else [recipe]
             for recipe in parsed.recipe
         )
-        for recipe in recipes:
-            try:
-                test_action(recipe, config)
-            except:
-                if not parsed.keep_going:
-                    raise
-                else:
-                    failed_recipes.append(recipe)
-                    continue
+        if parsed.jobs or parsed.test_results:
+            failed_recipes = test_many_action(
+                list(recipes),
+                config,
+                parsed.jobs,
+                parsed.test_results,
+                keep_going=parsed.keep_going,
+            )
+        else:
+            for recipe in recipes:
+                try:
+                    test_action(recipe, config)
+                except:
+                    if not parsed.keep_going:
+                        raise
+                    else:
+                        failed_recipes.append(recipe)
+                        continue
         if failed_recipes:
             print("Failed recipes:")
             dashlist(failed_recipes)
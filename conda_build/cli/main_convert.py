@@ -122,6 +122,14 @@ all.""",
     parser.add_argument(
         "-q", "--quiet", action="store_true", help="Don't print as much output."
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of conversions to run concurrently.  Defaults to "
+        "min(32, number of processors + 4).",
+    )
 
     return parser, parser.parse_args(args)
 
@@ -133,8 +141,7 @@ def execute(args: Sequence[str] | None = None) -> int:
     files = parsed.files
     del parsed.__dict__["files"]
 
-    for f in files:
-        f = abspath(expanduser(f))
-        api.convert(f, **parsed.__dict__)
+    files = [abspath(expanduser(f)) for f in files]
+    api.convert(files, **parsed.__dict__)
 
     return 0
@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: BSD-3-Clause
 from __future__ import annotations
 
+import json
 import logging
 import sys
 from os.path import expanduser
@@ -10,7 +11,7 @@ from typing import TYPE_CHECKING
 
 from conda.base.context import context
 
-from .. import api
+from .. import api, inspect_pkg
 
 try:
     from conda.cli.helpers import add_parser_prefix
@@ -89,6 +90,12 @@ libraries that ought to be dependent conda packages.  """
         action="store_true",
         help="Generate a report for all packages in the environment.",
     )
+    linkages.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the linkages of each package as a line of JSON as soon as the "
+        "package has been inspected.",
+    )
     add_parser_prefix(linkages)
 
     objects_help = """
@@ -127,6 +134,12 @@ package.
         action="store_true",
         help="Generate a report for all packages in the environment.",
     )
+    objects.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the object files of each package as a line of JSON as soon as "
+        "the package has been inspected.",
+    )
     add_parser_prefix(objects)
 
     channels_help = """
@@ -203,6 +216,15 @@ def execute(args: Sequence[str] | None = None) -> int:
         sys.exit(0)
     elif parsed.subcommand == "channels":
         print(api.test_installable(parsed.channel))
+    elif parsed.subcommand == "linkages" and parsed.json:
+        for name, depmap in inspect_pkg.iter_linkages(
+            parsed.packages,
+            prefix=context.target_prefix,
+            untracked=parsed.untracked,
+            all_packages=parsed.all,
+            sysroot=expanduser(parsed.sysroot),
+        ):
+            print(inspect_pkg.linkages_to_json(name, depmap), flush=True)
     elif parsed.subcommand == "linkages":
         print(
             api.inspect_linkages(
@@ -215,6 +237,11 @@ def execute(args: Sequence[str] | None = None) -> int:
                 sysroot=expanduser(parsed.sysroot),
             )
         )
+    elif parsed.subcommand == "objects" and parsed.json:
+        for name, info in inspect_pkg.iter_objects(
+            parsed.packages, prefix=context.target_prefix
+        ):
+            print(json.dumps({"package": name, "objects": info}), flush=True)
     elif parsed.subcommand == "objects":
         print(
             api.inspect_objects(
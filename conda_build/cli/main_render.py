@@ -184,11 +184,20 @@ def parse_args(args: Sequence[str] | None) -> tuple[ArgumentParser, Namespace]:
         help="write YAML to file, given as argument here.\
               Overwrites existing files.",
     )
-    # we do this one separately because we only allow one entry to conda render
+    # we do this one separately because conda build defines its own recipe argument
     parser.add_argument(
         "recipe",
         metavar="RECIPE_PATH",
-        help="Path to recipe directory.",
+        nargs="+",
+        help="Path to recipe directory.  Multiple recipes are rendered concurrently.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of recipes to render concurrently when rendering multiple recipes. "
+        "Defaults to min(32, number of processors + 4).",
     )
     # this is here because we have a different default than build
     parser.add_argument(
@@ -200,31 +209,7 @@ def parse_args(args: Sequence[str] | None) -> tuple[ArgumentParser, Namespace]:
     return parser, parser.parse_args(args)
 
 
-def execute(args: Sequence[str] | None = None) -> int:
-    _, parsed = parse_args(args)
-    context.__init__(argparse_args=parsed)
-
-    config = get_or_merge_config(None, **parsed.__dict__)
-
-    variants = get_package_variants(parsed.recipe, config, variants=parsed.variants)
-    from ..build import get_all_replacements
-
-    get_all_replacements(variants)
-    set_language_env_vars(variants)
-
-    config.channel_urls = get_channel_urls(parsed.__dict__)
-
-    if parsed.output:
-        config.verbose = False
-        config.debug = False
-
-    metadata_tuples = api.render(
-        parsed.recipe,
-        config=config,
-        no_download_source=parsed.no_source,
-        variants=parsed.variants,
-    )
-
+def _print_metadata_tuples(metadata_tuples, parsed, config) -> None:
     if parsed.file and len(metadata_tuples) > 1:
         log.warning(
             "Multiple variants rendered. "
@@ -250,4 +235,53 @@ def execute(args: Sequence[str] | None = None) -> int:
             print("----------")
             print(api.output_yaml(m, parsed.file, suppress_outputs=True))
 
-    return 0
+
+def execute(args: Sequence[str] | None = None) -> int:
+    parser, parsed = parse_args(args)
+    if parsed.file and len(parsed.recipe) > 1:
+        parser.error("--file can only be used when rendering a single recipe.")
+    context.__init__(argparse_args=parsed)
+
+    config = get_or_merge_config(None, **parsed.__dict__)
+
+    from ..build import get_all_replacements
+
+    if len(parsed.recipe) == 1:
+        # rendering many recipes resolves the variants of each within its render
+        variants = get_package_variants(
+            parsed.recipe[0], config, variants=parsed.variants
+        )
+        get_all_replacements(variants)
+        set_language_env_vars(variants)
+
+    config.channel_urls = get_channel_urls(parsed.__dict__)
+
+    if parsed.output:
+        config.verbose = False
+        config.debug = False
+
+    if len(parsed.recipe) == 1:
+        metadata_tuples = api.render(
+            parsed.recipe[0],
+            config=config,
+            no_download_source=parsed.no_source,
+            variants=parsed.variants,
+        )
+        _print_metadata_tuples(metadata_tuples, parsed, config)
+        return 0
+
+    failed = []
+    for recipe, result in api.render_many(
+        parsed.recipe,
+        config=config,
+        variants=parsed.variants,
+        workers=parsed.jobs,
+        no_download_source=parsed.no_source,
+    ):
+        if isinstance(result, BaseException):
+            log.error(f"Failed to render {recipe}: {result}")
+            failed.append(recipe)
+        else:
+            _print_metadata_tuples(result, parsed, config)
+
+    return 1 if failed else 0
@@ -263,6 +263,12 @@ def _get_default_settings():
         Setting("_merge_build_host", False),
         # path to output build statistics to
         Setting("stats_file", None),
+        # path to output cProfile data of the build phases to
+        Setting("profile", None),
+        # cross-check rpaths read and written in-process against patchelf and LIEF
+        Setting("verify_rpaths", False),
+        # keep the test env between tests and only link/unlink the packages that differ
+        Setting("reuse_test_env", False),
         # extra deps to add to test env creation
         Setting("extra_deps", []),
         # customize this so pip doesn't look in places we don't want.  Per-build path by default.
@@ -771,6 +777,20 @@ class Config:
         os.makedirs(path, exist_ok=True)
         return path
 
+    @property
+    def run_exports_cache(self):
+        """Where the run_exports read from packages during render are indexed"""
+        path = join(self.src_cache_root, "run_exports_cache")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @property
+    def pypi_cache(self):
+        """Where PyPI JSON metadata is cached by conda skeleton pypi"""
+        path = join(self.src_cache_root, "pypi_cache")
+        os.makedirs(path, exist_ok=True)
+        return path
+
     @property
     def git_cache(self):
         """Where local clones of git sources are stored"""
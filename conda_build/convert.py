@@ -14,16 +14,61 @@ import re
 import shutil
 import tarfile
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import conda_package_handling.api
+from conda_package_streaming.package_streaming import (
+    CondaComponent,
+    stream_conda_component,
+)
+
 from .exceptions import CondaBuildUserError
-from .utils import ensure_list, filter_info_files, tar_xf, walk
+from .utils import copytree, ensure_list, filter_info_files, tar_xf, walk
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
 
+def retrieve_package_names(file_path):
+    """Retrieve the paths of all files in the source package.
+
+    Positional arguments:
+    file_path (str) -- the file path to the source package tar file, or the
+        temporary directory containing the extracted source package contents
+    """
+    if os.path.isdir(file_path):
+        return sorted(
+            os.path.relpath(os.path.join(dirpath, filename), file_path).replace(
+                "\\", "/"
+            )
+            for dirpath, _, filenames in walk(file_path)
+            for filename in filenames
+        )
+    if file_path.endswith(".conda"):
+        return [
+            member.name
+            for component in (CondaComponent.info, CondaComponent.pkg)
+            for _, member in stream_conda_component(file_path, component=component)
+        ]
+    with tarfile.open(file_path) as tar:
+        return tar.getnames()
+
+
+def _read_index_json(file_path):
+    """Read info/index.json of a source package file."""
+    if file_path.endswith(".conda"):
+        for tar, member in stream_conda_component(
+            file_path, component=CondaComponent.info
+        ):
+            if member.name == "info/index.json":
+                return json.loads(tar.extractfile(member).read().decode("utf-8"))
+        raise KeyError("info/index.json")
+    with tarfile.open(file_path) as tar:
+        return json.loads(tar.extractfile("info/index.json").read().decode("utf-8"))
+
+
 def retrieve_c_extensions(file_path, show_imports=False):
     """Check tarfile for compiled C files with '.pyd' or '.so' suffixes.
 
@@ -32,7 +77,8 @@ def retrieve_c_extensions(file_path, show_imports=False):
     to convert packages containing C extensions to other platforms.
 
     Positional arguments:
-    file_path (str) -- the file path to the source package tar file
+    file_path (str) -- the file path to the source package tar file, or the
+        temporary directory containing the extracted source package contents
 
     Keyword arguments:
     show_imports (bool) -- output the C extensions included in the package
@@ -42,14 +88,11 @@ def retrieve_c_extensions(file_path, show_imports=False):
     )
 
     imports = []
-    with tarfile.open(file_path) as tar:
-        for filename in tar.getnames():
-            if filename.endswith((".pyd", ".so")):
-                filename_match = c_extension_pattern.match(filename)
-                import_name = "import {}".format(
-                    filename_match.group(3).replace("/", ".")
-                )
-                imports.append(import_name)
+    for filename in retrieve_package_names(file_path):
+        if filename.endswith((".pyd", ".so")):
+            filename_match = c_extension_pattern.match(filename)
+            import_name = "import {}".format(filename_match.group(3).replace("/", "."))
+            imports.append(import_name)
 
     return imports
 
@@ -58,10 +101,14 @@ def retrieve_package_platform(file_path):
     """Retrieve the platform and architecture of the source package.
 
     Positional arguments:
-    file_path (str) -- the file path to the source package tar file
+    file_path (str) -- the file path to the source package tar file, or the
+        temporary directory containing the extracted source package contents
     """
-    with tarfile.open(file_path) as tar:
-        index = json.loads(tar.extractfile("info/index.json").read().decode("utf-8"))
+    if os.path.isdir(file_path):
+        with open(os.path.join(file_path, "info/index.json")) as index_file:
+            index = json.load(index_file)
+    else:
+        index = _read_index_json(file_path)
 
     platform = index["platform"]
 
@@ -103,11 +150,8 @@ def retrieve_python_version(file_path):
             return matched.group(0)
 
     else:
-        if file_path.endswith((".tar.bz2", ".tar")):
-            with tarfile.open(file_path) as tar:
-                index = json.loads(
-                    tar.extractfile("info/index.json").read().decode("utf-8")
-                )
+        if file_path.endswith((".tar.bz2", ".tar", ".conda")):
+            index = _read_index_json(file_path)
 
         else:
             path_file = os.path.join(file_path, "info/index.json")
@@ -123,15 +167,24 @@ def retrieve_python_version(file_path):
         return f"{build_version}{build_version_number[0]}.{build_version_number[1]}"
 
 
-def extract_temporary_directory(file_path):
+def extract_temporary_directory(file_path, staging_dir=None):
     """Extract the source tar archive contents to a temporary directory.
 
     Positional arguments:
     file_path (str) -- the file path to the source package tar file
+
+    Keyword arguments:
+    staging_dir (str) -- a directory the source package was already extracted to,
+        which is copied instead of extracting the tar file again
     """
     temporary_directory = tempfile.mkdtemp()
 
-    tar_xf(file_path, temporary_directory)
+    if staging_dir:
+        copytree(staging_dir, temporary_directory, symlinks=True)
+    elif file_path.endswith(".conda"):
+        conda_package_handling.api.extract(file_path, dest_dir=temporary_directory)
+    else:
+        tar_xf(file_path, temporary_directory)
 
     return temporary_directory
 
@@ -632,6 +685,17 @@ def create_target_archive(file_path, temp_dir, platform, output_dir):
 
     destination = os.path.join(output_directory, os.path.basename(file_path))
 
+    if destination.endswith(".conda"):
+        files = [
+            os.path.relpath(os.path.join(dirpath, filename), temp_dir)
+            for dirpath, _, filenames in walk(temp_dir)
+            for filename in filenames
+        ]
+        conda_package_handling.api.create(
+            temp_dir, files, os.path.basename(destination), out_folder=output_directory
+        )
+        return
+
     with tarfile.open(destination, "w:bz2") as target:
         for dirpath, dirnames, filenames in walk(temp_dir):
             relative_dir = os.path.relpath(dirpath, temp_dir)
@@ -641,7 +705,7 @@ def create_target_archive(file_path, temp_dir, platform, output_dir):
 
 
 def convert_between_unix_platforms(
-    file_path, output_dir, platform, dependencies, verbose
+    file_path, output_dir, platform, dependencies, verbose, staging_dir=None
 ):
     """Convert package between unix platforms.
 
@@ -651,8 +715,11 @@ def convert_between_unix_platforms(
     platform (str) -- the platform to convert to: 'linux-64', 'linux-32', or 'osx-64'
     dependencies (List[str]) -- the dependencies passed from the command line
     verbose (bool) -- show output of items that are updated
+
+    Keyword arguments:
+    staging_dir (str) -- a directory the source package was already extracted to
     """
-    temp_dir = extract_temporary_directory(file_path)
+    temp_dir = extract_temporary_directory(file_path, staging_dir)
 
     update_index_file(temp_dir, platform, dependencies, verbose)
 
@@ -663,7 +730,7 @@ def convert_between_unix_platforms(
 
 
 def convert_between_windows_architechtures(
-    file_path, output_dir, platform, dependencies, verbose
+    file_path, output_dir, platform, dependencies, verbose, staging_dir=None
 ):
     """Convert package between windows architectures.
 
@@ -673,8 +740,11 @@ def convert_between_windows_architechtures(
     platform (str) -- the platform to convert to: 'win-64' or 'win-32'
     dependencies (List[str]) -- the dependencies passed from the command line
     verbose (bool) -- show output of items that are updated
+
+    Keyword arguments:
+    staging_dir (str) -- a directory the source package was already extracted to
     """
-    temp_dir = extract_temporary_directory(file_path)
+    temp_dir = extract_temporary_directory(file_path, staging_dir)
 
     update_index_file(temp_dir, platform, dependencies, verbose)
 
@@ -685,7 +755,7 @@ def convert_between_windows_architechtures(
 
 
 def convert_from_unix_to_windows(
-    file_path, output_dir, platform, dependencies, verbose
+    file_path, output_dir, platform, dependencies, verbose, staging_dir=None
 ):
     """Convert a package from a unix platform to windows.
 
@@ -695,8 +765,11 @@ def convert_from_unix_to_windows(
     platform (str) -- the platform to convert to: 'win-64' or 'win-32'
     dependencies (List[str]) -- the dependencies passed from the command line
     verbose (bool) -- show output of items that are updated
+
+    Keyword arguments:
+    staging_dir (str) -- a directory the source package was already extracted to
     """
-    temp_dir = extract_temporary_directory(file_path)
+    temp_dir = extract_temporary_directory(file_path, staging_dir)
 
     prefixes = set()
 
@@ -735,7 +808,7 @@ def convert_from_unix_to_windows(
 
 
 def convert_from_windows_to_unix(
-    file_path, output_dir, platform, dependencies, verbose
+    file_path, output_dir, platform, dependencies, verbose, staging_dir=None
 ):
     """Convert a package from windows to a unix platform.
 
@@ -745,16 +818,19 @@ def convert_from_windows_to_unix(
     platform (str) -- the platform to convert to: 'linux-64', 'linux-32', or 'osx-64'
     dependencies (List[str]) -- the dependencies passed from the command line
     verbose (bool) -- show output of items that are updated
+
+    Keyword arguments:
+    staging_dir (str) -- a directory the source package was already extracted to
     """
-    retrieve_python_version(file_path)
-    temp_dir = extract_temporary_directory(file_path)
+    temp_dir = extract_temporary_directory(file_path, staging_dir)
+    retrieve_python_version(temp_dir)
 
     prefixes = set()
 
     for entry in os.listdir(temp_dir):
         directory = os.path.join(temp_dir, entry)
         if os.path.isdir(directory) and "Lib" in directory:
-            update_lib_contents(directory, temp_dir, "unix", file_path)
+            update_lib_contents(directory, temp_dir, "unix", temp_dir)
 
         if os.path.isdir(directory) and "Scripts" in directory:
             for script in os.listdir(directory):
@@ -779,8 +855,45 @@ def convert_from_windows_to_unix(
     shutil.rmtree(temp_dir)
 
 
+def convert_package(
+    file_path,
+    output_dir,
+    platform,
+    conversion_platform,
+    dependencies,
+    verbose,
+    staging_dir=None,
+):
+    """Convert a package to one target platform.
+
+    Positional arguments:
+    file_path (str) -- the file path to the source package's tar file
+    output_dir (str) -- the file path to where to output the converted tar file
+    platform (str) -- the platform to convert to, e.g. 'linux-64' or 'win-64'
+    conversion_platform (str) -- the platform of the source package: 'unix' or 'win'
+    dependencies (List[str]) -- the dependencies passed from the command line
+    verbose (bool) -- show output of items that are updated
+
+    Keyword arguments:
+    staging_dir (str) -- a directory the source package was already extracted to
+    """
+    if platform.startswith(("osx", "linux")) and conversion_platform == "unix":
+        convert = convert_between_unix_platforms
+    elif platform.startswith("win") and conversion_platform == "unix":
+        convert = convert_from_unix_to_windows
+    elif platform.startswith(("osx", "linux")) and conversion_platform == "win":
+        convert = convert_from_windows_to_unix
+    elif platform.startswith("win") and conversion_platform == "win":
+        convert = convert_between_windows_architechtures
+    else:
+        return
+    convert(
+        file_path, output_dir, platform, dependencies, verbose, staging_dir=staging_dir
+    )
+
+
 def conda_convert(
-    file_path: str,
+    file_path: str | Iterable[str],
     output_dir: str = ".",
     show_imports: bool = False,
     platforms: str | Iterable[str] | None = None,
@@ -789,11 +902,16 @@ def conda_convert(
     verbose: bool = False,
     quiet: bool = False,
     dry_run: bool = False,
+    jobs: int | None = None,
 ) -> None:
-    """Convert a conda package between different platforms and architectures.
+    """Convert conda packages between different platforms and architectures.
+
+    Each source package is extracted once, and the conversions to the target
+    platforms run concurrently from that extracted copy.
 
     Positional arguments:
-    file_path (str) -- the file path to the source package's tar file
+    file_path (str) -- the file path to the source package's tar file, or a list
+        of them
     output_dir (str) -- the file path to where to output the converted tar file
     show_imports (bool) -- show all C extensions found in the source package
     platforms list[str] -- the platforms to convert to: 'win-64', 'win-32', 'linux-64',
@@ -804,18 +922,21 @@ def conda_convert(
     verbose (bool) -- show output of items that are updated
     quiet (bool) -- hide all output except warnings and errors
     dry_run (bool) -- show which conversions will take place
+    jobs (int) -- the number of conversions to run at once
     """
 
+    file_paths = ensure_list(file_path)
     platforms = ensure_list(platforms)
     dependencies = ensure_list(dependencies)
 
     if show_imports:
-        imports = retrieve_c_extensions(file_path)
-        if len(imports) == 0:
-            print("No imports found.")
-        else:
-            for c_extension in imports:
-                print(c_extension)
+        for file_path in file_paths:
+            imports = retrieve_c_extensions(file_path)
+            if len(imports) == 0:
+                print("No imports found.")
+            else:
+                for c_extension in imports:
+                    print(c_extension)
         return
 
     if not show_imports and len(platforms) == 0:
@@ -823,17 +944,6 @@ def conda_convert(
             "Error: --platform option required for conda package conversion."
         )
 
-    if len(retrieve_c_extensions(file_path)) > 0 and not force:
-        raise CondaBuildUserError(
-            f"WARNING: Package {os.path.basename(file_path)} contains C extensions; skipping conversion. "
-            "Use -f to force conversion."
-        )
-
-    conversion_platform, source_platform, architecture = retrieve_package_platform(
-        file_path
-    )
-    source_platform_architecture = f"{source_platform}-{architecture}"
-
     if "all" in platforms:
         platforms = [
             "osx-64",
@@ -851,35 +961,73 @@ def conda_convert(
             "win-arm64",
         ]
 
-    for platform in platforms:
-        if platform == source_platform_architecture:
-            print(
-                f"Source platform '{source_platform_architecture}' and target platform '{platform}' are identical. "
-                "Skipping conversion."
-            )
-            continue
-
-        if not quiet:
-            print(
-                f"Converting {os.path.basename(file_path)} from {source_platform_architecture} to {platform}"
-            )
-
-        if platform.startswith(("osx", "linux")) and conversion_platform == "unix":
-            convert_between_unix_platforms(
-                file_path, output_dir, platform, dependencies, verbose
-            )
+    staging_dirs = []
+    try:
+        # every package is checked before any conversion starts
+        conversions = []
+        for file_path in file_paths:
+            # extracted once, every conversion works on a copy
+            staging_dir = extract_temporary_directory(file_path)
+            staging_dirs.append(staging_dir)
+
+            if len(retrieve_c_extensions(staging_dir)) > 0 and not force:
+                raise CondaBuildUserError(
+                    f"WARNING: Package {os.path.basename(file_path)} contains C extensions; skipping conversion. "
+                    "Use -f to force conversion."
+                )
 
-        elif platform.startswith("win") and conversion_platform == "unix":
-            convert_from_unix_to_windows(
-                file_path, output_dir, platform, dependencies, verbose
+            conversion_platform, source_platform, architecture = (
+                retrieve_package_platform(staging_dir)
             )
+            source_platform_architecture = f"{source_platform}-{architecture}"
+
+            for platform in platforms:
+                if platform == source_platform_architecture:
+                    print(
+                        f"Source platform '{source_platform_architecture}' and "
+                        f"target platform '{platform}' are identical. "
+                        "Skipping conversion."
+                    )
+                    continue
+                conversions.append(
+                    (
+                        file_path,
+                        staging_dir,
+                        source_platform_architecture,
+                        platform,
+                        conversion_platform,
+                    )
+                )
 
-        elif platform.startswith(("osx", "linux")) and conversion_platform == "win":
-            convert_from_windows_to_unix(
-                file_path, output_dir, platform, dependencies, verbose
+        def _convert(
+            file_path,
+            staging_dir,
+            source_platform_architecture,
+            platform,
+            conversion_platform,
+        ):
+            if not quiet:
+                print(
+                    f"Converting {os.path.basename(file_path)} "
+                    f"from {source_platform_architecture} to {platform}"
+                )
+            convert_package(
+                file_path,
+                output_dir,
+                platform,
+                conversion_platform,
+                dependencies,
+                verbose,
+                staging_dir=staging_dir,
             )
 
-        elif platform.startswith("win") and conversion_platform == "win":
-            convert_between_windows_architechtures(
-                file_path, output_dir, platform, dependencies, verbose
-            )
+        with ThreadPoolExecutor(jobs) as executor:
+            futures = [
+                executor.submit(_convert, *conversion) for conversion in conversions
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        # we need to manually remove the temporary directories created by tempfile.mkdtemp
+        for staging_dir in staging_dirs:
+            shutil.rmtree(staging_dir, ignore_errors=True)
@@ -39,6 +39,7 @@ from conda.exceptions import (
 )
 from conda.gateways.disk.create import TemporaryDirectory
 from conda.models.channel import Channel, prioritize_channels
+from conda.models.enums import NoarchType
 from conda.models.match_spec import MatchSpec
 from conda.models.records import PackageRecord
 
@@ -47,6 +48,7 @@ from .exceptions import BuildLockError, DependencyNeedsBuildingError
 from .features import feature_list
 from .index import get_build_index
 from .os_utils import external
+from .profiling import phase, timed
 from .utils import (
     ensure_list,
     env_var,
@@ -884,10 +886,11 @@ def get_install_actions(
         # this is hiding output like:
         #    Fetching package metadata ...........
         #    Solving package specifications: ..........
-        with utils.LoggingContext(conda_log_level):
+        with utils.output_redirect_lock, utils.LoggingContext(conda_log_level):
             with capture():
                 try:
-                    _actions = _install_actions(prefix, index, specs, subdir=subdir)
+                    with phase("solve", env=env):
+                        _actions = _install_actions(prefix, index, specs, subdir=subdir)
                     precs = _actions["LINK"]
                 except (NoPackagesFoundError, UnsatisfiableError) as exc:
                     raise DependencyNeedsBuildingError(exc, subdir=subdir)
@@ -974,6 +977,7 @@ get_package_records = get_install_actions
 del get_install_actions
 
 
+@timed("create_env")
 def create_env(
     prefix: str | os.PathLike | Path,
     specs_or_precs: Iterable[str | MatchSpec] | Iterable[PackageRecord],
@@ -1050,7 +1054,8 @@ def create_env(
                             os.environ[k] = str(v)
                     with env_var("CONDA_QUIET", not config.verbose, reset_context):
                         with env_var("CONDA_JSON", not config.verbose, reset_context):
-                            _execute_actions(prefix, precs)
+                            with phase("link", prefix=prefix):
+                                _execute_actions(prefix, precs)
             except (
                 SystemExit,
                 PaddingError,
@@ -1193,6 +1198,107 @@ def create_env(
                     raise
 
 
+def _record_key(prec: PackageRecord) -> tuple[str, str | None]:
+    # locally rebuilt packages keep their dist string, so their hash tells them apart
+    return prec.dist_str(), prec.get("sha256") or prec.get("md5")
+
+
+def update_env(
+    prefix: str | os.PathLike | Path,
+    precs: Iterable[PackageRecord],
+    env,
+    config,
+    subdir,
+    is_cross: bool = False,
+    is_conda: bool = False,
+) -> None:
+    """
+    Bring the environment at prefix in line with precs by only unlinking and linking the
+    records that differ from what is installed.  Falls back to create_env when there is
+    no environment yet or the delta transaction fails.
+    """
+    log = utils.get_logger(__name__)
+    precs = tuple(precs)
+
+    def recreate():
+        create_env(
+            prefix,
+            precs,
+            env=env,
+            config=config,
+            subdir=subdir,
+            is_cross=is_cross,
+            is_conda=is_conda,
+        )
+
+    if not os.path.isdir(os.path.join(prefix, "conda-meta")):
+        return recreate()
+
+    PrefixData._cache_.clear()
+    installed = {
+        _record_key(prec): prec for prec in PrefixData(str(prefix)).iter_records()
+    }
+    wanted = {_record_key(prec): prec for prec in precs}
+    unlink_precs = [prec for key, prec in installed.items() if key not in wanted]
+    link_precs = [prec for key, prec in wanted.items() if key not in installed]
+    # noarch: python packages are linked into the site-packages of the environment's python
+    #     (and their entry points use it), the solver and not the transaction redoes that
+    #     when python changes, so relink them along with python
+    if any(prec.name == "python" for prec in (*unlink_precs, *link_precs)):
+        relink = [
+            key
+            for key, prec in wanted.items()
+            if key in installed and prec.noarch == NoarchType.python
+        ]
+        unlink_precs += [installed[key] for key in relink]
+        link_precs += [wanted[key] for key in relink]
+    log.info(
+        "Reusing environment %s: %d package(s) kept, %d removed, %d added",
+        prefix,
+        len(installed) - len(unlink_precs),
+        len(unlink_precs),
+        len(link_precs),
+    )
+    if not unlink_precs and not link_precs:
+        return
+
+    if config.debug:
+        external_logger_context = utils.LoggingContext(logging.DEBUG)
+    else:
+        external_logger_context = utils.LoggingContext(logging.WARN)
+    locks = utils.get_conda_operation_locks(
+        config.locking,
+        config.bldpkgs_dirs,
+        config.timeout,
+    )
+    try:
+        with external_logger_context:
+            with utils.try_acquire_locks(locks, timeout=config.timeout):
+                _display_actions(prefix, link_precs)
+                with env_var("CONDA_QUIET", not config.verbose, reset_context):
+                    with env_var("CONDA_JSON", not config.verbose, reset_context):
+                        with phase("link", prefix=prefix):
+                            _execute_actions(prefix, link_precs, unlink_precs)
+    except (
+        SystemExit,
+        PaddingError,
+        LinkError,
+        CondaError,
+        BuildLockError,
+        AssertionError,
+        OSError,
+        ValueError,
+        RuntimeError,
+        LockError,
+    ) as exc:
+        log.warning(
+            "Failed to update environment %s, recreating it.  exception was: %s",
+            prefix,
+            str(exc),
+        )
+        recreate()
+
+
 def get_pkg_dirs_locks(dirs, config):
     return [utils.get_lock(folder, timeout=config.timeout) for folder in dirs]
 
@@ -1279,8 +1385,10 @@ def install_actions(
         # a hack since in conda-build we don't track channel_priority_map
         channels: tuple[Channel, ...] | None
         subdirs: tuple[str, ...] | None
-        if LAST_CHANNEL_URLS:
-            channel_priority_map = prioritize_channels(LAST_CHANNEL_URLS)
+        # cached build indexes remember the channels conda loaded them from
+        channel_urls = getattr(index, "last_channel_urls", None) or LAST_CHANNEL_URLS
+        if channel_urls:
+            channel_priority_map = prioritize_channels(channel_urls)
             # tuple(dict.fromkeys(...)) removes duplicates while preserving input order.
             channels = tuple(
                 dict.fromkeys(Channel(url) for url in channel_priority_map)
@@ -1319,7 +1427,7 @@ _install_actions = install_actions
 del install_actions
 
 
-def _execute_actions(prefix, precs):
+def _execute_actions(prefix, precs, unlink_precs=()):
     # This is copied over from https://github.com/conda/conda/blob/23.11.0/conda/plan.py#L575
     # but reduced to only the functionality actually used within conda-build.
     assert prefix
@@ -1334,7 +1442,7 @@ def _execute_actions(prefix, precs):
     progressive_fetch_extract = ProgressiveFetchExtract(precs)
     progressive_fetch_extract.prepare()
 
-    stp = PrefixSetup(prefix, (), precs, (), [], ())
+    stp = PrefixSetup(prefix, tuple(unlink_precs), precs, (), [], ())
     unlink_link_transaction = UnlinkLinkTransaction(stp)
 
     log.debug(" %s(%r)", "PROGRESSIVEFETCHEXTRACT", progressive_fetch_extract)
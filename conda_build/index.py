@@ -4,15 +4,19 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+from collections.abc import Mapping
 from functools import partial
 from os.path import dirname
 from typing import TYPE_CHECKING
 
 from conda.base.context import context
+from conda.core.index import LAST_CHANNEL_URLS
 from conda.exceptions import CondaHTTPError
 from conda.utils import url_path
 
 from . import utils
+from .profiling import timed
 from .utils import (
     get_logger,
 )
@@ -41,11 +45,94 @@ except ImportError:
 log = get_logger(__name__)
 
 
-local_index_timestamp = 0
+class BuildIndex(Mapping):
+    """Package records available to a build, split into two layers.
+
+    The remote layer is conda's (lazily loaded) index of all channels, which is loaded once
+    per process.  The records of the local channel (``output_folder``) are read on their own
+    and take the place of the local channel's records in the remote layer, so they can be
+    reloaded whenever a newly built package lands in the local channel.
+    """
+
+    def __init__(self, remote, local, local_url, subdir, last_channel_urls):
+        self.remote = remote
+        self.local = local
+        self.local_url = local_url
+        self.subdir = subdir
+        self.last_channel_urls = last_channel_urls
+        self.local_timestamp = 0
+        self._records = None
+        self._by_dist = None
+
+    @staticmethod
+    def _in_local_channel(record, local_base_url):
+        channel = getattr(record, "channel", None)
+        return getattr(channel, "base_url", None) == local_base_url
+
+    @property
+    def records(self):
+        """The merged view of both layers, computed once per update of the local layer."""
+        if (records := self._records) is None:
+            local_base_url = None
+            if self.local_url:
+                from conda.models.channel import Channel
+
+                local_base_url = Channel(self.local_url).base_url
+            records = dict(self.local)
+            for key, record in self.remote.items():
+                if local_base_url and self._in_local_channel(key, local_base_url):
+                    continue
+                records.setdefault(key, record)
+            self._records = records
+        return records
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def copy(self):
+        return dict(self.records)
+
+    def get_record(self, name, version, build):
+        """The record of ``name-version-build``, preferring the local channel."""
+        if (by_dist := self._by_dist) is None:
+            by_dist = {}
+            for record in self.records:
+                by_dist.setdefault((record.name, record.version, record.build), record)
+            self._by_dist = by_dist
+        return by_dist.get((name, version, build))
+
+    def reload_local(self):
+        """Replace the local layer with the current contents of the local channel."""
+        if not self.local_url:
+            return
+
+        from conda.api import SubdirData
+        from conda.models.channel import Channel
+
+        local = {}
+        for subdir in dict.fromkeys((self.subdir, "noarch")):
+            subdir_data = SubdirData(Channel(f"{self.local_url}/{subdir}")).reload()
+            for record in subdir_data.iter_records():
+                local[record] = record
+        self.local = local
+        self._records = None
+        self._by_dist = None
+
+
+# indexes are cached per (subdir, output_folder, channel_urls, omit_defaults)
+_build_indexes: dict[tuple, BuildIndex] = {}
+# guards the cached indexes when recipes are rendered concurrently
+_index_lock = threading.RLock()
+
+# the index most recently returned by get_build_index
 cached_index = None
-local_subdir = ""
-local_output_folder = ""
-cached_channels = []
+local_index_timestamp = 0
 
 # TODO: this is to make sure that the index doesn't leak tokens.  It breaks use of private channels, though.
 # os.environ['CONDA_ADD_ANACONDA_TOKEN'] = "false"
@@ -60,16 +147,43 @@ def get_build_index(
     channel_urls=None,
     debug=False,
     verbose=True,
+    refresh_local=False,
 ):
     """
     Used during package builds to create/get a channel including any local or
     newly built packages. This function both updates and gets index data.
+
+    Remote channel data is loaded once per process and only discarded with
+    ``clear_cache``.  When the local channel changes (or ``refresh_local`` is set, e.g.
+    after a package was added to it), only the local channel is re-indexed and reloaded.
     """
-    global local_index_timestamp
-    global local_subdir
-    global local_output_folder
+    with _index_lock:
+        return _get_build_index(
+            subdir,
+            bldpkgs_dir,
+            output_folder=output_folder,
+            clear_cache=clear_cache,
+            omit_defaults=omit_defaults,
+            channel_urls=channel_urls,
+            debug=debug,
+            verbose=verbose,
+            refresh_local=refresh_local,
+        )
+
+
+def _get_build_index(
+    subdir,
+    bldpkgs_dir,
+    output_folder=None,
+    clear_cache=False,
+    omit_defaults=False,
+    channel_urls=None,
+    debug=False,
+    verbose=True,
+    refresh_local=False,
+):
     global cached_index
-    global cached_channels
+    global local_index_timestamp
     mtime = 0
 
     channel_urls = list(utils.ensure_list(channel_urls))
@@ -82,71 +196,85 @@ def get_build_index(
     if os.path.isfile(index_file):
         mtime = os.path.getmtime(index_file)
 
-    if (
-        clear_cache
-        or not os.path.isfile(index_file)
-        or local_subdir != subdir
-        or local_output_folder != output_folder
-        or mtime > local_index_timestamp
-        or cached_channels != channel_urls
-    ):
-        # priority: (local as either croot or output_folder IF NOT EXPLICITLY IN CHANNEL ARGS),
-        #     then channels passed as args (if local in this, it remains in same order),
-        #     then channels from condarc.
-        urls = list(channel_urls)
-
-        loggers = utils.LoggingContext.default_loggers + [__name__]
-        if debug:
-            log_context = partial(utils.LoggingContext, logging.DEBUG, loggers=loggers)
-        elif verbose:
-            log_context = partial(utils.LoggingContext, logging.WARN, loggers=loggers)
-        else:
-            log_context = partial(
-                utils.LoggingContext, logging.CRITICAL + 1, loggers=loggers
+    key = (subdir, output_folder, tuple(channel_urls), omit_defaults)
+    index = _build_indexes.get(key)
+
+    loggers = utils.LoggingContext.default_loggers + [__name__]
+    if debug:
+        log_context = partial(utils.LoggingContext, logging.DEBUG, loggers=loggers)
+    elif verbose:
+        log_context = partial(utils.LoggingContext, logging.WARN, loggers=loggers)
+    else:
+        log_context = partial(
+            utils.LoggingContext, logging.CRITICAL + 1, loggers=loggers
+        )
+
+    if clear_cache or index is None:
+        with log_context():
+            index = _build_indexes[key] = _load_build_index(
+                subdir, output_folder, channel_urls, omit_defaults, debug
             )
+    elif (
+        refresh_local or not os.path.isfile(index_file) or mtime > index.local_timestamp
+    ):
         with log_context():
-            # this is where we add the "local" channel.  It's a little smarter than conda, because
-            #     conda does not know about our output_folder when it is not the default setting.
-            if os.path.isdir(output_folder):
-                local_path = url_path(output_folder)
-                # replace local with the appropriate real channel.  Order is maintained.
-                urls = [url if url != "local" else local_path for url in urls]
-                if local_path not in urls:
-                    urls.insert(0, local_path)
             _ensure_valid_channel(output_folder, subdir)
             _delegated_update_index(output_folder, verbose=debug)
+            index.reload_local()
+    index.local_timestamp = os.path.getmtime(index_file)
+    cached_index = index
+    local_index_timestamp = index.local_timestamp
+    return index, index.local_timestamp, None
+
+
+def _load_build_index(subdir, output_folder, channel_urls, omit_defaults, debug):
+    # priority: (local as either croot or output_folder IF NOT EXPLICITLY IN CHANNEL ARGS),
+    #     then channels passed as args (if local in this, it remains in same order),
+    #     then channels from condarc.
+    urls = list(channel_urls)
+    local_path = None
+
+    # this is where we add the "local" channel.  It's a little smarter than conda, because
+    #     conda does not know about our output_folder when it is not the default setting.
+    if os.path.isdir(output_folder):
+        local_path = url_path(output_folder)
+        # replace local with the appropriate real channel.  Order is maintained.
+        urls = [url if url != "local" else local_path for url in urls]
+        if local_path not in urls:
+            urls.insert(0, local_path)
+    _ensure_valid_channel(output_folder, subdir)
+    _delegated_update_index(output_folder, verbose=debug)
+
+    # replace noarch with native subdir - this ends up building an index with both the
+    #      native content and the noarch content.
+
+    if subdir == "noarch":
+        subdir = context.subdir
+    try:
+        # Index() is like conda reading the index, not conda_index
+        # creating a new index.
+        index = Index(
+            channels=urls,
+            prepend=not omit_defaults,
+            platform=subdir,
+            use_local=False,
+        )
+    # HACK: defaults does not have the many subfolders we support.  Omit it and
+    #          try again.
+    except CondaHTTPError:
+        if "defaults" in urls:
+            urls.remove("defaults")
+        index = Index(
+            channels=urls,
+            prepend=not omit_defaults,
+            platform=subdir,
+            use_local=False,
+        )
 
-            # replace noarch with native subdir - this ends up building an index with both the
-            #      native content and the noarch content.
-
-            if subdir == "noarch":
-                subdir = context.subdir
-            try:
-                # Index() is like conda reading the index, not conda_index
-                # creating a new index.
-                cached_index = Index(
-                    channels=urls,
-                    prepend=not omit_defaults,
-                    platform=subdir,
-                    use_local=False,
-                )
-            # HACK: defaults does not have the many subfolders we support.  Omit it and
-            #          try again.
-            except CondaHTTPError:
-                if "defaults" in urls:
-                    urls.remove("defaults")
-                cached_index = Index(
-                    channels=urls,
-                    prepend=not omit_defaults,
-                    platform=subdir,
-                    use_local=False,
-                )
-
-        local_index_timestamp = os.path.getmtime(index_file)
-        local_subdir = subdir
-        local_output_folder = output_folder
-        cached_channels = channel_urls
-    return cached_index, local_index_timestamp, None
+    # the local channel is read on its own, so it can be reloaded on its own later
+    build_index = BuildIndex(index, {}, local_path, subdir, list(LAST_CHANNEL_URLS))
+    build_index.reload_local()
+    return build_index
 
 
 def _ensure_valid_channel(local_folder, subdir):
@@ -156,6 +284,7 @@ def _ensure_valid_channel(local_folder, subdir):
             os.makedirs(path)
 
 
+@timed("index")
 def _delegated_update_index(
     dir_path,
     check_md5=False,
@@ -196,4 +325,6 @@ def _delegated_update_index(
             debug=debug,
             write_bz2=False,
             write_zst=False,
+            # lets render look up the run_exports of local packages without reading them
+            write_run_exports=True,
         )
@@ -6,6 +6,7 @@ import json
 import os
 import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from itertools import groupby
 from operator import itemgetter
 from os.path import abspath, basename, dirname, exists, join, normcase
@@ -44,7 +45,7 @@ except ImportError:
     from conda_build.index import Index
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Iterator
     from typing import Literal
 
 log = get_logger(__name__)
@@ -216,15 +217,54 @@ def _underlined_text(text):
     return str(text) + "\n" + "-" * len(str(text)) + "\n\n"
 
 
-def inspect_linkages(
+def prefix_ownership(
+    prefix: str | os.PathLike | Path,
+) -> dict[str, list[PrefixRecord]]:
+    """Map the (normcased) path of every file installed in prefix to the package(s) it came from.
+
+    Building this once is much cheaper than calling which_package for every file.
+    """
+    ownership = defaultdict(list)
+    for prec in PrefixData(str(prefix)).iter_records():
+        for file in prec["files"]:
+            ownership[normcase(file)].append(prec)
+    return ownership
+
+
+def _get_obj_files(
+    packages: Iterable[str | _untracked_package],
+    prefix: Path,
+    error: type[Exception] = CondaBuildUserError,
+) -> dict[str | _untracked_package, list[str]]:
+    installed = {prec.name: prec for prec in PrefixData(str(prefix)).iter_records()}
+    obj_files = {}
+    for name in packages:
+        if name == untracked_package:
+            obj_files[name] = get_untracked_obj_files(prefix)
+        elif name not in installed:
+            raise error(f"Package {name} is not installed in {prefix}")
+        else:
+            obj_files[name] = get_package_obj_files(installed[name], prefix)
+    return obj_files
+
+
+def iter_linkages(
     packages: Iterable[str | _untracked_package],
     prefix: str | os.PathLike | Path = sys.prefix,
     untracked: bool = False,
     all_packages: bool = False,
-    show_files: bool = False,
-    groupby: Literal["package", "dependency"] = "package",
     sysroot: str = "",
-) -> str:
+) -> Iterator[
+    tuple[
+        str | _untracked_package,
+        dict[PrefixRecord | str, list[tuple[str, str, str]]],
+    ]
+]:
+    """Yield the linkages of each package, grouped by the package they resolve to.
+
+    The object files of each package are analysed concurrently (and cached by
+    get_linkages), and each package is yielded as soon as its files have been analysed.
+    """
     if not packages and not untracked and not all_packages:
         raise CondaBuildUserError(
             "At least one package or --untracked or --all must be provided"
@@ -235,25 +275,18 @@ def inspect_linkages(
         )
 
     prefix = Path(prefix)
-    installed = {prec.name: prec for prec in PrefixData(str(prefix)).iter_records()}
-
     if all_packages:
-        packages = sorted(installed.keys())
+        packages = sorted(prec.name for prec in PrefixData(str(prefix)).iter_records())
     packages = ensure_list(packages)
     if untracked:
         packages.append(untracked_package)
 
-    pkgmap: dict[str | _untracked_package, dict[str, list]] = {}
-    for name in packages:
-        if name == untracked_package:
-            obj_files = get_untracked_obj_files(prefix)
-        elif name not in installed:
-            raise CondaBuildUserError(f"Package {name} is not installed in {prefix}")
-        else:
-            obj_files = get_package_obj_files(installed[name], prefix)
+    obj_files = _get_obj_files(packages, prefix)
+    ownership = prefix_ownership(prefix)
 
-        linkages = get_linkages(obj_files, prefix, sysroot)
-        pkgmap[name] = depmap = defaultdict(list)
+    for name in packages:
+        linkages = get_linkages(obj_files[name], prefix, sysroot)
+        depmap = defaultdict(list)
         for binary, paths in linkages.items():
             for lib, path in paths:
                 path = (
@@ -267,7 +300,7 @@ def inspect_linkages(
                     # ValueError: path is not relative to prefix
                     relative = None
                 if relative:
-                    precs = list(which_package(relative, prefix))
+                    precs = ownership.get(normcase(relative), [])
                     if len(precs) > 1:
                         get_logger(__name__).warning(
                             "Warning: %s comes from multiple packages: %s",
@@ -285,10 +318,50 @@ def inspect_linkages(
                     depmap["not found"].append((lib, path, binary))
                 else:
                     depmap["system"].append((lib, path, binary))
+        yield name, depmap
+
+
+def linkages_to_json(
+    name: str | _untracked_package,
+    depmap: dict[PrefixRecord | str, list[tuple[str, str, str]]],
+) -> str:
+    """A package's linkages (as yielded by iter_linkages) as a single line of JSON."""
+    return json.dumps(
+        {
+            "package": str(name),
+            "linkages": {
+                str(dep): [
+                    {"library": lib, "path": path, "binary": binary}
+                    for lib, path, binary in sorted(links)
+                ]
+                for dep, links in depmap.items()
+            },
+        }
+    )
+
+
+def inspect_linkages(
+    packages: Iterable[str | _untracked_package],
+    prefix: str | os.PathLike | Path = sys.prefix,
+    untracked: bool = False,
+    all_packages: bool = False,
+    show_files: bool = False,
+    groupby: Literal["package", "dependency"] = "package",
+    sysroot: str = "",
+) -> str:
+    pkgmap: dict[str | _untracked_package, dict[str, list]] = dict(
+        iter_linkages(
+            packages,
+            prefix=prefix,
+            untracked=untracked,
+            all_packages=all_packages,
+            sysroot=sysroot,
+        )
+    )
 
     output_string = ""
     if groupby == "package":
-        for pkg in packages:
+        for pkg in pkgmap:
             output_string += _underlined_text(pkg)
             output_string += print_linkages(pkgmap[pkg], show_files=show_files)
 
@@ -313,43 +386,52 @@ def inspect_linkages(
     return output_string
 
 
-def inspect_objects(
+def _get_object_info(file: str, prefix: Path) -> dict[str, str] | None:
+    path = join(prefix, file)
+    codefile = codefile_class(path, skip_symlinks=True)
+    if codefile == machofile:
+        return {
+            "filetype": human_filetype(path, None),
+            "rpath": ":".join(get_rpaths(path)),
+            "filename": file,
+        }
+    return None
+
+
+def iter_objects(
     packages: Iterable[str],
     prefix: str | os.PathLike | Path = sys.prefix,
-    groupby: str = "package",
-):
+    workers: int | None = None,
+) -> Iterator[tuple[str, list[dict[str, str]]]]:
+    """Yield the Mach-O object info of each package, analysing all of them in one thread
+    pool and yielding the packages (in order) as soon as their files are done."""
     if not on_mac:
         raise CondaBuildUserError(
             "`conda inspect objects` is only implemented on macOS"
         )
 
     prefix = Path(prefix)
-    installed = {prec.name: prec for prec in PrefixData(str(prefix)).iter_records()}
-
-    output_string = ""
-    for name in ensure_list(packages):
-        if name == untracked_package:
-            obj_files = get_untracked_obj_files(prefix)
-        elif name not in installed:
-            raise ValueError(f"Package {name} is not installed in {prefix}")
-        else:
-            obj_files = get_package_obj_files(installed[name], prefix)
+    packages = ensure_list(packages)
+    obj_files = _get_obj_files(packages, prefix, error=ValueError)
 
-        output_string += _underlined_text(name)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            name: [executor.submit(_get_object_info, file, prefix) for file in files]
+            for name, files in obj_files.items()
+        }
+        for name in packages:
+            info = [future.result() for future in futures[name]]
+            yield name, [f_info for f_info in info if f_info]
 
-        info = []
-        for f in obj_files:
-            path = join(prefix, f)
-            codefile = codefile_class(path, skip_symlinks=True)
-            if codefile == machofile:
-                info.append(
-                    {
-                        "filetype": human_filetype(path, None),
-                        "rpath": ":".join(get_rpaths(path)),
-                        "filename": f,
-                    }
-                )
 
+def inspect_objects(
+    packages: Iterable[str],
+    prefix: str | os.PathLike | Path = sys.prefix,
+    groupby: str = "package",
+):
+    output_string = ""
+    for name, info in iter_objects(packages, prefix=prefix):
+        output_string += _underlined_text(name)
         output_string += print_object_info(info, groupby)
     if hasattr(output_string, "decode"):
         output_string = output_string.decode("utf-8")
@@ -2,12 +2,15 @@
 # SPDX-License-Identifier: BSD-3-Clause
 from __future__ import annotations
 
+import ast
+import builtins
 import copy
 import hashlib
 import json
 import os
 import re
 import sys
+import threading
 import time
 import warnings
 from collections import OrderedDict
@@ -56,6 +59,8 @@ from .variants import (
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import CodeType
     from typing import Any, Literal, Self
 
     OutputDict = dict[str, Any]
@@ -69,13 +74,8 @@ except ImportError:
         "files of conda recipes)"
     )
 
-try:
-    Loader = yaml.CLoader
-except AttributeError:
-    Loader = yaml.Loader
-
 
-class StringifyNumbersLoader(Loader):
+class _StringifyNumbersMixin:
     @classmethod
     def remove_implicit_resolver(cls, tag):
         if "yaml_implicit_resolvers" not in cls.__dict__:
@@ -96,11 +96,29 @@ class StringifyNumbersLoader(Loader):
         if tag in cls.yaml_constructors:
             del cls.yaml_constructors[tag]
 
+    @classmethod
+    def stringify_numbers(cls):
+        for tag in ("tag:yaml.org,2002:float", "tag:yaml.org,2002:int"):
+            cls.remove_implicit_resolver(tag)
+            cls.remove_constructor(tag)
+
+
+class PyStringifyNumbersLoader(_StringifyNumbersMixin, yaml.SafeLoader):
+    """Pure-Python loader that leaves ints and floats as strings."""
+
+
+PyStringifyNumbersLoader.stringify_numbers()
+
+if getattr(yaml, "__with_libyaml__", False):
 
-StringifyNumbersLoader.remove_implicit_resolver("tag:yaml.org,2002:float")
-StringifyNumbersLoader.remove_implicit_resolver("tag:yaml.org,2002:int")
-StringifyNumbersLoader.remove_constructor("tag:yaml.org,2002:float")
-StringifyNumbersLoader.remove_constructor("tag:yaml.org,2002:int")
+    class CStringifyNumbersLoader(_StringifyNumbersMixin, yaml.CSafeLoader):
+        """libyaml-backed equivalent of :class:`PyStringifyNumbersLoader`."""
+
+    CStringifyNumbersLoader.stringify_numbers()
+    StringifyNumbersLoader = CStringifyNumbersLoader
+else:
+    CStringifyNumbersLoader = None
+    StringifyNumbersLoader = PyStringifyNumbersLoader
 
 # arches that don't follow exact names in the subdir need to be mapped here
 ARCH_MAP = {"32": "x86", "64": "x86_64"}
@@ -133,6 +151,9 @@ numpy_compatible_re = re.compile(r"pin_\w+\([\'\"]numpy[\'\"]")
 # used to avoid recomputing/rescanning recipe contents for used variables
 used_vars_cache = {}
 
+# serializes jinja2 rendering, which relies on process-global state
+_jinja_render_lock = threading.RLock()
+
 
 class OSModuleSubset:
     "Subset of os module names commonly used in selectors"
@@ -325,23 +346,102 @@ def evalidate_model():
     return model
 
 
-# We evaluate the selector and return True (keep this line) or False (drop this line)
-# If we encounter a NameError (unknown variable in selector), then we replace it by False and
-#     re-run the evaluation
-def eval_selector(selector_string, namespace, variants_in_place, unsafe=False):
+# Validated and compiled selectors by selector text, shared by all renders so that the
+#     same few selectors (``[win]``, ``[py<38]``, ...) are only ever compiled once.
+SELECTOR_CACHE_SIZE = 4096
+
+# names that resolve without being in the namespace, i.e. are never unknown selectors
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+class _CompiledSelector(NamedTuple):
+    node: ast.Expression
+    code: CodeType
+    # the free variables the selector looks up
+    names: frozenset[str]
+
+
+class _UnknownNamesToFalse(ast.NodeTransformer):
+    def __init__(self, names: frozenset[str]) -> None:
+        self.names = names
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if isinstance(node.ctx, ast.Load) and node.id in self.names:
+            return ast.copy_location(ast.Constant(False), node)
+        return node
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _compile_selector(selector_string: str, unsafe: bool = False) -> _CompiledSelector:
+    selector_string = selector_string.lstrip()
     if unsafe:
-        expression = selector_string
+        node = ast.parse(selector_string, "<selector>", "eval")
+        code = compile(node, "<selector>", "eval")
     else:
-        expression = Expr(selector_string.lstrip(), model=evalidate_model()).code
-    try:
-        return eval(expression, {}, namespace)
-    except NameError as e:
-        missing_var = parseNameNotFound(e)
-        if variants_in_place:
-            log = utils.get_logger(__name__)
-            log.debug("Treating unknown selector '%s' as if it was False.", missing_var)
-        next_string = selector_string.replace(missing_var, "False")
-        return eval_selector(next_string, namespace, variants_in_place, unsafe=unsafe)
+        expr = Expr(selector_string, model=evalidate_model())
+        node, code = expr.node, expr.code
+
+    loaded, bound = set(), set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            (loaded if isinstance(child.ctx, ast.Load) else bound).add(child.id)
+        elif isinstance(child, ast.arg):
+            bound.add(child.arg)
+    return _CompiledSelector(node, code, frozenset(loaded - bound))
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _compile_selector_without(
+    selector_string: str, unsafe: bool, unknown: frozenset[str]
+) -> CodeType:
+    """Compile the selector with the ``unknown`` names replaced by ``False``."""
+    node = copy.deepcopy(_compile_selector(selector_string, unsafe).node)
+    node = ast.fix_missing_locations(_UnknownNamesToFalse(unknown).visit(node))
+    return compile(node, "<selector>", "eval")
+
+
+# We evaluate the selector and return True (keep this line) or False (drop this line)
+# Names that are unknown (not in the namespace) are replaced by False before evaluation
+def eval_selector(selector_string, namespace, variants_in_place, unsafe=False):
+    compiled = _compile_selector(selector_string, unsafe)
+    unknown = frozenset(
+        name
+        for name in compiled.names
+        if name not in namespace and name not in _BUILTIN_NAMES
+    )
+    while True:
+        if unknown:
+            if variants_in_place:
+                log = utils.get_logger(__name__)
+                for name in sorted(unknown):
+                    log.debug(
+                        "Treating unknown selector '%s' as if it was False.", name
+                    )
+            code = _compile_selector_without(selector_string, unsafe, unknown)
+        else:
+            code = compiled.code
+        try:
+            return eval(code, {}, namespace)
+        except NameError as e:
+            # a name that is out of reach of the expression's scope (e.g. looked up from
+            #     within a comprehension), which is treated as unknown as well
+            missing_var = parseNameNotFound(e)
+            if not missing_var or missing_var in unknown:
+                raise
+            unknown |= {missing_var}
+
+
+def eval_selectors(
+    selectors: Iterable[str],
+    namespace: dict[str, Any],
+    variants_in_place: bool,
+    unsafe: bool = False,
+) -> dict[str, Any]:
+    """Evaluate each distinct selector of ``selectors`` once against ``namespace``."""
+    return {
+        selector: eval_selector(selector, namespace, variants_in_place, unsafe=unsafe)
+        for selector in dict.fromkeys(selectors)
+    }
 
 
 @cache
@@ -380,35 +480,44 @@ def _split_line_selector(text: str) -> tuple[tuple[str | None, str], ...]:
 
 
 def select_lines(text: str, namespace: dict[str, Any], variants_in_place: bool) -> str:
-    lines = []
-    selector_cache: dict[str, bool] = {}
-    for i, (selector, line) in enumerate(_split_line_selector(text)):
-        if not selector:
-            # no selector? include line as is
-            lines.append(line)
-        else:
-            # include lines with a selector that evaluates to True
-            try:
-                if selector_cache[selector]:
-                    lines.append(line)
-            except KeyError:
-                # KeyError: cache miss
-                try:
-                    value = bool(eval_selector(selector, namespace, variants_in_place))
-                    selector_cache[selector] = value
-                    if value:
-                        lines.append(line)
-                except Exception as e:
-                    raise CondaBuildUserError(
-                        f"Invalid selector in meta.yaml line {i + 1}:\n"
-                        f"offending selector:\n"
-                        f"  [{selector}]\n"
-                        f"exception:\n"
-                        f"  {e.__class__.__name__}: {e}\n"
-                    )
+    split = _split_line_selector(text)
+    try:
+        values = eval_selectors(
+            (selector for selector, _ in split if selector),
+            namespace,
+            variants_in_place,
+        )
+    except Exception:
+        _raise_invalid_selector(split, namespace, variants_in_place)
+        raise
+
+    # include lines without a selector as is, and those with a selector that evaluates
+    #     to True
+    lines = [line for selector, line in split if not selector or values[selector]]
     return "\n".join(lines) + "\n"
 
 
+def _raise_invalid_selector(
+    split: tuple[tuple[str | None, str], ...],
+    namespace: dict[str, Any],
+    variants_in_place: bool,
+) -> None:
+    # find the first line with a selector that can't be evaluated
+    for i, (selector, _) in enumerate(split):
+        if not selector:
+            continue
+        try:
+            eval_selector(selector, namespace, variants_in_place)
+        except Exception as e:
+            raise CondaBuildUserError(
+                f"Invalid selector in meta.yaml line {i + 1}:\n"
+                f"offending selector:\n"
+                f"  [{selector}]\n"
+                f"exception:\n"
+                f"  {e.__class__.__name__}: {e}\n"
+            )
+
+
 def yamlize(data):
     try:
         return yaml.load(data, Loader=StringifyNumbersLoader)
@@ -2044,9 +2153,6 @@ class MetaData:
 
         undefined_type = jinja2.StrictUndefined
         if permit_undefined_jinja:
-            # The UndefinedNeverFail class keeps a global list of all undefined names
-            # Clear any leftover names from the last parse.
-            UndefinedNeverFail.all_undefined_names = []
             undefined_type = UndefinedNeverFail
 
         loader = FilteredLoader(jinja2.ChoiceLoader(loaders), config=self.config)
@@ -2089,13 +2195,26 @@ class MetaData:
             else:
                 template = env.from_string("")
 
-            os.environ["CONDA_BUILD_STATE"] = "RENDER"
-            rendered = template.render(environment=env)
+            # the undefined name list and CONDA_BUILD_STATE are process-global, hold the
+            #    lock so that recipes rendered concurrently don't see each other's state
+            with _jinja_render_lock:
+                try:
+                    if permit_undefined_jinja:
+                        # The UndefinedNeverFail class keeps a global list of all undefined
+                        # names. Clear any leftover names from the last parse.
+                        UndefinedNeverFail.all_undefined_names = []
 
-            if permit_undefined_jinja:
-                self.undefined_jinja_vars = UndefinedNeverFail.all_undefined_names
-            else:
-                self.undefined_jinja_vars = []
+                    os.environ["CONDA_BUILD_STATE"] = "RENDER"
+                    rendered = template.render(environment=env)
+
+                    if permit_undefined_jinja:
+                        self.undefined_jinja_vars = (
+                            UndefinedNeverFail.all_undefined_names
+                        )
+                    else:
+                        self.undefined_jinja_vars = []
+                finally:
+                    os.environ.pop("CONDA_BUILD_STATE", None)
 
         except jinja2.TemplateError as ex:
             if "'None' has not attribute" in str(ex):
@@ -2103,9 +2222,6 @@ class MetaData:
             raise CondaBuildUserError(
                 f"Failed to render jinja template in {self.meta_path}:\n{str(ex)}"
             )
-        finally:
-            if "CONDA_BUILD_STATE" in os.environ:
-                del os.environ["CONDA_BUILD_STATE"]
         return rendered
 
     def __unicode__(self):
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from functools import cache
 from os.path import basename
 from pathlib import Path
@@ -13,7 +14,7 @@ from conda.misc import untracked
 
 from ..utils import on_linux, on_mac
 from .macho import otool
-from .pyldd import codefile_class, inspect_linkages, machofile
+from .pyldd import classify_files, codefile_class, inspect_linkages, machofile
 
 if TYPE_CHECKING:
     import os
@@ -63,69 +64,79 @@ def _get_linkages(
     prefix: Path,
     sysroot: str,
 ) -> dict[str, list[tuple[str, str]]]:
-    linkages = {}
-    for file in obj_files:
-        # Detect the filetype to emulate what the system-native tool does.
-        path = prefix / file
-        if codefile_class(path) == machofile:
-            resolve_filenames = False
-            recurse = False
-        else:
-            resolve_filenames = True
-            recurse = True
-        ldd_emulate = [
-            (basename(link), link)
-            for link in inspect_linkages(
-                path,
-                resolve_filenames=resolve_filenames,
-                sysroot=sysroot,
-                recurse=recurse,
+    with ThreadPoolExecutor() as executor:
+        return dict(
+            zip(
+                obj_files,
+                executor.map(
+                    lambda file: get_file_linkages(prefix / file, sysroot), obj_files
+                ),
             )
-        ]
-
-        try:
-            if on_linux:
-                ldd_computed = ldd(path)
-            elif on_mac:
-                ldd_computed = [
-                    (basename(link["name"]), link["name"]) for link in otool(path)
+        )
+
+
+def get_file_linkages(path: Path, sysroot: str) -> list[tuple[str, str]]:
+    """The (library name, resolved path) pairs the object file at ``path`` links to."""
+    # Detect the filetype to emulate what the system-native tool does.
+    if codefile_class(path) == machofile:
+        resolve_filenames = False
+        recurse = False
+    else:
+        resolve_filenames = True
+        recurse = True
+    ldd_emulate = [
+        (basename(link), link)
+        for link in inspect_linkages(
+            path,
+            resolve_filenames=resolve_filenames,
+            sysroot=sysroot,
+            recurse=recurse,
+        )
+    ]
+
+    try:
+        if on_linux:
+            ldd_computed = ldd(path)
+        elif on_mac:
+            ldd_computed = [
+                (basename(link["name"]), link["name"]) for link in otool(path)
+            ]
+    except:
+        # ldd quite often fails on foreign architectures, fallback to
+        ldd_computed = ldd_emulate
+
+    if set(ldd_computed) != set(ldd_emulate):
+        # a single print so the warnings of files inspected concurrently don't interleave
+        print(
+            "\n".join(
+                [
+                    "WARNING: pyldd disagrees with ldd/otool. This will not cause any",
+                    "WARNING: problems for this build, but please file a bug at:",
+                    "WARNING: https://github.com/conda/conda-build",
+                    f"WARNING: and (if possible) attach file {path}",
+                    "WARNING:",
+                    "  ldd/otool gives:",
+                    "    " + "\n    ".join(map(str, ldd_computed)),
+                    "  pyldd gives:",
+                    "    " + "\n    ".join(map(str, ldd_emulate)),
+                    f"Diffs\n{set(ldd_computed) - set(ldd_emulate)}",
+                    f"Diffs\n{set(ldd_emulate) - set(ldd_computed)}",
                 ]
-        except:
-            # ldd quite often fails on foreign architectures, fallback to
-            ldd_computed = ldd_emulate
-
-        if set(ldd_computed) != set(ldd_emulate):
-            print("WARNING: pyldd disagrees with ldd/otool. This will not cause any")
-            print("WARNING: problems for this build, but please file a bug at:")
-            print("WARNING: https://github.com/conda/conda-build")
-            print(f"WARNING: and (if possible) attach file {path}")
-            print("WARNING:")
-            print("  ldd/otool gives:")
-            print("    " + "\n    ".join(map(str, ldd_computed)))
-            print("  pyldd gives:")
-            print("    " + "\n    ".join(map(str, ldd_emulate)))
-            print(f"Diffs\n{set(ldd_computed) - set(ldd_emulate)}")
-            print(f"Diffs\n{set(ldd_emulate) - set(ldd_computed)}")
-
-        linkages[file] = ldd_computed
-    return linkages
+            )
+        )
+
+    return ldd_computed
 
 
 @cache
 def get_package_obj_files(
     prec: PrefixRecord, prefix: str | os.PathLike | Path
 ) -> list[str]:
-    return [
-        file
-        for file in prec["files"]
-        if codefile_class(Path(prefix, file), skip_symlinks=True)
-    ]
+    classes = classify_files(prefix, prec["files"], skip_symlinks=True)
+    return [file for file, codefile in classes.items() if codefile]
 
 
 @cache
 def get_untracked_obj_files(prefix: str | os.PathLike | Path) -> list[str]:
-    return [
-        file
-        for file in untracked(str(prefix))
-        if codefile_class(Path(prefix, file), skip_symlinks=True)
-    ]
+    classes = classify_files(prefix, untracked(str(prefix)), skip_symlinks=True)
+    return [file for file, codefile in classes.items() if codefile]
@@ -7,13 +7,20 @@ import glob
 import logging
 import os
 import re
+import stat
 import struct
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from ..utils import ensure_list, get_logger, on_linux, on_mac, on_win
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 logging.basicConfig(level=logging.INFO)
 
 
@@ -602,6 +609,8 @@ SHT_GROUP = 0x11
 SHT_SYMTAB_SHNDX = 0x12
 SHT_NUM = 0x13
 SHT_LOOS = 0x60000000
+SHT_GNU_VERDEF = 0x6FFFFFFD
+SHT_GNU_VERNEED = 0x6FFFFFFE
 
 SHF_WRITE = 0x1
 SHF_ALLOC = 0x2
@@ -648,6 +657,11 @@ DT_FINI_ARRAY = 26
 DT_INIT_ARRAYSZ = 27
 DT_FINI_ARRAYSZ = 28
 DT_RUNPATH = 29
+DT_CONFIG = 0x6FFFFEFA
+DT_DEPAUDIT = 0x6FFFFEFB
+DT_AUDIT = 0x6FFFFEFC
+DT_AUXILIARY = 0x7FFFFFFD
+DT_FILTER = 0x7FFFFFFF
 DT_LOOS = 0x60000000
 DT_HIOS = 0x6FFFFFFF
 DT_LOPROC = 0x70000000
@@ -956,6 +970,190 @@ class elffile(UnixExecutable):
         return self.dt_soname
 
 
+class elfdynamic:
+    """The dynamic section of an ELF file and the string table its entries refer to.
+
+    Keeps the file offsets of both so that DT_RPATH/DT_RUNPATH entries can be rewritten
+    in place (see set_elf_rpath) without spawning patchelf.
+    """
+
+    # dynamic entries whose value is an offset into the dynamic string table
+    STRING_TAGS = (
+        DT_NEEDED,
+        DT_SONAME,
+        DT_RPATH,
+        DT_RUNPATH,
+        DT_CONFIG,
+        DT_DEPAUDIT,
+        DT_AUDIT,
+        DT_AUXILIARY,
+        DT_FILTER,
+    )
+
+    def __init__(self, file):
+        self.elf = elf = elffile(file)
+        endian = elf.ehdr.endian
+        entry = struct.Struct(endian + elf.ehdr.ptr_type * 2)
+        # (file offset, d_tag, d_val) for every entry before DT_NULL
+        self.entries = []
+        self.strtab = None
+        self.strtab_offset = None
+        self.strtab_section = None
+        for es in elf.elfsections:
+            if es.sh_type != SHT_DYNAMIC or not es.sh_entsize:
+                continue
+            for m in range(int(es.sh_size / es.sh_entsize)):
+                offset = es.sh_offset + (m * es.sh_entsize)
+                file.seek(offset)
+                d_tag, d_val = entry.unpack(file.read(entry.size))
+                if d_tag == DT_NULL:
+                    break
+                self.entries.append((offset, d_tag, d_val))
+            break
+        strtab_ptr = next(
+            (val for _, tag, val in self.entries if tag == DT_STRTAB), None
+        )
+        if strtab_ptr is not None:
+            strsec, offset = elf.find_section_and_offset(strtab_ptr)
+            if strsec and strsec.sh_type == SHT_STRTAB:
+                self.strtab_section = strsec
+                self.strtab_offset = strsec.sh_offset + offset
+                file.seek(self.strtab_offset)
+                self.strtab = file.read(strsec.sh_size - offset)
+
+    def string(self, offset):
+        return self.strtab[offset : self.strtab.index(b"\0", offset)].decode()
+
+    def rpath_entries(self):
+        return [
+            (offset, tag, val)
+            for offset, tag, val in self.entries
+            if tag in (DT_RPATH, DT_RUNPATH)
+        ]
+
+    def string_references(self, file):
+        """Offsets into the dynamic string table of everything that refers to it: the
+        dynamic entries, the dynamic symbols and the GNU symbol versioning sections."""
+        endian = self.elf.ehdr.endian
+        u16 = struct.Struct(endian + "H")
+        u32 = struct.Struct(endian + "L")
+
+        def read(fmt, offset):
+            file.seek(offset)
+            return fmt.unpack(file.read(fmt.size))[0]
+
+        refs = [val for _, tag, val in self.entries if tag in self.STRING_TAGS]
+        for es in self.elf.elfsections:
+            if es.sh_type == SHT_DYNSYM and es.sh_entsize:
+                # st_name is the first (32 bit) member of both Elf32_Sym and Elf64_Sym
+                refs.extend(
+                    read(u32, es.sh_offset + (n * es.sh_entsize))
+                    for n in range(int(es.sh_size / es.sh_entsize))
+                )
+            elif es.sh_type in (SHT_GNU_VERDEF, SHT_GNU_VERNEED):
+                verdef = es.sh_type == SHT_GNU_VERDEF
+                offset = es.sh_offset
+                for _ in range(es.sh_info):
+                    count = read(u16, offset + (6 if verdef else 2))
+                    if not verdef:
+                        refs.append(read(u32, offset + 4))  # vn_file
+                    aux = offset + read(u32, offset + (12 if verdef else 8))
+                    for _ in range(count):
+                        # vda_name / vna_name
+                        refs.append(read(u32, aux + (0 if verdef else 8)))
+                        aux += read(u32, aux + (4 if verdef else 12))
+                    next_offset = read(u32, offset + (16 if verdef else 12))
+                    if not next_offset:
+                        break
+                    offset += next_offset
+        return refs
+
+
+def _read_elf_dynamic(file):
+    (magic,) = struct.unpack(BIG_ENDIAN + "L", file.read(4))
+    file.seek(0)
+    if magic != ELF_HDR:
+        return None
+    try:
+        dynamic = elfdynamic(ReadCheckWrapper(file))
+    except (IncompleteRead, struct.error, ValueError):
+        return None
+    if dynamic.strtab is None and dynamic.rpath_entries():
+        return None
+    return dynamic
+
+
+def get_elf_rpath(path):
+    """The DT_RUNPATH (or, failing that, DT_RPATH) of an ELF file as a list of paths.
+
+    Mirrors `patchelf --print-rpath` and returns None when the file cannot be parsed.
+    """
+    with open(path, "rb") as f:
+        dynamic = _read_elf_dynamic(f)
+    if dynamic is None:
+        return None
+    entries = {tag: val for _, tag, val in dynamic.rpath_entries()}
+    for tag in (DT_RUNPATH, DT_RPATH):
+        if tag in entries:
+            return dynamic.string(entries[tag]).split(":")
+    return []
+
+
+def set_elf_rpath(path, rpath):
+    """Set the rpath of an ELF file in place, like `patchelf --force-rpath --set-rpath`.
+
+    Only the existing DT_RPATH/DT_RUNPATH string is overwritten (and the entry turned into
+    a DT_RPATH), so this only works when the new rpath is no longer than the old one and
+    that string is not shared with anything else in the dynamic string table.  Returns
+    False when the file has to be rewritten by patchelf instead.
+    """
+    new = rpath.encode()
+    try:
+        f = open(path, "r+b")
+    except OSError:
+        return False
+    with f:
+        dynamic = _read_elf_dynamic(f)
+        if dynamic is None:
+            return False
+        entries = dynamic.rpath_entries()
+        if not entries:
+            # there is no string to overwrite, adding one means growing the table
+            return not new
+        if len(entries) != 1:
+            return False
+        offset, tag, val = entries[0]
+        try:
+            end = dynamic.strtab.index(b"\0", val)
+        except ValueError:
+            return False
+        if len(new) > end - val:
+            return False
+        if dynamic.strtab[val:end] == new and tag == DT_RPATH:
+            return True
+        try:
+            refs = dynamic.string_references(f)
+        except (struct.error, ValueError):
+            return False
+
+        # linkers merge strings with common tails, so check that nothing else points
+        # into the string we are about to overwrite, or to a longer string ending in it
+        def shares_rpath(ref):
+            if ref < val:
+                return dynamic.strtab.find(b"\0", ref) == end
+            return ref <= end
+
+        if sum(map(shares_rpath, refs)) != 1:
+            return False
+        f.seek(dynamic.strtab_offset + val)
+        f.write(new + b"\0" * (end - val - len(new) + 1))
+        if tag != DT_RPATH:
+            ehdr = dynamic.elf.ehdr
+            f.seek(offset)
+            f.write(struct.pack(ehdr.endian + ehdr.ptr_type, DT_RPATH))
+    return True
+
+
 class inscrutablefile(UnixExecutable):
     def __init__(self, file, initial_rpaths_transitive=[]):
         self._dir = None
@@ -1014,33 +1212,43 @@ def codefile(file, arch="any", initial_rpaths_transitive=[]):
         return inscrutablefile(file, list(initial_rpaths_transitive))
 
 
-def codefile_class(
-    path: str | os.PathLike | Path,
-    skip_symlinks: bool = False,
-) -> type[DLLfile | EXEfile | machofile | elffile] | None:
-    # same signature as conda.os_utils.liefldd.codefile_class
-    path = Path(path)
-    if skip_symlinks and path.is_symlink():
-        return None
-    path = path.resolve()
+# codefile_class results keyed by (st_dev, st_ino, st_mtime_ns, st_size, suffix) of the
+# (resolved) file, so that the post-processing stages of an output share them
+_codefile_classes: dict[tuple[int, int, int, int, str], type | None] = {}
 
-    def _get_magic_bit(path: Path) -> bytes:
-        with path.open("rb") as handle:
-            bit = handle.read(4)
-        return struct.unpack(BIG_ENDIAN + "L", bit)[0]
+# bound on the entries of the cache above
+CODEFILE_CLASS_CACHE_SIZE = 1 << 16
 
-    if path.is_dir():
-        return None
-    elif path.suffix.lower() in (".dll", ".pyd"):
+# guards the cache above, files are classified by a pool of threads
+_codefile_classes_lock = threading.Lock()
+
+
+def clear_codefile_class_cache() -> None:
+    with _codefile_classes_lock:
+        _codefile_classes.clear()
+
+
+def _read_magic(path: Path) -> bytes:
+    with path.open("rb") as handle:
+        return handle.read(4)
+
+
+def codefile_class_from_header(
+    path: str | os.PathLike | Path,
+    header: bytes,
+) -> type[DLLfile | EXEfile | machofile | elffile] | None:
+    """codefile_class of ``path`` given the first (4 or more) bytes of the file."""
+    suffix = Path(path).suffix.lower()
+    if suffix in (".dll", ".pyd"):
         return DLLfile
-    elif path.suffix.lower() == ".exe":
+    elif suffix == ".exe":
         return EXEfile
-    elif path.suffix.lower() == ".class":
+    elif suffix == ".class":
         # Java .class files share 0xCAFEBABE with Mach-O FAT_MAGIC.
         return None
-    elif not path.exists() or path.stat().st_size < 4:
+    elif len(header) < 4:
         return None
-    elif (magic := _get_magic_bit(path)) == ELF_HDR:
+    elif (magic := struct.unpack(BIG_ENDIAN + "L", header[:4])[0]) == ELF_HDR:
         return elffile
     elif magic in (FAT_MAGIC, MH_MAGIC, MH_CIGAM, MH_CIGAM_64):
         return machofile
@@ -1048,6 +1256,65 @@ def codefile_class(
         return None
 
 
+def codefile_class(
+    path: str | os.PathLike | Path,
+    skip_symlinks: bool = False,
+) -> type[DLLfile | EXEfile | machofile | elffile] | None:
+    # same signature as conda.os_utils.liefldd.codefile_class
+    path = Path(path)
+    try:
+        st = path.lstat()
+        if stat.S_ISLNK(st.st_mode):
+            if skip_symlinks:
+                return None
+            path = path.resolve()
+            st = path.stat()
+    except OSError:
+        return None
+
+    if stat.S_ISDIR(st.st_mode):
+        return None
+    suffix = path.suffix.lower()
+    key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size, suffix)
+    with _codefile_classes_lock:
+        try:
+            return _codefile_classes[key]
+        except KeyError:
+            pass
+
+    if suffix in (".dll", ".pyd", ".exe", ".class") or st.st_size < 4:
+        header = b""
+    else:
+        header = _read_magic(path)
+    result = codefile_class_from_header(path, header)
+    with _codefile_classes_lock:
+        if len(_codefile_classes) >= CODEFILE_CLASS_CACHE_SIZE:
+            # evict the oldest entry
+            del _codefile_classes[next(iter(_codefile_classes))]
+        _codefile_classes[key] = result
+    return result
+
+
+def classify_files(
+    prefix: str | os.PathLike | Path,
+    files: Iterable[str],
+    skip_symlinks: bool = True,
+    workers: int | None = None,
+) -> dict[str, type[DLLfile | EXEfile | machofile | elffile] | None]:
+    """codefile_class of each of ``files`` (relative to ``prefix``).
+
+    The files are read in a thread pool and the results land in the codefile_class cache,
+    so later codefile_class calls on the same files don't touch their contents again.
+    """
+    files = list(files)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        classes = executor.map(
+            partial(codefile_class, skip_symlinks=skip_symlinks),
+            (Path(prefix, file) for file in files),
+        )
+        return dict(zip(files, classes))
+
+
 def _trim_sysroot(sysroot: str) -> str:
     if sysroot:
         while sysroot.endswith("/") or sysroot.endswith("\\"):
@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: BSD-3-Clause
 from __future__ import annotations
 
+import codecs
 import json
 import locale
 import os
@@ -11,6 +12,7 @@ import stat
 import sys
 import traceback
 from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
 from fnmatch import filter as fnmatch_filter
 from fnmatch import fnmatch
@@ -57,10 +59,16 @@ from .os_utils.liefldd import (
 from .os_utils.pyldd import (
     DLLfile,
     EXEfile,
+    classify_files,
+    clear_codefile_class_cache,
     codefile_class,
+    codefile_class_from_header,
     elffile,
+    get_elf_rpath,
     machofile,
+    set_elf_rpath,
 )
+from .profiling import timed
 from .utils import (
     FALLBACK_MENUINST_SCHEMA,
     VALID_SCHEMA_LOCATIONS,
@@ -87,74 +95,165 @@ GNU_ARCH_MAP = {
 }
 
 
-def fix_shebang(f, prefix, build_python, osx_is_app=False):
-    path = join(prefix, f)
-    if codefile_class(path, skip_symlinks=True):
-        return
-    elif islink(path):
-        return
-    elif not isfile(path):
-        return
-
-    if os.stat(path).st_size == 0:
-        return
+SHEBANG_PAT = re.compile(rb"^#!.+$", re.M)
+PYTHON_SHEBANG_PAT = re.compile(rb"\/python[w]?(?:$|\s|\Z)", re.M)
 
-    bytes_ = False
 
-    os.chmod(path, 0o775)
-    with open(path, mode="r+", encoding=locale.getpreferredencoding()) as fi:
-        try:
-            data = fi.read(100)
-            fi.seek(0)
-        except UnicodeDecodeError:  # file is binary
-            return
-
-        SHEBANG_PAT = re.compile(r"^#!.+$", re.M)
-
-        # regexp on the memory mapped file so we only read it into
-        # memory if the regexp matches.
-        try:
-            mm = utils.mmap_mmap(
-                fi.fileno(), 0, tagname=None, flags=utils.mmap_MAP_PRIVATE
-            )
-        except OSError:
-            mm = fi.read()
-        try:
-            m = SHEBANG_PAT.match(mm)
-        except TypeError:
-            SHEBANG_PAT = re.compile(rb"^#!.+$", re.M)
-            bytes_ = True
-            m = SHEBANG_PAT.match(mm)
-
-        if m:
-            python_pattern = (
-                re.compile(rb"\/python[w]?(?:$|\s|\Z)", re.M)
-                if bytes_
-                else re.compile(r"\/python[w]?(:$|\s|\Z)", re.M)
-            )
-            if not re.search(python_pattern, m.group()):
-                return
-        else:
-            return
+def _rewrite_shebang(fi, header, prefix, build_python, osx_is_app=False):
+    """Point a python shebang at the prefix's python.  ``fi`` is the script opened in
+    "rb+" mode and positioned after its first bytes, ``header``.  Returns whether the
+    script was rewritten."""
+    if not header.startswith(b"#!"):
+        return False
+    data = header + fi.read()
+    # skip binary files
+    try:
+        codecs.getincrementaldecoder(locale.getpreferredencoding())().decode(data[:100])
+    except UnicodeDecodeError:
+        return False
 
-        data = mm[:]
+    m = SHEBANG_PAT.match(data)
+    if not m or not PYTHON_SHEBANG_PAT.search(m.group()):
+        return False
 
     py_exec = "#!" + (
         "/bin/bash " + prefix + "/bin/pythonw"
         if on_mac and osx_is_app
         else prefix + "/bin/" + basename(build_python)
     )
-    if bytes_ and hasattr(py_exec, "encode"):
-        py_exec = py_exec.encode()
-    new_data = SHEBANG_PAT.sub(py_exec, data, count=1)
+    new_data = SHEBANG_PAT.sub(py_exec.encode(), data, count=1)
     if new_data == data:
+        return False
+    fi.seek(0)
+    fi.write(new_data)
+    fi.truncate()
+    return True
+
+
+def _normalized_mode(mode):
+    # broadcast execute
+    if mode & stat.S_IXUSR:
+        mode = mode | stat.S_IXGRP | stat.S_IXOTH
+    # ensure user and group can write and all can read
+    return (
+        mode | stat.S_IWUSR | stat.S_IWGRP | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+    )
+
+
+def _open_for_update(path, st):
+    try:
+        return open(path, "rb+")
+    except PermissionError:
+        os.chmod(path, stat.S_IMODE(st.st_mode) | stat.S_IRUSR | stat.S_IWUSR)
+        return open(path, "rb+")
+
+
+def fix_file(
+    f,
+    prefix,
+    build_python=None,
+    osx_is_app=False,
+    break_hardlinks=True,
+    fix_shebangs=True,
+    normalize_permissions=True,
+):
+    """Break hardlinks to ``f``, point its python shebang at ``prefix`` (for bin/ scripts)
+    and normalize its permissions, with a single stat and at most one open of the file.
+
+    Returns the changes made, out of "hardlink", "shebang" and "permissions".
+    """
+    path = join(prefix, f)
+    changes = []
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return changes
+    if stat.S_ISLNK(st.st_mode):
+        return changes
+    if break_hardlinks and st.st_nlink > 1:
+        _copy_over_hardlink(path)
+        changes.append("hardlink")
+
+    mode = stat.S_IMODE(st.st_mode)
+    new_mode = _normalized_mode(mode) if normalize_permissions else mode
+    if not (
+        fix_shebangs
+        and f.startswith("bin/")
+        and stat.S_ISREG(st.st_mode)
+        and st.st_size
+    ):
+        if new_mode != mode:
+            try:
+                lchmod(path, new_mode)
+            except (OSError, utils.PermissionError) as e:
+                utils.get_logger(__name__).warning(str(e))
+            else:
+                changes.append("permissions")
+        return changes
+
+    with _open_for_update(path, st) as fi:
+        header = fi.read(4)
+        if codefile_class_from_header(path, header):
+            os.chmod(path, new_mode)
+        else:
+            # scripts in bin/ are made executable
+            new_mode = 0o775
+            os.chmod(path, new_mode)
+            if _rewrite_shebang(fi, header, prefix, build_python, osx_is_app):
+                print("updating shebang:", f)
+                changes.append("shebang")
+    if new_mode != mode:
+        changes.append("permissions")
+    return changes
+
+
+def fix_files(
+    files,
+    prefix,
+    build_python=None,
+    osx_is_app=False,
+    break_hardlinks=True,
+    fix_shebangs=True,
+    normalize_permissions=True,
+):
+    """Apply fix_file to each of ``files`` in a thread pool.
+
+    Returns the files that had their hardlinks broken, their shebang rewritten or their
+    permissions changed, keyed by "hardlink", "shebang" and "permissions".
+    """
+    fix = partial(
+        fix_file,
+        prefix=prefix,
+        build_python=build_python,
+        osx_is_app=osx_is_app,
+        break_hardlinks=break_hardlinks,
+        fix_shebangs=fix_shebangs,
+        normalize_permissions=normalize_permissions,
+    )
+    changed = {"hardlink": [], "shebang": [], "permissions": []}
+    files = sorted(files)
+    with ThreadPoolExecutor() as executor:
+        for f, changes in zip(files, executor.map(fix, files)):
+            for change in changes:
+                changed[change].append(f)
+    return changed
+
+
+def fix_shebang(f, prefix, build_python, osx_is_app=False):
+    path = join(prefix, f)
+    if islink(path) or not isfile(path):
         return
-    print("updating shebang:", f)
-    with open(path, "w", encoding=locale.getpreferredencoding()) as fo:
-        try:
-            fo.write(new_data)
-        except TypeError:
-            fo.write(new_data.decode())
+    st = os.stat(path)
+    if st.st_size == 0:
+        return
+
+    with _open_for_update(path, st) as fi:
+        header = fi.read(4)
+        if codefile_class_from_header(path, header):
+            return
+        os.chmod(path, 0o775)
+        if _rewrite_shebang(fi, header, prefix, build_python, osx_is_app):
+            print("updating shebang:", f)
 
 
 def write_pth(egg_path, config):
@@ -582,14 +681,9 @@ def check_binary_patchers(elf, prefix, rpath):
 """
 
 
-def mk_relative_linux(f, prefix, rpaths=("lib",), method=None):
-    "Respects the original values and converts abs to $ORIGIN-relative"
-
-    elf = join(prefix, f)
-    origin = dirname(elf)
-
+def _get_rpaths_patchelf_lief(elf, patchelf, method=None):
+    """Read the existing rpath of ``elf`` with patchelf and LIEF, warning when they disagree."""
     existing_pe = None
-    patchelf = external.find_executable("patchelf", prefix)
     if not patchelf:
         print(
             f"ERROR :: You should install patchelf, will proceed with LIEF for {elf} (was {method})"
@@ -637,6 +731,36 @@ def mk_relative_linux(f, prefix, rpaths=("lib",), method=None):
         # Use LIEF if method is LIEF to get the initial value?
         if method == "LIEF":
             existing = existing2
+    return existing, method
+
+
+def mk_relative_linux(
+    f, prefix, rpaths=("lib",), method=None, patchelf=None, verify=False
+):
+    """Respects the original values and converts abs to $ORIGIN-relative
+
+    Unless ``method`` asks for patchelf or LIEF, the rpath is read and rewritten in-process
+    (see pyldd.set_elf_rpath) and patchelf is only run when the new rpath does not fit in
+    the dynamic string table.  With ``verify`` the rpath is also read with patchelf and
+    LIEF, and the rewritten file is read back.
+    """
+
+    elf = join(prefix, f)
+    origin = dirname(elf)
+    if patchelf is None:
+        patchelf = external.find_executable("patchelf", prefix)
+
+    existing = None
+    if not method:
+        existing = get_elf_rpath(elf)
+    if existing is None or verify:
+        checked, checked_method = _get_rpaths_patchelf_lief(elf, patchelf, method)
+        if existing is None:
+            existing, method = checked, checked_method
+        elif checked is not None and checked != existing:
+            print(
+                f"WARNING :: get_elf_rpath()={existing} and patchelf/LIEF={checked} disagree for {elf} :: "
+            )
     new = []
     for old in existing:
         if old.startswith("$ORIGIN"):
@@ -660,10 +784,22 @@ def mk_relative_linux(f, prefix, rpaths=("lib",), method=None):
     rpath = ":".join(new)
 
     # check_binary_patchers(elf, prefix, rpath)
-    if not patchelf or (method and method.upper() == "LIEF"):
+    if method and method.upper() == "LIEF":
         set_rpath(old_matching="*", new_rpath=rpath, file=elf)
-    else:
-        call([patchelf, "--force-rpath", "--set-rpath", rpath, elf])
+    elif method or not set_elf_rpath(elf, rpath):
+        # the rpath doesn't fit in place, patchelf has to grow the string table
+        if patchelf:
+            call([patchelf, "--force-rpath", "--set-rpath", rpath, elf])
+        else:
+            print(
+                f"ERROR :: You should install patchelf, will proceed with LIEF for {elf} (was {method})"
+            )
+            set_rpath(old_matching="*", new_rpath=rpath, file=elf)
+    if verify and (written := get_elf_rpath(elf)) is not None:
+        if ":".join(written) != rpath:
+            print(
+                f"WARNING :: rpath of {elf} is {':'.join(written)} after setting it to {rpath}"
+            )
 
 
 def assert_relative_osx(path, host_prefix, build_prefix):
@@ -1298,10 +1434,9 @@ def check_overlinking_impl(
 
     files_to_inspect = []
     filesu = []
+    codefiles = classify_files(run_prefix, files)
     for file in files:
-        path = join(run_prefix, file)
-        codefile = codefile_class(path, skip_symlinks=True)
-        if codefile in filetypes_for_platform[subdir.split("-")[0]]:
+        if codefiles[file] in filetypes_for_platform[subdir.split("-")[0]]:
             files_to_inspect.append(file)
         filesu.append(file.replace("\\", "/"))
 
@@ -1585,6 +1720,7 @@ def check_overlinking_impl(
         return dict()
 
 
+@timed("overlinking")
 def check_overlinking(m: MetaData, files, host_prefix=None):
     patterns = m.get_value("build/overlinking_ignore_patterns", [])
     files = [
@@ -1645,29 +1781,55 @@ def post_process_shared_lib(m, f, files, host_prefix=None):
         mk_relative_osx(path, host_prefix, m, files=files, rpaths=rpaths)
 
 
-def fix_permissions(files, prefix):
-    print("Fixing permissions")
-    for path in os.scandir(prefix):
-        if path.is_dir():
-            lchmod(path.path, 0o775)
+def post_process_shared_libs(m, files, prefix_files, host_prefix=None):
+    """Relocate the shared libraries and executables among ``files``.
 
-    for f in files:
+    ELF files are relocated in a parallel batch sharing a single patchelf lookup, Mach-O
+    files one at a time by post_process_shared_lib.
+    """
+    if not host_prefix:
+        host_prefix = m.config.host_prefix
+    elf_files = []
+    for f, codefile in classify_files(host_prefix, files).items():
+        if not codefile or f.endswith(".debug"):
+            continue
+        if codefile == elffile:
+            elf_files.append(f)
+        else:
+            post_process_shared_lib(m, f, prefix_files, host_prefix)
+    if not elf_files:
+        return
+
+    relocate = partial(
+        mk_relative_linux,
+        prefix=host_prefix,
+        rpaths=m.get_value("build/rpaths", ["lib"]),
+        method=m.get_value("build/rpaths_patcher", None),
+        patchelf=external.find_executable("patchelf", host_prefix) or "",
+        verify=m.config.verify_rpaths,
+    )
+    with ThreadPoolExecutor() as executor:
+        # consume the results so that exceptions are raised
+        for _ in executor.map(relocate, elf_files):
+            pass
+
+
+def fix_permissions(files, prefix, normalized=()):
+    """Normalize the permissions of ``files``, skipping those in ``normalized`` that
+    fix_files already took care of."""
+    print("Fixing permissions")
+    # only the top-level directories that new files were added to
+    for name in {re.split(r"[\\/]", f, maxsplit=1)[0] for f in files}:
+        path = join(prefix, name)
+        if isdir(path) and not islink(path):
+            lchmod(path, 0o775)
+    normalized = set(normalized)
+    files = [f for f in files if f not in normalized]
+
+    def fix(f):
         path = join(prefix, f)
-        st = os.lstat(path)
-        old_mode = stat.S_IMODE(st.st_mode)
-        new_mode = old_mode
-        # broadcast execute
-        if old_mode & stat.S_IXUSR:
-            new_mode = new_mode | stat.S_IXGRP | stat.S_IXOTH
-        # ensure user and group can write and all can read
-        new_mode = (
-            new_mode
-            | stat.S_IWUSR
-            | stat.S_IWGRP
-            | stat.S_IRUSR
-            | stat.S_IRGRP
-            | stat.S_IROTH
-        )  # noqa
+        old_mode = stat.S_IMODE(os.lstat(path).st_mode)
+        new_mode = _normalized_mode(old_mode)
         if old_mode != new_mode:
             try:
                 lchmod(path, new_mode)
@@ -1675,6 +1837,10 @@ def fix_permissions(files, prefix):
                 log = utils.get_logger(__name__)
                 log.warning(str(e))
 
+    with ThreadPoolExecutor() as executor:
+        for _ in executor.map(fix, files):
+            pass
+
 
 def check_menuinst_json(files, prefix) -> None:
     """
@@ -1775,40 +1941,57 @@ def _check_one_menuinst_json(json_file):
         log.info("'%s' is a valid menuinst JSON document", json_file)
 
 
+@timed("post_build")
 def post_build(m, files, build_python, host_prefix=None, is_already_linked=False):
     print("number of files:", len(files))
 
     if not host_prefix:
         host_prefix = m.config.host_prefix
 
-    if not is_already_linked:
-        for f in files:
-            make_hardlink_copy(f, host_prefix)
+    on_win_target = m.config.target_subdir.startswith("win")
+    osx_is_app = m.config.target_subdir.startswith("osx-") and bool(
+        m.get_value("build/osx_is_app", False)
+    )
+    # break hardlinks, fix shebangs and permissions in a single pass over the files,
+    # files of an already linked (test) environment are left alone
+    changed = fix_files(
+        files,
+        host_prefix,
+        build_python=build_python,
+        osx_is_app=osx_is_app,
+        break_hardlinks=not is_already_linked,
+        fix_shebangs=not on_win_target,
+        normalize_permissions=not is_already_linked,
+    )
+    print(
+        f"Broke {len(changed['hardlink'])} hardlink(s), updated "
+        f"{len(changed['shebang'])} shebang(s) and the permissions of "
+        f"{len(changed['permissions'])} file(s)"
+    )
+
+    # read the magic bytes of every file once, the checks below reuse them
+    clear_codefile_class_cache()
+    classify_files(host_prefix, files)
 
-    if not m.config.target_subdir.startswith("win"):
+    if not on_win_target:
         binary_relocation = m.binary_relocation()
         if not binary_relocation:
             print("Skipping binary relocation logic")
-        osx_is_app = m.config.target_subdir.startswith("osx-") and bool(
-            m.get_value("build/osx_is_app", False)
-        )
         check_symlinks(files, host_prefix, m.config.croot)
         prefix_files = utils.prefix_files(host_prefix)
 
-        for f in files:
-            if f.startswith("bin/"):
-                fix_shebang(
-                    f,
-                    prefix=host_prefix,
-                    build_python=build_python,
-                    osx_is_app=osx_is_app,
-                )
-            if binary_relocation is True or (
-                isinstance(binary_relocation, list) and f in binary_relocation
-            ):
-                post_process_shared_lib(m, f, prefix_files, host_prefix)
+        if binary_relocation is True:
+            post_process_shared_libs(m, files, prefix_files, host_prefix)
+        elif isinstance(binary_relocation, list):
+            post_process_shared_libs(
+                m,
+                [f for f in files if f in binary_relocation],
+                prefix_files,
+                host_prefix,
+            )
     check_overlinking(m, files, host_prefix)
     check_menuinst_json(files, host_prefix)
+    return changed
 
 
 def check_symlinks(files, prefix, croot):
@@ -1860,17 +2043,21 @@ def make_hardlink_copy(path, prefix):
     Symlinks are OK, and unaffected here."""
     if not isabs(path):
         path = normpath(join(prefix, path))
-    fn = basename(path)
     if os.lstat(path).st_nlink > 1:
-        with TemporaryDirectory() as dest:
-            # copy file to new name
-            utils.copy_into(path, dest)
-            # remove old file
-            utils.rm_rf(path)
-            # rename copy to original filename
-            #   It is essential here to use copying (as opposed to os.rename), so that
-            #        crossing volume boundaries works
-            utils.copy_into(join(dest, fn), path)
+        _copy_over_hardlink(path)
+
+
+def _copy_over_hardlink(path):
+    fn = basename(path)
+    with TemporaryDirectory() as dest:
+        # copy file to new name
+        utils.copy_into(path, dest)
+        # remove old file
+        utils.rm_rf(path)
+        # rename copy to original filename
+        #   It is essential here to use copying (as opposed to os.rename), so that
+        #        crossing volume boundaries works
+        utils.copy_into(join(dest, fn), path)
 
 
 def get_build_metadata(m):
@@ -0,0 +1,133 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+"""Phase-level timing (and optional cProfile profiling) of conda-build operations."""
+
+from __future__ import annotations
+
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any, Callable, TypeVar
+
+    T = TypeVar("T")
+
+
+class PhaseTimer:
+    """Registry of timed phases.
+
+    Phases may nest (e.g. ``solve`` inside ``create_env`` inside ``build``) and may run on
+    several threads at once.  Every completed phase is recorded so that it can be
+    summarized per phase name or exported as Chrome trace events.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.records: list[dict[str, Any]] = []
+        self.profiler: cProfile.Profile | None = None
+        self._profiling = False
+        self.origin = time.perf_counter()
+
+    def reset(self, profile: bool = False) -> None:
+        """Forget all recorded phases, optionally profiling the phases that follow."""
+        with self._lock:
+            self.records = []
+            self.origin = time.perf_counter()
+            self.profiler = cProfile.Profile() if profile else None
+
+    def _stack(self) -> list[str]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    @contextmanager
+    def phase(self, name: str, **args: Any) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``, with ``args`` attached to its record."""
+        stack = self._stack()
+        # the profiler can't be enabled twice, only the first outermost phase toggles it
+        profiler = None
+        if self.profiler and not stack:
+            with self._lock:
+                if not self._profiling:
+                    self._profiling = True
+                    profiler = self.profiler
+        stack.append(name)
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+            end = time.perf_counter()
+            stack.pop()
+            record = {
+                "name": name,
+                "start": start - self.origin,
+                "duration": end - start,
+                "depth": len(stack),
+                "thread": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.records.append(record)
+
+    def timed(self, name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """Decorator version of :meth:`phase`."""
+
+        def decorator(func: Callable[..., T]) -> Callable[..., T]:
+            @wraps(func)
+            def wrapper(*args, **kwargs) -> T:
+                with self.phase(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Number of calls and total wall time of each phase."""
+        summary: dict[str, dict[str, float]] = {}
+        for record in self.records:
+            entry = summary.setdefault(record["name"], {"count": 0, "time": 0.0})
+            entry["count"] += 1
+            entry["time"] += record["duration"]
+        return summary
+
+    def trace_events(self) -> list[dict[str, Any]]:
+        """Recorded phases as Chrome trace-event "complete" events (times in µs)."""
+        pid = os.getpid()
+        return [
+            {
+                "name": record["name"],
+                "cat": "conda-build",
+                "ph": "X",
+                "ts": round(record["start"] * 1e6),
+                "dur": round(record["duration"] * 1e6),
+                "pid": pid,
+                "tid": record["thread"],
+                "args": {key: str(value) for key, value in record["args"].items()},
+            }
+            for record in sorted(self.records, key=lambda record: record["start"])
+        ]
+
+    def dump_profile(self, path: str | os.PathLike) -> None:
+        """Write the cProfile data collected during the phases in pstats format."""
+        if self.profiler:
+            self.profiler.dump_stats(path)
+
+
+timer = PhaseTimer()
+phase = timer.phase
+timed = timer.timed
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import functools
+import hashlib
 import json
 import os
 import random
@@ -11,8 +12,10 @@ import string
 import subprocess
 import sys
 import tarfile
+import threading
 from collections import OrderedDict, defaultdict
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, suppress
 from os.path import (
     isabs,
     isdir,
@@ -37,19 +40,23 @@ from .config import CondaPkgFormat
 from .exceptions import CondaBuildUserError, DependencyNeedsBuildingError
 from .index import get_build_index
 from .metadata import MetaData, MetaDataTuple, combine_top_level_metadata_with_output
+from .profiling import timed
+from .run_exports import get_run_exports_index
 from .utils import (
     CONDA_PACKAGE_EXTENSION_V1,
+    CONDA_PACKAGE_EXTENSION_V2,
     package_record_to_requirement,
     tar_xf,
 )
 from .variants import (
     filter_by_key_value,
+    find_config_files,
     get_package_variants,
     list_of_dicts_to_dict_of_lists,
+    parse_config_file,
 )
 
 if TYPE_CHECKING:
-    import os
     from collections.abc import Iterable, Iterator
     from typing import Any
 
@@ -254,16 +261,82 @@ def _filter_run_exports(specs, ignore_list):
     return filtered_specs
 
 
+# pkgs_dir -> (mtime, entries), so each directory is only listed again once it changed
+_pkgs_dirs_inventory: dict[Path, tuple[int, frozenset[str]]] = {}
+_pkgs_dirs_lock = threading.Lock()
+
+
+def _pkgs_dir_entries(pkgs_dir: Path) -> frozenset[str]:
+    try:
+        mtime = pkgs_dir.stat().st_mtime_ns
+    except OSError:
+        return frozenset()
+    with _pkgs_dirs_lock:
+        cached = _pkgs_dirs_inventory.get(pkgs_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        entries = frozenset(os.listdir(pkgs_dir))
+    except OSError:
+        entries = frozenset()
+    with _pkgs_dirs_lock:
+        _pkgs_dirs_inventory[pkgs_dir] = mtime, entries
+    return entries
+
+
+def _archive_package_dir(directory: Path, package: Path, m: MetaData) -> None:
+    """Create ``package`` from an extracted package ``directory``.
+
+    Archives are cached by the checksum of the archive the directory was extracted from
+    (or else by the paths, sizes and mtimes of its files), so the same directory is only
+    archived once.
+    """
+    try:
+        record = json.loads((directory / "info" / "repodata_record.json").read_text())
+        key = record.get("sha256") or record["md5"]
+    except (FileNotFoundError, KeyError, ValueError):
+        stats = sorted(
+            (
+                str(path.relative_to(directory)),
+                path.stat().st_size,
+                path.stat().st_mtime_ns,
+            )
+            for path in directory.rglob("*")
+            if path.is_file()
+        )
+        key = hashlib.sha256(json.dumps(stats).encode("utf-8")).hexdigest()
+    cached = Path(m.config.croot, "archive_cache", key, package.name)
+    if not cached.is_file():
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        partial = cached.with_name(f"{cached.name}.{os.getpid()}.partial")
+        with tarfile.open(partial, "w:bz2") as archive:
+            for entry in directory.iterdir():
+                archive.add(entry, arcname=entry.name)
+        os.replace(partial, cached)
+
+    if package.exists():
+        if package.samefile(cached):
+            return
+        package.unlink()
+    package.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(cached, package)
+    except OSError:
+        utils.copy_into(str(cached), str(package))
+
+
 def find_pkg_dir_or_file_in_pkgs_dirs(
     distribution: str, m: MetaData, files_only: bool = False
 ) -> str | None:
     for cache in map(Path, (*context.pkgs_dirs, *m.config.bldpkgs_dirs)):
-        package = cache / (distribution + CONDA_PACKAGE_EXTENSION_V1)
-        if package.is_file():
-            return str(package)
+        entries = _pkgs_dir_entries(cache)
+        for ext in (CONDA_PACKAGE_EXTENSION_V1, CONDA_PACKAGE_EXTENSION_V2):
+            package = cache / (distribution + ext)
+            if package.name in entries and package.is_file():
+                return str(package)
 
         directory = cache / distribution
-        if directory.is_dir():
+        if distribution in entries and directory.is_dir():
             if not files_only:
                 return str(directory)
 
@@ -275,14 +348,11 @@ def find_pkg_dir_or_file_in_pkgs_dirs(
             except (FileNotFoundError, KeyError):
                 subdir = m.config.host_subdir
 
-            # create the tarball on demand so testing on archives works
+            # archive the package on demand so testing on archives works
             package = Path(
                 m.config.croot, subdir, distribution + CONDA_PACKAGE_EXTENSION_V1
             )
-            with tarfile.open(package, "w:bz2") as archive:
-                for entry in directory.iterdir():
-                    archive.add(entry, arcname=entry.name)
-
+            _archive_package_dir(directory, package, m)
             return str(package)
     return None
 
@@ -304,17 +374,22 @@ def _read_specs_from_package(pkg_loc, pkg_dist):
                 specs = json.load(f)
     if not specs and pkg_loc and isfile(pkg_loc):
         # switching to json for consistency in conda-build 4
-        specs_yaml = utils.package_has_file(pkg_loc, "info/run_exports.yaml")
-        specs_json = utils.package_has_file(pkg_loc, "info/run_exports.json")
-        if hasattr(specs_json, "decode"):
-            specs_json = specs_json.decode("utf-8")
+        # all three candidates are read in a single pass over the package
+        found = utils.package_info_reader.read(
+            pkg_loc,
+            "info/run_exports.json",
+            "info/run_exports.yaml",
+            "info/run_exports",
+        )
+        specs_json = found["info/run_exports.json"]
+        specs_yaml = found["info/run_exports.yaml"]
 
         if specs_json:
-            specs = json.loads(specs_json)
+            specs = json.loads(specs_json.decode("utf-8"))
         elif specs_yaml:
             specs = yaml.safe_load(specs_yaml)
         else:
-            legacy_specs = utils.package_has_file(pkg_loc, "info/run_exports")
+            legacy_specs = found["info/run_exports"]
             # exclude packages pinning themselves (makes no sense)
             if legacy_specs:
                 weak_specs = set()
@@ -330,18 +405,6 @@ def _read_specs_from_package(pkg_loc, pkg_dist):
 
 
 def execute_download_actions(m, precs, env, package_subset=None, require_files=False):
-    subdir = getattr(m.config, f"{env}_subdir")
-    index, _, _ = get_build_index(
-        subdir=subdir,
-        bldpkgs_dir=m.config.bldpkgs_dir,
-        output_folder=m.config.output_folder,
-        clear_cache=False,
-        omit_defaults=False,
-        channel_urls=m.config.channel_urls,
-        debug=m.config.debug,
-        verbose=m.config.verbose,
-    )
-
     # this should be just downloading packages.  We don't need to extract them -
 
     # NOTE: The following commented execute_actions is defunct
@@ -375,31 +438,50 @@ def execute_download_actions(m, precs, env, package_subset=None, require_files=F
                         break
         precs = selected_packages
 
+    missing = {}
     for prec in precs:
         pkg_dist = "-".join((prec.name, prec.version, prec.build))
         pkg_loc = find_pkg_dir_or_file_in_pkgs_dirs(
             pkg_dist, m, files_only=require_files
         )
-
-        # ran through all pkgs_dirs, and did not find package or folder.  Download it.
-        # TODO: this is a vile hack reaching into conda's internals. Replace with
-        #    proper conda API when available.
         if not pkg_loc:
-            link_prec = [
-                rec
-                for rec in index
-                if (rec.name, rec.version, rec.build)
-                == (prec.name, prec.version, prec.build)
-            ][0]
-            pfe = ProgressiveFetchExtract(link_prefs=(link_prec,))
-            with utils.LoggingContext():
-                pfe.execute()
+            missing[(prec.name, prec.version, prec.build)] = prec
+        pkg_files[prec] = pkg_loc, pkg_dist
+
+    # ran through all pkgs_dirs, and did not find these packages or folders.  Download
+    # them together, which lets conda fetch them in parallel.
+    # TODO: this is a vile hack reaching into conda's internals. Replace with
+    #    proper conda API when available.
+    if missing:
+        subdir = getattr(m.config, f"{env}_subdir")
+        index, _, _ = get_build_index(
+            subdir=subdir,
+            bldpkgs_dir=m.config.bldpkgs_dir,
+            output_folder=m.config.output_folder,
+            clear_cache=False,
+            omit_defaults=False,
+            channel_urls=m.config.channel_urls,
+            debug=m.config.debug,
+            verbose=m.config.verbose,
+        )
+        link_precs = []
+        for key, prec in missing.items():
+            if (link_prec := index.get_record(*key)) is None:
+                raise CondaBuildUserError(
+                    f"Package {prec.dist_str()} is neither in the package caches nor in "
+                    f"the {subdir} index of channels {m.config.channel_urls}, so its "
+                    "files (and run_exports) can't be read."
+                )
+            link_precs.append(link_prec)
+        pfe = ProgressiveFetchExtract(link_prefs=tuple(link_precs))
+        with utils.output_redirect_lock, utils.LoggingContext():
+            pfe.execute()
+        for prec in missing.values():
             for pkg_dir in context.pkgs_dirs:
                 _loc = join(pkg_dir, prec.fn)
                 if isfile(_loc):
-                    pkg_loc = _loc
+                    pkg_files[prec] = _loc, pkg_files[prec][1]
                     break
-        pkg_files[prec] = pkg_loc, pkg_dist
 
     return pkg_files
 
@@ -417,7 +499,8 @@ def get_upstream_pins(m: MetaData, precs, env):
     ignore_list = utils.ensure_list(m.get_value("build/ignore_run_exports"))
     if m.python_version_independent and not m.noarch:
         ignore_list.append("python")
-    additional_specs = {}
+    run_exports_index = get_run_exports_index(m.config.run_exports_cache)
+    all_run_exports = {}
     for prec in precs:
         if any((prec.name == req.split(" ")[0]) for req in ignore_pkgs_list):
             continue
@@ -430,13 +513,21 @@ def get_upstream_pins(m: MetaData, precs, env):
                 pkg_data = channeldata["packages"].get(prec.name, {})
                 run_exports = pkg_data.get("run_exports", {}).get(prec.version, {})
         if run_exports is None:
-            loc, dist = execute_download_actions(
-                m,
-                precs,
-                env=env,
-                package_subset=[prec],
-            )[prec]
-            run_exports = _read_specs_from_package(loc, dist)
+            run_exports = run_exports_index.get(prec)
+        all_run_exports[prec] = run_exports
+
+    # only the packages not in the index are read, after downloading them all at once
+    if unknown := [prec for prec, specs in all_run_exports.items() if specs is None]:
+        pkg_files = execute_download_actions(m, precs, env=env, package_subset=unknown)
+        for prec in unknown:
+            loc, dist = pkg_files[prec]
+            all_run_exports[prec] = _read_specs_from_package(loc, dist)
+            if loc:
+                run_exports_index.update(prec, all_run_exports[prec])
+        run_exports_index.save()
+
+    additional_specs = {}
+    for run_exports in all_run_exports.values():
         specs = _filter_run_exports(run_exports, ignore_list)
         if specs:
             additional_specs = utils.merge_dicts_of_lists(additional_specs, specs)
@@ -624,6 +715,7 @@ def _variants_match(first: dict, second: dict) -> bool:
     return True
 
 
+@timed("finalize")
 def finalize_metadata(
     m: MetaData,
     parent_metadata=None,
@@ -1027,6 +1119,7 @@ def open_recipe(recipe: str | os.PathLike | Path) -> Iterator[Path]:
         sys.exit(f"Error: non-recipe: {recipe}")
 
 
+@timed("render")
 def render_recipe(
     recipe_dir: str | os.PathLike | Path,
     config: Config,
@@ -1070,8 +1163,9 @@ def render_recipe(
                 m.config.variant = m.config.variants[0]
             return [MetaDataTuple(m, False, False)]
         else:
-            # merge any passed-in variants with any files found
-            variants = get_package_variants(m, variants=variants)
+            # merge any passed-in variants with any files found, only exploding the
+            #    keys the recipe can use
+            variants = get_package_variants(m, variants=variants, prune_unused=True)
 
             # when building, we don't want to fully expand all outputs into metadata, only expand
             #    whatever variants we have (i.e. expand top-level variants, not output-only variants)
@@ -1137,6 +1231,94 @@ def render_metadata_tuples(
     return list(output_metas.values())
 
 
+def _preload_shared_render_state(
+    recipe_paths: Iterable[str | os.PathLike | Path],
+    config: Config,
+    bypass_env_check: bool = False,
+) -> None:
+    """Populate the caches that every render of ``recipe_paths`` hits.
+
+    Config files found for several recipes (e.g. a shared pinning file) are parsed once and
+    the build index is loaded once, instead of by whichever worker gets there first.
+    """
+    config_files = {
+        path
+        for recipe_path in recipe_paths
+        for path in find_config_files(recipe_path, config)
+    }
+    for path in config_files:
+        # errors are reported by the render of whichever recipe uses the file
+        with suppress(Exception):
+            parse_config_file(path, config)
+
+    if bypass_env_check:
+        # no environments get solved, the index isn't needed
+        return
+
+    get_build_index(
+        subdir=config.host_subdir,
+        bldpkgs_dir=config.bldpkgs_dir,
+        output_folder=config.output_folder,
+        clear_cache=False,
+        omit_defaults=False,
+        channel_urls=config.channel_urls,
+        debug=config.debug,
+        verbose=config.verbose,
+    )
+
+
+def render_recipes(
+    recipe_paths: Iterable[str | os.PathLike | Path],
+    config: Config,
+    variants: dict[str, Any] | None = None,
+    workers: int | None = None,
+    permit_unsatisfiable_variants: bool = True,
+    finalize: bool = True,
+    bypass_env_check: bool = False,
+) -> Iterator[tuple[str | os.PathLike | Path, list[MetaDataTuple] | BaseException]]:
+    """Render many recipes using a pool of ``workers`` threads.
+
+    Yields ``(recipe_path, result)`` pairs in completion order, where ``result`` is either
+    the list of rendered ``MetaDataTuple`` or the exception raised while rendering that
+    recipe.  Each recipe is rendered with its own copy of ``config``.  Solves and package
+    downloads redirect process-wide output, they run one at a time under
+    ``utils.output_redirect_lock``.
+    """
+    recipe_paths = list(recipe_paths)
+    _preload_shared_render_state(recipe_paths, config, bypass_env_check)
+
+    def _render(recipe_path):
+        recipe_config = config.copy()
+        metadata_tuples = render_recipe(
+            recipe_path,
+            config=recipe_config,
+            no_download_source=recipe_config.no_download_source,
+            variants=variants,
+            permit_unsatisfiable_variants=permit_unsatisfiable_variants,
+            bypass_env_check=bypass_env_check,
+        )
+        return render_metadata_tuples(
+            metadata_tuples,
+            config=recipe_config,
+            permit_unsatisfiable_variants=permit_unsatisfiable_variants,
+            finalize=finalize,
+            bypass_env_check=bypass_env_check,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_render, recipe_path): recipe_path
+            for recipe_path in recipe_paths
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except (Exception, SystemExit) as e:
+                # render_recipe exits on unparsable recipes, report that like any error
+                result = e
+            yield futures[future], result
+
+
 # Keep this out of the function below so it can be imported by other modules.
 FIELDS = [
     "package",
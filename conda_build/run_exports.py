@@ -0,0 +1,158 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+"""Index of the run_exports of packages, so render can look them up without downloading.
+
+The run_exports of each (channel, subdir) come from the channel's ``run_exports.json``
+sidecar (CEP 12) when the channel is local, and from the packages whose run_exports had to
+be read from the package itself.  The latter are persisted under
+``Config.run_exports_cache``, keyed by ``name-version-build`` along with the package's
+checksum so that a package rebuilt under the same name is read again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from functools import cache
+from os.path import dirname, join
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from .utils import CONDA_PACKAGE_EXTENSIONS, get_logger
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from conda.models.records import PackageRecord
+
+log = get_logger(__name__)
+
+
+def _channel_url(prec: PackageRecord) -> str:
+    return str(prec.channel.base_url or prec.channel)
+
+
+def _dist(prec: PackageRecord) -> str:
+    return f"{prec.name}-{prec.version}-{prec.build}"
+
+
+def _checksum(prec: PackageRecord) -> str | None:
+    return prec.get("sha256") or prec.get("md5")
+
+
+class RunExportsIndex:
+    """run_exports of packages per (channel, subdir), looked up by ``name-version-build``."""
+
+    def __init__(self, cache_dir: str | os.PathLike | None = None) -> None:
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        # (channel, subdir) -> {dist: {"checksum": ..., "run_exports": ...}}
+        self._entries: dict[tuple[str, str], dict[str, dict[str, Any]]] = {}
+        # sidecar path -> (mtime, {dist: run_exports})
+        self._sidecars: dict[str, tuple[int, dict[str, dict]]] = {}
+        self._dirty: set[tuple[str, str]] = set()
+
+    def _cache_file(self, channel: str, subdir: str) -> str:
+        digest = hashlib.sha256(channel.encode("utf-8")).hexdigest()[:16]
+        return join(self.cache_dir, digest, f"{subdir}.json")
+
+    def _read_cache_file(self, channel: str, subdir: str) -> dict[str, dict[str, Any]]:
+        if not self.cache_dir:
+            return {}
+        try:
+            with open(self._cache_file(channel, subdir)) as f:
+                return json.load(f)["packages"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _cached(self, channel: str, subdir: str) -> dict[str, dict[str, Any]]:
+        key = (channel, subdir)
+        if key not in self._entries:
+            self._entries[key] = self._read_cache_file(channel, subdir)
+        return self._entries[key]
+
+    def _sidecar(self, channel: str, subdir: str) -> dict[str, dict]:
+        if not channel.startswith("file:"):
+            return {}
+        path = join(url2pathname(urlparse(channel).path), subdir, "run_exports.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+        if (cached := self._sidecars.get(path)) and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        packages = {}
+        for group in ("packages", "packages.conda"):
+            for fn, record in data.get(group, {}).items():
+                for ext in CONDA_PACKAGE_EXTENSIONS:
+                    if fn.endswith(ext):
+                        packages[fn[: -len(ext)]] = record.get("run_exports", {})
+                        break
+        self._sidecars[path] = mtime, packages
+        return packages
+
+    def get(self, prec: PackageRecord) -> dict | None:
+        """The run_exports of ``prec``, or None when the package has to be read."""
+        channel, dist = _channel_url(prec), _dist(prec)
+        with self._lock:
+            sidecar = self._sidecar(channel, prec.subdir)
+            if dist in sidecar:
+                return sidecar[dist]
+            entry = self._cached(channel, prec.subdir).get(dist)
+        if entry and entry.get("checksum") == _checksum(prec):
+            return entry["run_exports"]
+        return None
+
+    def update(self, prec: PackageRecord, run_exports: dict) -> None:
+        """Record the run_exports read from the package of ``prec``."""
+        key = (_channel_url(prec), prec.subdir)
+        with self._lock:
+            self._cached(*key)[_dist(prec)] = {
+                "checksum": _checksum(prec),
+                "run_exports": run_exports,
+            }
+            self._dirty.add(key)
+
+    def save(self) -> None:
+        """Persist the entries added since the last save."""
+        if not self.cache_dir:
+            return
+        with self._lock:
+            for channel, subdir in self._dirty:
+                # merge with what other processes may have written meanwhile
+                packages = {
+                    **self._read_cache_file(channel, subdir),
+                    **self._entries[(channel, subdir)],
+                }
+                path = self._cache_file(channel, subdir)
+                os.makedirs(dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp, "w") as f:
+                        json.dump(
+                            {
+                                "channel": channel,
+                                "subdir": subdir,
+                                "packages": packages,
+                            },
+                            f,
+                        )
+                    os.replace(tmp, path)
+                except OSError as e:
+                    log.debug("Could not write run_exports index %s: %s", path, e)
+            self._dirty.clear()
+
+
+@cache
+def get_run_exports_index(cache_dir: str | None) -> RunExportsIndex:
+    """The shared index for ``cache_dir``."""
+    return RunExportsIndex(cache_dir)
@@ -11,11 +11,13 @@ import gzip
 import hashlib
 import json
 import os
-import pickle
+import sqlite3
 import subprocess
 import sys
 import tempfile
-from functools import cache, partial
+import threading
+import time
+from functools import cache
 from glob import glob
 from os import makedirs
 from os.path import basename, dirname, exists, join
@@ -151,6 +153,12 @@ IF exist Build.PL (
 
 perl_core = []
 
+# MetaCPAN lookups are reused for this many seconds before they are made again
+METACPAN_CACHE_MAX_AGE = 24 * 60 * 60
+
+# the number of modules resolved to their distributions per MetaCPAN search
+MODULE_SEARCH_BATCH_SIZE = 100
+
 
 class InvalidReleaseError(RuntimeError):
     """
@@ -258,20 +266,37 @@ def loose_version(ver):
     return str(parse_version(str(ver)))
 
 
-def get_cpan_api_url(url, colons):
+def _read_cpan_api_json(json_path):
+    try:
+        with gzip.open(json_path) as dist_json_file:
+            output = dist_json_file.read()
+        if hasattr(output, "decode"):
+            output = output.decode("utf-8-sig")
+        return json.loads(output)
+    except OSError:
+        return json.loads(codecs.open(json_path, encoding="utf-8").read())
+
+
+def get_cpan_api_url(url, colons, cache_dir=None):
+    """
+    Return the JSON document at ``url``. With ``cache_dir``, responses come from and
+    go to the MetaCPAN cache in that directory.
+    """
     if not colons:
         url = url.replace("::", "-")
-    with PerlTmpDownload(url) as json_path:
-        try:
-            with gzip.open(json_path) as dist_json_file:
-                output = dist_json_file.read()
-            if hasattr(output, "decode"):
-                output = output.decode("utf-8-sig")
-            rel_dict = json.loads(output)
-        except OSError:
-            rel_dict = json.loads(codecs.open(json_path, encoding="utf-8").read())
-        except CondaHTTPError:
-            rel_dict = None
+    if not cache_dir:
+        with PerlTmpDownload(url) as json_path:
+            return _read_cpan_api_json(json_path)
+
+    metacpan_cache = get_metacpan_cache(cache_dir)
+    key = f"url:{url}"
+    rel_dict = metacpan_cache.get(key)
+    if rel_dict is None:
+        with TemporaryDirectory() as tmpdir:
+            json_path = join(tmpdir, "response.json")
+            download(url, json_path)
+            rel_dict = _read_cpan_api_json(json_path)
+        metacpan_cache.set(key, rel_dict)
     return rel_dict
 
 
@@ -308,29 +333,65 @@ def get_pickle_file_path(cache_dir, filename_prefix, other_hashed=()):
     return os.path.join(cache_dir, filename_prefix.replace("::", "-") + "." + h + ".p")
 
 
-def load_or_pickle(filename_prefix, base_folder, data_partial, key):
-    # It might be nice to hash the entire code tree of data_partial
-    # along with all the args to it via hashlib instead but that's
-    # difficult.
-    pickled = get_pickle_file_path(
-        cache_dir=base_folder, filename_prefix=filename_prefix + key
-    )
-    # if exists(pickled):
-    #     os.unlink(pickled)
-    if exists(pickled):
-        with open(pickled, "rb") as f:
-            key_stored = pickle.load(f)
-            if key and key_stored and key == key_stored:
-                return pickle.load(f)
-    result = data_partial()
-    try:
-        os.makedirs(os.path.dirname(pickled))
-    except:
-        pass
-    with open(pickled, "wb") as f:
-        pickle.dump(key, f)
-        pickle.dump(result, f)
-    return result
+_missing = object()
+
+
+class MetaCPANCache:
+    """
+    MetaCPAN lookups, persisted in a single sqlite database.
+
+    Entries are reused for ``max_age`` seconds, except those stored without expiry
+    (e.g. the core modules of a Perl version, which never change).
+    """
+
+    def __init__(self, path, max_age=METACPAN_CACHE_MAX_AGE):
+        makedirs(dirname(path), exist_ok=True)
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS lookups "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)"
+            )
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM lookups WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, key, value, expires=True):
+        expiry = time.time() + self.max_age if expires else None
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?)",
+                (key, json.dumps(value), expiry),
+            )
+
+    def get_or_set(self, key, func, expires=True):
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = func()
+            self.set(key, value, expires=expires)
+        return value
+
+    def purge(self):
+        """Drop the expired entries."""
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM lookups WHERE expires IS NOT NULL AND expires < ?",
+                (time.time(),),
+            )
+
+
+@cache
+def get_metacpan_cache(cache_dir):
+    return MetaCPANCache(join(cache_dir, "metacpan.sqlite"))
 
 
 def install_perl_get_core_modules(version):
@@ -381,12 +442,15 @@ def install_perl_get_core_modules(version):
 
 
 def get_core_modules_for_this_perl_version(version, cache_dir):
-    return load_or_pickle(
-        "perl-core-modules",
-        base_folder=cache_dir,
-        data_partial=partial(install_perl_get_core_modules, version),
-        key=version,
-    )
+    metacpan_cache = get_metacpan_cache(cache_dir)
+    key = f"perl-core-modules:{version}"
+    core_modules = metacpan_cache.get(key)
+    if not core_modules:
+        core_modules = install_perl_get_core_modules(version)
+        # an empty list means the query failed, try again next time
+        if core_modules:
+            metacpan_cache.set(key, core_modules, expires=False)
+    return core_modules
 
 
 # meta_cpan_url="http://api.metacpan.org",
@@ -405,6 +469,7 @@ def skeletonize(
     """
     config = get_or_merge_config(config)
     cache_dir = os.path.join(config.src_cache_root, ".conda-build", "pickled.cb")
+    get_metacpan_cache(cache_dir).purge()
 
     # TODO :: Make a temp env. with perl (which we need anyway) and use whatever version
     #         got installed instead of this. Also allow the version to be specified.
@@ -514,7 +579,7 @@ def skeletonize(
 
         # Add Perl version to core module requirements, since these are empty
         # packages, unless we're newer than what's in core
-        if metacpan_api_is_core_version(meta_cpan_url, package):
+        if metacpan_api_is_core_version(meta_cpan_url, package, cache_dir):
             if not write_core:
                 print(f"We found core module {packagename}. Skipping recipe creation.")
                 continue
@@ -777,6 +842,21 @@ def deps_for_package(
         new_deps.append(dep)
     release_data["dependency"] = new_deps
 
+    # resolve the distributions of all dependencies with as few requests as possible,
+    # dist_for_module then finds them in the cache
+    dists_for_modules(
+        meta_cpan_url,
+        cache_dir,
+        core_modules,
+        [
+            dep["module"]
+            for dep in new_deps
+            if dep.get("relationship") == "requires"
+            and phase_to_dep_type.get(dep.get("phase"))
+            and "module" in dep
+        ],
+    )
+
     for dep_dict in release_data["dependency"]:
         # Only care about requirements
         try:
@@ -864,7 +944,9 @@ def deps_for_package(
                         packages_to_append.add((orig_dist, dep_dict["module"]))
 
                 # Add to appropriate dependency list
-                core = metacpan_api_is_core_version(meta_cpan_url, dep_dict["module"])
+                core = metacpan_api_is_core_version(
+                    meta_cpan_url, dep_dict["module"], cache_dir
+                )
 
                 cb_phase = phase_to_dep_type[dep_dict["phase"]]
                 if cb_phase:
@@ -902,16 +984,17 @@ def dist_for_module(cpan_url, cache_dir, core_modules, module):
         mod_dict = core_module_dict(core_modules, module)
         distribution = mod_dict["distribution"]
     except:
-        # Next check if its already a distribution
-        rel_dict = release_module_dict(cpan_url, cache_dir, module)
-        if rel_dict is not None:
-            if rel_dict["distribution"] != module.replace("::", "-"):
-                print(
-                    "WARNING :: module {} found in distribution {}".format(
-                        module, rel_dict["distribution"]
-                    )
-                )
-            distribution = rel_dict["distribution"]
+        metacpan_cache = get_metacpan_cache(cache_dir)
+        key = f"dist:{cpan_url}:{module}"
+        distribution = metacpan_cache.get(key)
+        if not distribution:
+            # Next check if its already a distribution
+            rel_dict = release_module_dict(cpan_url, cache_dir, module)
+            if rel_dict is not None:
+                distribution = rel_dict["distribution"]
+                metacpan_cache.set(key, distribution)
+        if distribution and distribution != module.replace("::", "-"):
+            print(f"WARNING :: module {module} found in distribution {distribution}")
     if not distribution:
         print("debug")
     assert distribution, "dist_for_module must succeed"
@@ -919,6 +1002,73 @@ def dist_for_module(cpan_url, cache_dir, core_modules, module):
     return distribution
 
 
+def search_module_distributions(cpan_url, modules):
+    """
+    Map each of ``modules`` to the distribution of its latest release, with one
+    MetaCPAN search per MODULE_SEARCH_BATCH_SIZE modules. Modules that could not be
+    found are left out.
+    """
+    distributions = {}
+    for start in range(0, len(modules), MODULE_SEARCH_BATCH_SIZE):
+        batch = modules[start : start + MODULE_SEARCH_BATCH_SIZE]
+        query = {
+            "query": {
+                "bool": {
+                    "must": [
+                        {"terms": {"module.name": batch}},
+                        {"term": {"status": "latest"}},
+                        {"term": {"module.authorized": True}},
+                    ]
+                }
+            },
+            "_source": ["distribution", "module.name"],
+            "size": 4 * len(batch),
+        }
+        try:
+            response = requests.post(f"{cpan_url}/module/_search", json=query)
+            response.raise_for_status()
+            hits = response.json()["hits"]["hits"]
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"WARNING :: Could not search MetaCPAN for {len(batch)} modules: {e}")
+            continue
+        wanted = set(batch)
+        for hit in hits:
+            source = hit.get("_source", {})
+            modules_in_file = source.get("module") or []
+            if isinstance(modules_in_file, dict):
+                modules_in_file = [modules_in_file]
+            for module in modules_in_file:
+                name = module.get("name")
+                if name in wanted and source.get("distribution"):
+                    distributions.setdefault(name, source["distribution"])
+    return distributions
+
+
+def dists_for_modules(cpan_url, cache_dir, core_modules, modules):
+    """
+    Return the distributions of ``modules`` that are core modules, cached, or found by
+    a batched MetaCPAN search; the latter are added to the cache. Modules missing from
+    the result have to be resolved one by one with dist_for_module.
+    """
+    metacpan_cache = get_metacpan_cache(cache_dir)
+    distributions = {}
+    unknown = []
+    for module in dict.fromkeys(modules):
+        if core_module_dict(core_modules, module):
+            distributions[module] = "perl"
+        elif distribution := metacpan_cache.get(f"dist:{cpan_url}:{module}"):
+            distributions[module] = distribution
+        else:
+            unknown.append(module)
+    if unknown:
+        for module, distribution in search_module_distributions(
+            cpan_url, unknown
+        ).items():
+            metacpan_cache.set(f"dist:{cpan_url}:{module}", distribution)
+            distributions[module] = distribution
+    return distributions
+
+
 def release_module_dict_direct(cpan_url, cache_dir, module):
     if "Dist-Zilla-Plugin-Git" in module:
         print(f"debug {module}")
@@ -930,7 +1080,7 @@ def release_module_dict_direct(cpan_url, cache_dir, module):
     try:
         url_module = f"{cpan_url}/module/{module}"
         print(f"INFO :: url_module {url_module}")
-        rel_dict = get_cpan_api_url(url_module, colons=True)
+        rel_dict = get_cpan_api_url(url_module, colons=True, cache_dir=cache_dir)
     except RuntimeError:
         rel_dict = None
     except CondaHTTPError:
@@ -947,7 +1097,7 @@ def release_module_dict_direct(cpan_url, cache_dir, module):
             )
         try:
             url_release = f"{cpan_url}/release/{distribution}"
-            rel_dict2 = get_cpan_api_url(url_release, colons=False)
+            rel_dict2 = get_cpan_api_url(url_release, colons=False, cache_dir=cache_dir)
             rel_dict = rel_dict2
         except RuntimeError:
             rel_dict = None
@@ -970,18 +1120,9 @@ def release_module_dict(cpan_url, cache_dir, module):
     if not rel_dict:
         # In this case, the module may be a submodule of another dist, let's try something else.
         # An example of this is Dist::Zilla::Plugin::Git::Check.
-        pickled = get_pickle_file_path(cache_dir, module + ".dl_url")
-        url = f"{cpan_url}/download_url/{module}"
-        try:
-            os.makedirs(os.path.dirname(pickled))
-        except:
-            pass
-        download(url, pickled)
-        with open(pickled, "rb") as dl_url_json:
-            output = dl_url_json.read()
-        if hasattr(output, "decode"):
-            output = output.decode("utf-8-sig")
-        dl_url_dict = json.loads(output)
+        dl_url_dict = get_cpan_api_url(
+            f"{cpan_url}/download_url/{module}", colons=True, cache_dir=cache_dir
+        )
         if dl_url_dict["release"].endswith(dl_url_dict["version"]):
             # Easy case.
             print(f"Up to date: {module}")
@@ -1004,8 +1145,6 @@ def release_module_dict(cpan_url, cache_dir, module):
             #    to inspect the tarball.
             dst = os.path.join(cache_dir, basename(dl_url_dict["download_url"]))
             download(dl_url_dict["download_url"], dst)
-            with gzip.open(dst) as dist_json_file:
-                output = dist_json_file.read()
             # (base) Rays-Mac-Pro:Volumes rdonnelly$ cpan -D Time::Zone
             rel_dict = release_module_dict_direct(cpan_url, cache_dir, dist)
 
@@ -1037,10 +1176,19 @@ def core_module_dict(core_modules, module):
     return None
 
 
-@cache
-def metacpan_api_is_core_version(cpan_url, module):
+def metacpan_api_is_core_version(cpan_url, module, cache_dir=None):
     if "FindBin" in module:
         print("debug")
+    if not cache_dir:
+        return _metacpan_api_is_core_version(cpan_url, module)
+    return get_metacpan_cache(cache_dir).get_or_set(
+        f"is-core:{cpan_url}:{module}",
+        lambda: _metacpan_api_is_core_version(cpan_url, module),
+    )
+
+
+@cache
+def _metacpan_api_is_core_version(cpan_url, module):
     url = f"{cpan_url}/release/{module}"
     url = url.replace("::", "-")
     req = requests.get(url)
@@ -1081,10 +1229,12 @@ def get_release_info(cpan_url, cache_dir, core_modules, package, version):
     # Get latest info to find author, which is necessary for retrieving a
     # specific version
     try:
-        rel_dict = get_cpan_api_url(f"{cpan_url}/release/{package}", colons=False)
+        rel_dict = get_cpan_api_url(
+            f"{cpan_url}/release/{package}", colons=False, cache_dir=cache_dir
+        )
         rel_dict["version"] = str(rel_dict["version"]).lstrip("v")
     except CondaHTTPError:
-        core_version = metacpan_api_is_core_version(cpan_url, package)
+        core_version = metacpan_api_is_core_version(cpan_url, package, cache_dir)
         if core_version is not None and (version is None or (version == core_version)):
             print(
                 f"WARNING: {orig_package} is not available on MetaCPAN, but it's a "
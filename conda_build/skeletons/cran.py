@@ -9,18 +9,22 @@ from __future__ import annotations
 import argparse
 import copy
 import hashlib
+import json
 import re
 import subprocess
 import sys
 import tarfile
+import threading
 import unicodedata
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
-from os import environ, listdir, makedirs, sep
+from os import cpu_count, environ, listdir, makedirs, replace, sep
 from os.path import (
     basename,
     commonprefix,
     exists,
+    getmtime,
     isabs,
     isdir,
     isfile,
@@ -29,6 +33,8 @@ from os.path import (
     realpath,
     relpath,
 )
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
 
 import requests
 import yaml
@@ -44,6 +50,7 @@ from typing import TYPE_CHECKING
 from conda.base.context import context
 from conda.common.io import dashlist
 from conda.gateways.disk.create import TemporaryDirectory
+from conda.utils import url_path
 
 from .. import source
 from ..config import get_or_merge_config
@@ -300,6 +307,13 @@ R_RECOMMENDED_PACKAGE_NAMES = (
     "mgcv",
 )
 
+# the platforms the selectors of a recipe distinguish
+ALL_PLATFORMS = ["linux", "win32", "win64", "osx"]
+
+# all GitHub packages are checked out into (and read from) the config's work dir, one at
+#     a time
+_git_lock = threading.Lock()
+
 # Stolen then tweaked from debian.deb822.PkgRelation.__dep_RE.
 VERSION_DEPENDENCY_REGEX = re.compile(
     r"^\s*(?P<name>[a-zA-Z0-9.+\-]{1,})"
@@ -372,7 +386,8 @@ def add_parser(repos):
     )
     cran.add_argument(
         "--cran-url",
-        help="URL to use for as source package repository",
+        help="""URL to use for as source package repository.  A local directory
+        with the layout of a CRAN mirror is used without going online.""",
     )
     cran.add_argument(
         "--r-interp",
@@ -473,6 +488,13 @@ def add_parser(repos):
         default=False,
         help="""Do not include instructional comments in recipe files""",
     )
+    cran.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="""Number of packages to skeletonize concurrently (default: one per
+        CPU plus four, at most 32).""",
+    )
 
 
 def dict_from_cran_lines(lines):
@@ -675,42 +697,130 @@ def get_session(output_dir, verbose=True):
     return session
 
 
+def _local_mirror(cran_url):
+    """The directory of ``cran_url`` when it is a local mirror of CRAN, else None."""
+    if cran_url.startswith("file:"):
+        return url2pathname(urlsplit(cran_url).path)
+    return None
+
+
 def get_cran_archive_versions(cran_url, session, package, verbose=True):
     if verbose:
         print(f"Fetching archived versions for package {package} from {cran_url}")
-    r = session.get(cran_url + "/src/contrib/Archive/" + package + "/")
-    try:
-        r.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
+    if (mirror := _local_mirror(cran_url)) is not None:
+        archive_dir = join(mirror, "src", "contrib", "Archive", package)
+        if not isdir(archive_dir):
             print(f"No archive directory for package {package}")
             return []
-        raise
+        listing = [
+            (str(int(getmtime(join(archive_dir, p)))), p) for p in listdir(archive_dir)
+        ]
+    else:
+        r = session.get(cran_url + "/src/contrib/Archive/" + package + "/")
+        try:
+            r.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 404:
+                print(f"No archive directory for package {package}")
+                return []
+            raise
+        listing = [
+            (dt, p)
+            for p, dt in re.findall(
+                r'<td><a href="([^"]+)">\1</a></td>\s*<td[^>]*>([^<]*)</td>', r.text
+            )
+        ]
     versions = []
-    for p, dt in re.findall(
-        r'<td><a href="([^"]+)">\1</a></td>\s*<td[^>]*>([^<]*)</td>', r.text
-    ):
+    for dt, p in listing:
         if p.endswith(".tar.gz") and "_" in p:
             name, version = p.rsplit(".", 2)[0].split("_", 1)
             versions.append((dt.strip(), version))
     return [v for dt, v in sorted(versions, reverse=True)]
 
 
-def get_cran_index(cran_url, session, verbose=True):
-    if verbose:
-        print(f"Fetching main index from {cran_url}")
-    r = session.get(cran_url + "/src/contrib/")
-    r.raise_for_status()
+def parse_packages_file(text):
+    """The (name, version) of each package in a CRAN ``PACKAGES`` file, by lowercase name."""
     records = {}
-    for p in re.findall(r'<td><a href="([^"]+)">\1</a></td>', r.text):
-        if p.endswith(".tar.gz") and "_" in p:
-            name, version = p.rsplit(".", 2)[0].split("_", 1)
-            records[name.lower()] = (name, version)
+    for stanza in re.split(r"\n\s*\n", text):
+        fields = dict(
+            line.split(":", 1)
+            for line in stanza.splitlines()
+            if line.startswith(("Package:", "Version:"))
+        )
+        if "Package" in fields and "Version" in fields:
+            name = fields["Package"].strip()
+            records[name.lower()] = (name, fields["Version"].strip())
+    return records
+
+
+def _fetch_cran_index(cran_url, session, cached):
+    """The index of ``cran_url`` and the ETag of its PACKAGES file, or None when the
+    PACKAGES file did not change since ``cached`` was fetched."""
+    if (mirror := _local_mirror(cran_url)) is not None:
+        contrib = join(mirror, "src", "contrib")
+        with open(join(contrib, "PACKAGES")) as f:
+            records = parse_packages_file(f.read())
+        archive_dir = join(contrib, "Archive")
+        archived = listdir(archive_dir) if isdir(archive_dir) else []
+        return records, archived, None
+
+    etag = None
+    r = session.get(
+        cran_url + "/src/contrib/PACKAGES",
+        headers={"If-None-Match": cached["etag"]} if cached.get("etag") else {},
+    )
+    if r.status_code == 304:
+        return None
+    if r.ok:
+        records = parse_packages_file(r.text)
+        etag = r.headers.get("ETag")
+    else:
+        # no PACKAGES file, fall back to the listing of the directory
+        r = session.get(cran_url + "/src/contrib/")
+        r.raise_for_status()
+        records = {}
+        for p in re.findall(r'<td><a href="([^"]+)">\1</a></td>', r.text):
+            if p.endswith(".tar.gz") and "_" in p:
+                name, version = p.rsplit(".", 2)[0].split("_", 1)
+                records[name.lower()] = (name, version)
     r = session.get(cran_url + "/src/contrib/Archive/")
     r.raise_for_status()
-    for p in re.findall(r'<td><a href="([^"]+)/">\1/</a></td>', r.text):
+    archived = re.findall(r'<td><a href="([^"]+)/">\1/</a></td>', r.text)
+    return records, archived, etag
+
+
+def get_cran_index(cran_url, session, verbose=True, cache_dir=None):
+    """The (name, version) of each package on ``cran_url`` by lowercase name, where the
+    version of archived packages is None.
+
+    The index is parsed from the ``PACKAGES`` file when the mirror has one.  With
+    ``cache_dir``, it is persisted there and only fetched again once PACKAGES changed.
+    """
+    if verbose:
+        print(f"Fetching main index from {cran_url}")
+    cache_file = None
+    cached = {}
+    if cache_dir:
+        digest = hashlib.sha256(cran_url.encode("utf-8")).hexdigest()[:16]
+        cache_file = join(cache_dir, f"cran_index_{digest}.json")
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    if (fetched := _fetch_cran_index(cran_url, session, cached)) is None:
+        return {name: tuple(record) for name, record in cached["records"].items()}
+    records, archived, etag = fetched
+    for p in archived:
         if re.match(r"^[A-Za-z]", p):
             records.setdefault(p.lower(), (p, None))
+
+    if cache_file and etag:
+        makedirs(cache_dir, exist_ok=True)
+        with open(f"{cache_file}.tmp", "w") as f:
+            json.dump({"etag": etag, "records": records}, f)
+        replace(f"{cache_file}.tmp", cache_file)
     return records
 
 
@@ -847,10 +957,15 @@ def package_to_inputs_dict(
 
 def get_available_binaries(cran_url, details):
     url = cran_url + "/" + details["dir"]
-    response = requests.get(url)
-    response.raise_for_status()
+    if (mirror := _local_mirror(cran_url)) is not None:
+        binaries_dir = join(mirror, details["dir"])
+        filenames = listdir(binaries_dir) if isdir(binaries_dir) else []
+    else:
+        response = requests.get(url)
+        response.raise_for_status()
+        filenames = re.findall(r'<a href="([^"]*)">\1</a>', response.text)
     ext = details["ext"]
-    for filename in re.findall(r'<a href="([^"]*)">\1</a>', response.text):
+    for filename in filenames:
         if filename.endswith(ext):
             pkg, _, ver = filename.rpartition("_")
             ver, _, _ = ver.rpartition(ext)
@@ -864,6 +979,604 @@ def remove_comments(template):
     return "\n".join(lines_no_comments)
 
 
+def _needs_cran_index(inputs: dict) -> bool:
+    location = inputs["location"]
+    is_github_url = location and "github.com" in location
+    is_tarfile = location and isfile(location) and tarfile.is_tarfile(location)
+    return not (is_github_url or is_tarfile)
+
+
+def _skeletonize_package(
+    inputs: dict,
+    d: dict,
+    *,
+    cran_url: str,
+    cran_index: dict | None,
+    session: requests.Session | None,
+    cran_layout_template: dict,
+    config: Config,
+    git_tag: str | None,
+    archive: bool,
+    allow_archived: bool,
+    version_compare: bool,
+    update_policy: str | None,
+    add_maintainer: str | None,
+    use_when_no_binary: str,
+    use_noarch_generic: bool,
+    use_rtools_win: bool,
+    add_cross_r_base: bool,
+    no_comments: bool,
+    r_interp: str,
+    recursive: bool,
+) -> list[str]:
+    """Fill in the recipe data ``d`` of the package described by ``inputs``, returning
+    the dependencies to skeletonize next when ``recursive``."""
+    m: MetaData
+    dependencies = []
+
+    location = inputs["location"]
+    pkg_name = inputs["pkg-name"]
+    version = inputs["version"]
+    is_github_url = location and "github.com" in location
+    is_tarfile = location and isfile(location) and tarfile.is_tarfile(location)
+    is_archive = False
+    url = inputs["location"]
+
+    dir_path = inputs["new-location"]
+    print(f"Making/refreshing recipe for {pkg_name}")
+
+    # Bodges GitHub packages into cran_metadata
+    if is_tarfile:
+        cran_package = get_archive_metadata(location)
+
+    elif is_github_url or is_tarfile:
+        with _git_lock:
+            rm_rf(config.work_dir)
+            m = MetaData.fromdict({"source": {"git_url": location}}, config=config)
+            source.git_source(
+                m.get_section("source"), m.config.git_cache, m.config.work_dir
+            )
+            new_git_tag = git_tag if git_tag else get_latest_git_tag(config)
+            p = subprocess.Popen(
+                ["git", "checkout", new_git_tag],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=config.work_dir,
+            )
+            stdout, stderr = p.communicate()
+            stdout = stdout.decode("utf-8")
+            stderr = stderr.decode("utf-8")
+            if p.returncode:
+                sys.exit(
+                    f"Error: 'git checkout {new_git_tag}' failed ({stderr.strip()}).\n"
+                    "Invalid tag?"
+                )
+            if stdout:
+                print(stdout, file=sys.stdout)
+            if stderr:
+                print(stderr, file=sys.stderr)
+            DESCRIPTION = join(config.work_dir, "DESCRIPTION")
+            if not isfile(DESCRIPTION):
+                sub_description_pkg = join(config.work_dir, "pkg", "DESCRIPTION")
+                sub_description_name = join(
+                    config.work_dir, location.split("/")[-1], "DESCRIPTION"
+                )
+                if isfile(sub_description_pkg):
+                    DESCRIPTION = sub_description_pkg
+                elif isfile(sub_description_name):
+                    DESCRIPTION = sub_description_name
+            else:
+                sys.exit(
+                    f"{location} does not appear to be a valid R package "
+                    f"(no DESCRIPTION file in {sub_description_pkg}, {sub_description_name})"
+                )
+            # read before the next GitHub package replaces the checkout
+            cran_package = get_archive_metadata(DESCRIPTION)
+
+    else:
+        if pkg_name.lower() not in cran_index:
+            sys.exit(f"Package {pkg_name} not found")
+        package, cran_version = cran_index[pkg_name.lower()]
+        if cran_version and (not version or version == cran_version):
+            version = cran_version
+        elif version and not archive:
+            print(
+                f"ERROR: Version {version} of package {package} is archived, but --no-archive was selected"
+            )
+            sys.exit(1)
+        elif not version and not cran_version and not allow_archived:
+            print(
+                f"ERROR: Package {pkg_name} is archived; to build, use --allow-archived or a --version value"
+            )
+            sys.exit(1)
+        else:
+            is_archive = True
+            all_versions = get_cran_archive_versions(cran_url, session, package)
+            if cran_version:
+                all_versions = [cran_version] + all_versions
+            if not version:
+                version = all_versions[0]
+            elif version not in all_versions:
+                msg = f"ERROR: Version {version} of package {package} not found.\n  Available versions: "
+                print(msg + ", ".join(all_versions))
+                sys.exit(1)
+        cran_package = None
+
+    if cran_package is not None:
+        package = cran_package["Package"]
+        version = cran_package["Version"]
+    plower = package.lower()
+    d.update(
+        {
+            "cran_packagename": package,
+            "cran_version": version,
+            "packagename": "r-" + plower,
+            # Conda versions cannot have -. Conda (verlib) will treat _ as a .
+            "conda_version": version.replace("-", "_"),
+            "patches": "",
+            "build_number": 0,
+            "build_depends": "",
+            "host_depends": "",
+            "run_depends": "",
+            # CRAN doesn't seem to have this metadata :(
+            "home_comment": "#",
+            "homeurl": "",
+            "summary_comment": "#",
+            "summary": "",
+            "binary1": "",
+            "binary2": "",
+        }
+    )
+
+    if version_compare:
+        sys.exit(not version_compare(dir_path, d["conda_version"]))
+
+    patches = []
+    script_env = []
+    extra_recipe_maintainers = []
+    build_number = 0
+    if update_policy and update_policy.startswith("merge") and inputs["old-metadata"]:
+        m = inputs["old-metadata"]
+        patches = make_array(m, "source/patches")
+        script_env = make_array(m, "build/script_env")
+        extra_recipe_maintainers = make_array(
+            m, "extra/recipe-maintainers", add_maintainer
+        )
+        if m.version() == d["conda_version"]:
+            build_number = m.build_number()
+            build_number += 1 if update_policy == "merge-incr-build-num" else 0
+    if add_maintainer:
+        new_maintainer = f"{INDENT}{add_maintainer}"
+        if new_maintainer not in extra_recipe_maintainers:
+            if not len(extra_recipe_maintainers):
+                # We hit this case when there is no existing recipe.
+                extra_recipe_maintainers = make_array(
+                    {}, "extra/recipe-maintainers", True
+                )
+            extra_recipe_maintainers.append(new_maintainer)
+    if len(extra_recipe_maintainers):
+        extra_recipe_maintainers[1:].sort()
+        extra_recipe_maintainers.insert(0, "extra:\n  ")
+    d["extra_recipe_maintainers"] = "".join(extra_recipe_maintainers)
+    d["patches"] = "".join(patches)
+    d["script_env"] = "".join(script_env)
+    d["build_number"] = build_number
+
+    cached_path = None
+    cran_layout = copy.deepcopy(cran_layout_template)
+    available = {}
+
+    description_path = None
+    for archive_type, archive_details in cran_layout.items():
+        contrib_url = ""
+        archive_details["cran_version"] = d["cran_version"]
+        archive_details["conda_version"] = d["conda_version"]
+        if is_archive and archive_type == "source":
+            archive_details["dir"] += "Archive/" + package + "/"
+        available_artefact = (
+            True
+            if archive_type == "source"
+            else package in archive_details["binaries"]
+            and any(
+                d["cran_version"] == v for v, _ in archive_details["binaries"][package]
+            )
+        )
+        if not available_artefact:
+            if use_when_no_binary == "error":
+                print("ERROR: --use-when-no-binary is error (and there is no binary)")
+                sys.exit(1)
+            elif use_when_no_binary.startswith("old"):
+                if package not in archive_details["binaries"]:
+                    if use_when_no_binary.endswith("src"):
+                        available_artefact = False
+                        archive_details["use_this"] = False
+                        continue
+                    else:
+                        print(
+                            "ERROR: No binary nor old binary found "
+                            "(maybe pass --use-when-no-binary=old-src to fallback to source?)"
+                        )
+                        sys.exit(1)
+                # Version needs to be stored in archive_details.
+                archive_details["cranurl"] = archive_details["binaries"][package][-1][1]
+                archive_details["conda_version"] = archive_details["binaries"][package][
+                    -1
+                ][0]
+                archive_details["cran_version"] = archive_details[
+                    "conda_version"
+                ].replace("_", "-")
+                available_artefact = True
+        # We may need to inspect the file later to determine which compilers are needed.
+        cached_path = None
+        sha256 = hashlib.sha256()
+        if archive_details["use_this"] and available_artefact:
+            if is_tarfile:
+                filename = basename(location)
+                contrib_url = relpath(location, dir_path)
+                contrib_url_rendered = package_url = contrib_url
+                cached_path = location
+            elif not is_github_url or archive_type != "source":
+                filename_rendered = "{}_{}{}".format(
+                    package, archive_details["cran_version"], archive_details["ext"]
+                )
+                filename = f"{package}_{{{{ version }}}}" + archive_details["ext"]
+                contrib_url = "{{{{ cran_mirror }}}}/{}".format(archive_details["dir"])
+                contrib_url_rendered = cran_url + "/{}".format(archive_details["dir"])
+                package_url = contrib_url_rendered + filename_rendered
+                print(f"Downloading {archive_type} from {package_url}")
+                try:
+                    cached_path, _ = source.download_to_cache(
+                        config.src_cache,
+                        "",
+                        {
+                            "url": package_url,
+                            "fn": archive_type + "-" + filename_rendered,
+                        },
+                    )
+                except:
+                    print(
+                        f"logic error, file {package_url} should exist, we found it in a dir listing earlier."
+                    )
+                    sys.exit(1)
+                if description_path is None or archive_type == "source":
+                    description_path = cached_path
+            available_details = {}
+            available_details["selector"] = archive_details["selector"]
+            available_details["cran_version"] = archive_details["cran_version"]
+            available_details["conda_version"] = archive_details["conda_version"]
+            if cached_path:
+                sha256.update(open(cached_path, "rb").read())
+                archive_details["cranurl"] = package_url
+                available_details["filename"] = filename
+                available_details["contrib_url"] = contrib_url
+                available_details["contrib_url_rendered"] = contrib_url_rendered
+                available_details["hash_entry"] = f"sha256: {sha256.hexdigest()}"
+                available_details["cached_path"] = cached_path
+            # This is rubbish; d[] should be renamed global[] and should be
+            #      merged into source and binaryN.
+            if archive_type == "source":
+                if is_github_url:
+                    available_details["url_key"] = ""
+                    available_details["git_url_key"] = "git_url:"
+                    available_details["git_tag_key"] = "git_tag:"
+                    hash_msg = (
+                        "# You can add a hash for the file here, (md5, sha1 or sha256)"
+                    )
+                    available_details["hash_entry"] = hash_msg
+                    available_details["filename"] = ""
+                    available_details["cranurl"] = ""
+                    available_details["git_url"] = url
+                    available_details["git_tag"] = new_git_tag
+                    available_details["archive_keys"] = ""
+                else:
+                    available_details["url_key"] = "url:"
+                    available_details["git_url_key"] = ""
+                    available_details["git_tag_key"] = ""
+                    available_details["cranurl"] = " " + contrib_url + filename
+                    available_details["git_url"] = ""
+                    available_details["git_tag"] = ""
+            else:
+                available_details["cranurl"] = archive_details["cranurl"]
+
+            available_details["patches"] = d["patches"]
+            available[archive_type] = available_details
+
+    # Figure out the selectors according to what is available.
+    from_source = ALL_PLATFORMS[:]
+    binary_id = 1
+    for archive_type, archive_details in available.items():
+        if archive_type == "source":
+            for k, v in archive_details.items():
+                d[k] = v
+        else:
+            sel = archive_details["selector"]
+            # Does the file exist? If not we need to build from source.
+            from_source.remove(sel)
+            binary_id += 1
+    if from_source == ALL_PLATFORMS:
+        sel_src = ""
+        sel_src_and_win = "  # [win]"
+        sel_src_not_win = "  # [not win]"
+    else:
+        sel_src = "  # [" + " or ".join(from_source) + "]"
+        sel_src_and_win = (
+            "  # ["
+            + " or ".join(fs for fs in from_source if fs.startswith("win"))
+            + "]"
+        )
+        sel_src_not_win = (
+            "  # ["
+            + " or ".join(fs for fs in from_source if not fs.startswith("win"))
+            + "]"
+        )
+    sel_cross = "  # [build_platform != target_platform]"
+    d["sel_src"] = sel_src
+    d["sel_src_and_win"] = sel_src_and_win
+    d["sel_src_not_win"] = sel_src_not_win
+    d["from_source"] = from_source
+
+    if "source" in available:
+        available_details = available["source"]
+        available_details["sel"] = sel_src
+        filename = available_details["filename"]
+        if "contrib_url" in available_details:
+            contrib_url = available_details["contrib_url"]
+            if archive:
+                if is_tarfile:
+                    available_details["cranurl"] = INDENT + contrib_url
+                elif not is_archive:
+                    available_details["cranurl"] = (
+                        INDENT
+                        + contrib_url
+                        + filename
+                        + sel_src
+                        + INDENT
+                        + contrib_url
+                        + f"Archive/{package}/"
+                        + filename
+                        + sel_src
+                    )
+            else:
+                available_details["cranurl"] = " " + contrib_url + filename + sel_src
+        if not is_github_url:
+            available_details["archive_keys"] = (
+                "{url_key}{sel}    {cranurl}\n  {hash_entry}{sel}"
+            ).format(**available_details)
+
+    # Extract the DESCRIPTION data from the source
+    if cran_package is None:
+        cran_package = get_archive_metadata(description_path)
+    d["cran_metadata"] = "\n".join(
+        [f"# {line}" for line in cran_package["orig_lines"] if line]
+    )
+
+    # Render the source and binaryN keys
+    binary_id = 1
+    d["version_binary1"] = d["version_binary2"] = ""
+    for archive_type, archive_details in available.items():
+        if archive_type == "source":
+            d["source"] = SOURCE_META.format(**archive_details)
+            d["version_source"] = VERSION_META.format(**archive_details)
+        else:
+            archive_details["sel"] = "  # [" + archive_details["selector"] + "]"
+            d["binary" + str(binary_id)] = BINARY_META.format(**archive_details)
+            d["version_binary" + str(binary_id)] = VERSION_META.format(
+                **archive_details
+            )
+            binary_id += 1
+
+    license_info = get_license_info(
+        cran_package.get("License", "None"), allowed_license_families
+    )
+    d["license"], d["license_file"], d["license_family"] = license_info
+
+    if "License_is_FOSS" in cran_package:
+        d["license"] += " (FOSS)"
+    if cran_package.get("License_restricts_use") == "yes":
+        d["license"] += " (Restricts use)"
+
+    if "URL" in cran_package:
+        d["home_comment"] = ""
+        d["homeurl"] = " " + yaml_quote_string(cran_package["URL"])
+    else:
+        # use CRAN page as homepage if nothing has been specified
+        d["home_comment"] = ""
+        if is_github_url:
+            d["homeurl"] = f" {location}"
+        else:
+            d["homeurl"] = f" https://CRAN.R-project.org/package={package}"
+
+    if not use_noarch_generic or cran_package.get("NeedsCompilation", "no") == "yes":
+        d["noarch_generic"] = ""
+    else:
+        d["noarch_generic"] = "noarch: generic"
+
+    if "Description" in cran_package:
+        d["summary_comment"] = ""
+        d["summary"] = " " + yaml_quote_string(cran_package["Description"])
+
+    if "Suggests" in cran_package and not no_comments:
+        d["suggests"] = "# Suggests: {}".format(cran_package["Suggests"])
+    else:
+        d["suggests"] = ""
+
+    # Every package depends on at least R.
+    # I'm not sure what the difference between depends and imports is.
+    depends = [
+        s.strip() for s in cran_package.get("Depends", "").split(",") if s.strip()
+    ]
+    imports = [
+        s.strip() for s in cran_package.get("Imports", "").split(",") if s.strip()
+    ]
+    links = [
+        s.strip() for s in cran_package.get("LinkingTo", "").split(",") if s.strip()
+    ]
+
+    dep_dict = {}
+
+    seen = set()
+    for s in list(chain(imports, depends, links)):
+        match = VERSION_DEPENDENCY_REGEX.match(s)
+        if not match:
+            sys.exit(f"Could not parse version from dependency of {package}: {s}")
+        name = match.group("name")
+        if name in seen:
+            continue
+        seen.add(name)
+        archs = match.group("archs")
+        relop = match.group("relop") or ""
+        ver = match.group("version") or ""
+        ver = ver.replace("-", "_")
+        # If there is a relop there should be a version
+        assert not relop or ver
+
+        if archs:
+            sys.exit(
+                "Don't know how to handle archs from dependency of "
+                f"package {package}: {s}"
+            )
+
+        dep_dict[name] = f"{relop}{ver}"
+
+    if "R" not in dep_dict:
+        dep_dict["R"] = ""
+
+    os_type = cran_package.get("OS_type", "")
+    if os_type != "unix" and os_type != "windows" and os_type != "":
+        print(f"Unknown OS_type: {os_type} in CRAN package")
+        os_type = ""
+    if os_type == "unix":
+        d["skip_os"] = "skip: True  # [not unix]"
+        d["noarch_generic"] = ""
+    if os_type == "windows":
+        d["skip_os"] = "skip: True  # [not win]"
+        d["noarch_generic"] = ""
+    if os_type == "" and no_comments:
+        d["skip_os"] = ""
+    elif os_type == "":
+        d["skip_os"] = "# no skip"
+
+    need_git = is_github_url
+    if cran_package.get("NeedsCompilation", "no") == "yes":
+        with tarfile.open(available["source"]["cached_path"]) as tf:
+            need_f = any(
+                [
+                    f.name.lower().endswith((".f", ".f90", ".f77", ".f95", ".f03"))
+                    for f in tf
+                ]
+            )
+            # Fortran builds use CC to perform the link (they do not call the linker directly).
+            need_c = (
+                True if need_f else any([f.name.lower().endswith(".c") for f in tf])
+            )
+            need_cxx = any(
+                [f.name.lower().endswith((".cxx", ".cpp", ".cc", ".c++")) for f in tf]
+            )
+            need_autotools = any([f.name.lower().endswith("/configure") for f in tf])
+            need_make = (
+                True
+                if any((need_autotools, need_f, need_cxx, need_c))
+                else any(
+                    [f.name.lower().endswith(("/makefile", "/makevars")) for f in tf]
+                )
+            )
+    else:
+        need_c = need_cxx = need_f = need_autotools = need_make = False
+
+    if "Rcpp" in dep_dict or "RcppArmadillo" in dep_dict:
+        need_cxx = True
+
+    if need_cxx:
+        need_c = True
+
+    for dep_type in ["build", "host", "run"]:
+        deps = []
+        # Put non-R dependencies first.
+        if dep_type == "build":
+            if need_c:
+                deps.append(
+                    f"{INDENT}{{{{ compiler('c') }}}}            {sel_src_not_win}"
+                )
+                deps.append(
+                    f"{INDENT}{{{{ compiler('m2w64_c') }}}}      {sel_src_and_win}"
+                )
+            if need_cxx:
+                deps.append(
+                    f"{INDENT}{{{{ compiler('cxx') }}}}          {sel_src_not_win}"
+                )
+                deps.append(
+                    f"{INDENT}{{{{ compiler('m2w64_cxx') }}}}    {sel_src_and_win}"
+                )
+            if need_f:
+                deps.append(
+                    f"{INDENT}{{{{ compiler('fortran') }}}}      {sel_src_not_win}"
+                )
+                deps.append(
+                    f"{INDENT}{{{{ compiler('m2w64_fortran') }}}}{sel_src_and_win}"
+                )
+            if use_rtools_win:
+                need_c = need_cxx = need_f = need_autotools = need_make = False
+                deps.append(f"{INDENT}rtools                   {sel_src_and_win}")
+                # extsoft is legacy. R packages will download rwinlib subprojects
+                # as necessary according to Jeroen Ooms. (may need to disable that
+                # for non-MRO builds or maybe switch to Jeroen's toolchain?)
+                # deps.append("{indent}{{{{native}}}}extsoft     {sel}".format(
+                #     indent=INDENT, sel=sel_src_and_win))
+            if need_autotools or need_make or need_git:
+                deps.append(f"{INDENT}{{{{ posix }}}}filesystem      {sel_src_and_win}")
+            if need_git:
+                deps.append(f"{INDENT}{{{{ posix }}}}git")
+            if need_autotools:
+                deps.append(f"{INDENT}{{{{ posix }}}}sed             {sel_src_and_win}")
+                deps.append(f"{INDENT}{{{{ posix }}}}grep            {sel_src_and_win}")
+                deps.append(f"{INDENT}{{{{ posix }}}}autoconf        {sel_src}")
+                deps.append(f"{INDENT}{{{{ posix }}}}automake        {sel_src_not_win}")
+                deps.append(f"{INDENT}{{{{ posix }}}}automake-wrapper{sel_src_and_win}")
+                deps.append(f"{INDENT}{{{{ posix }}}}pkg-config")
+            if need_make:
+                deps.append(f"{INDENT}{{{{ posix }}}}make            {sel_src}")
+                if not need_autotools:
+                    deps.append(
+                        f"{INDENT}{{{{ posix }}}}sed             {sel_src_and_win}"
+                    )
+                deps.append(f"{INDENT}{{{{ posix }}}}coreutils       {sel_src_and_win}")
+            deps.append(f"{INDENT}{{{{ posix }}}}zip             {sel_src_and_win}")
+            if add_cross_r_base:
+                deps.append(f"{INDENT}cross-r-base {{{{ r_base }}}}  {sel_cross}")
+        elif dep_type == "run":
+            if need_c or need_cxx or need_f:
+                deps.append(f"{INDENT}{{{{native}}}}gcc-libs       {sel_src_and_win}")
+
+        if dep_type == "host" or dep_type == "run":
+            for name in sorted(dep_dict):
+                if name in R_BASE_PACKAGE_NAMES:
+                    continue
+                if name == "R":
+                    # Put R first
+                    # Regarless of build or run, and whether this is a
+                    # recommended package or not, it can only depend on
+                    # r_interp since anything else can and will cause
+                    # cycles in the dependency graph. The cran metadata
+                    # lists all dependencies anyway, even those packages
+                    # that are in the recommended group.
+                    # We don't include any R version restrictions because
+                    # conda-build always pins r-base and mro-base version.
+                    deps.insert(0, f"{INDENT}{r_interp}")
+                else:
+                    conda_name = "r-" + name.lower()
+
+                    if dep_dict[name]:
+                        deps.append(f"{INDENT}{conda_name} {dep_dict[name]}")
+                    else:
+                        deps.append(f"{INDENT}{conda_name}")
+                    if recursive:
+                        dependencies.append(name.lower())
+
+        d[f"{dep_type}_depends"] = "".join(deps)
+
+    return dependencies
+
+
 def skeletonize(
     in_packages: list[str],
     output_dir: str = ".",
@@ -894,6 +1607,7 @@ def skeletonize(
     allow_archived: bool = False,
     add_cross_r_base: bool = False,
     no_comments: bool = False,
+    jobs: int | None = None,
 ) -> None:
     if (
         use_when_no_binary != "error"
@@ -904,8 +1618,6 @@ def skeletonize(
         print(f"ERROR: --use_when_no_binary={use_when_no_binary} not yet implemented")
         sys.exit(1)
 
-    m: MetaData
-
     output_dir = realpath(output_dir)
     config = get_or_merge_config(config, variant_config_files=variant_config_files)
 
@@ -928,6 +1640,9 @@ def skeletonize(
     package_dicts = {}
     package_list = []
 
+    # a local mirror directory is read without going online
+    if isdir(cran_url):
+        cran_url = url_path(realpath(cran_url))
     cran_url = cran_url.rstrip("/")
 
     # Get cran index lazily so we don't have to go to CRAN
@@ -973,622 +1688,60 @@ def skeletonize(
     for package_name, package_dict in package_dicts.items():
         package_list.append(package_name)
 
-    while package_list:
-        inputs = package_dicts[package_list.pop()]["inputs"]
-        location = inputs["location"]
-        pkg_name = inputs["pkg-name"]
-        version = inputs["version"]
-        is_github_url = location and "github.com" in location
-        is_tarfile = location and isfile(location) and tarfile.is_tarfile(location)
-        is_archive = False
-        url = inputs["location"]
-
-        dir_path = inputs["new-location"]
-        print(f"Making/refreshing recipe for {pkg_name}")
-
-        # Bodges GitHub packages into cran_metadata
-        if is_tarfile:
-            cran_package = get_archive_metadata(location)
-
-        elif is_github_url or is_tarfile:
-            rm_rf(config.work_dir)
-            m = MetaData.fromdict({"source": {"git_url": location}}, config=config)
-            source.git_source(
-                m.get_section("source"), m.config.git_cache, m.config.work_dir
-            )
-            new_git_tag = git_tag if git_tag else get_latest_git_tag(config)
-            p = subprocess.Popen(
-                ["git", "checkout", new_git_tag],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=config.work_dir,
-            )
-            stdout, stderr = p.communicate()
-            stdout = stdout.decode("utf-8")
-            stderr = stderr.decode("utf-8")
-            if p.returncode:
-                sys.exit(
-                    f"Error: 'git checkout {new_git_tag}' failed ({stderr.strip()}).\n"
-                    "Invalid tag?"
-                )
-            if stdout:
-                print(stdout, file=sys.stdout)
-            if stderr:
-                print(stderr, file=sys.stderr)
-            DESCRIPTION = join(config.work_dir, "DESCRIPTION")
-            if not isfile(DESCRIPTION):
-                sub_description_pkg = join(config.work_dir, "pkg", "DESCRIPTION")
-                sub_description_name = join(
-                    config.work_dir, location.split("/")[-1], "DESCRIPTION"
-                )
-                if isfile(sub_description_pkg):
-                    DESCRIPTION = sub_description_pkg
-                elif isfile(sub_description_name):
-                    DESCRIPTION = sub_description_name
-                else:
-                    sys.exit(
-                        f"{location} does not appear to be a valid R package "
-                        f"(no DESCRIPTION file in {sub_description_pkg}, {sub_description_name})"
-                    )
-            cran_package = get_archive_metadata(DESCRIPTION)
-
-        else:
-            if cran_index is None:
+    # each round skeletonizes the packages found by the previous round concurrently
+    jobs = jobs or min(32, (cpu_count() or 1) + 4)
+    session = None
+    with ThreadPoolExecutor(jobs) as executor:
+        while package_list:
+            batch = [package_dicts[name] for name in reversed(package_list)]
+            package_list.clear()
+            if cran_index is None and any(
+                _needs_cran_index(package_dict["inputs"]) for package_dict in batch
+            ):
                 session = get_session(output_dir)
-                cran_index = get_cran_index(cran_url, session)
-            if pkg_name.lower() not in cran_index:
-                sys.exit(f"Package {pkg_name} not found")
-            package, cran_version = cran_index[pkg_name.lower()]
-            if cran_version and (not version or version == cran_version):
-                version = cran_version
-            elif version and not archive:
-                print(
-                    f"ERROR: Version {version} of package {package} is archived, but --no-archive was selected"
+                cran_index = get_cran_index(
+                    cran_url, session, cache_dir=join(output_dir, ".web_cache")
                 )
-                sys.exit(1)
-            elif not version and not cran_version and not allow_archived:
-                print(
-                    f"ERROR: Package {pkg_name} is archived; to build, use --allow-archived or a --version value"
-                )
-                sys.exit(1)
-            else:
-                is_archive = True
-                all_versions = get_cran_archive_versions(cran_url, session, package)
-                if cran_version:
-                    all_versions = [cran_version] + all_versions
-                if not version:
-                    version = all_versions[0]
-                elif version not in all_versions:
-                    msg = f"ERROR: Version {version} of package {package} not found.\n  Available versions: "
-                    print(msg + ", ".join(all_versions))
-                    sys.exit(1)
-            cran_package = None
-
-        if cran_package is not None:
-            package = cran_package["Package"]
-            version = cran_package["Version"]
-        plower = package.lower()
-        d = package_dicts[pkg_name]
-        d.update(
-            {
-                "cran_packagename": package,
-                "cran_version": version,
-                "packagename": "r-" + plower,
-                # Conda versions cannot have -. Conda (verlib) will treat _ as a .
-                "conda_version": version.replace("-", "_"),
-                "patches": "",
-                "build_number": 0,
-                "build_depends": "",
-                "host_depends": "",
-                "run_depends": "",
-                # CRAN doesn't seem to have this metadata :(
-                "home_comment": "#",
-                "homeurl": "",
-                "summary_comment": "#",
-                "summary": "",
-                "binary1": "",
-                "binary2": "",
-            }
-        )
-
-        if version_compare:
-            sys.exit(not version_compare(dir_path, d["conda_version"]))
-
-        patches = []
-        script_env = []
-        extra_recipe_maintainers = []
-        build_number = 0
-        if (
-            update_policy
-            and update_policy.startswith("merge")
-            and inputs["old-metadata"]
-        ):
-            m = inputs["old-metadata"]
-            patches = make_array(m, "source/patches")
-            script_env = make_array(m, "build/script_env")
-            extra_recipe_maintainers = make_array(
-                m, "extra/recipe-maintainers", add_maintainer
-            )
-            if m.version() == d["conda_version"]:
-                build_number = m.build_number()
-                build_number += 1 if update_policy == "merge-incr-build-num" else 0
-        if add_maintainer:
-            new_maintainer = f"{INDENT}{add_maintainer}"
-            if new_maintainer not in extra_recipe_maintainers:
-                if not len(extra_recipe_maintainers):
-                    # We hit this case when there is no existing recipe.
-                    extra_recipe_maintainers = make_array(
-                        {}, "extra/recipe-maintainers", True
-                    )
-                extra_recipe_maintainers.append(new_maintainer)
-        if len(extra_recipe_maintainers):
-            extra_recipe_maintainers[1:].sort()
-            extra_recipe_maintainers.insert(0, "extra:\n  ")
-        d["extra_recipe_maintainers"] = "".join(extra_recipe_maintainers)
-        d["patches"] = "".join(patches)
-        d["script_env"] = "".join(script_env)
-        d["build_number"] = build_number
-
-        cached_path = None
-        cran_layout = copy.deepcopy(cran_layout_template)
-        available = {}
-
-        description_path = None
-        for archive_type, archive_details in cran_layout.items():
-            contrib_url = ""
-            archive_details["cran_version"] = d["cran_version"]
-            archive_details["conda_version"] = d["conda_version"]
-            if is_archive and archive_type == "source":
-                archive_details["dir"] += "Archive/" + package + "/"
-            available_artefact = (
-                True
-                if archive_type == "source"
-                else package in archive_details["binaries"]
-                and any(
-                    d["cran_version"] == v
-                    for v, _ in archive_details["binaries"][package]
+            futures = [
+                executor.submit(
+                    _skeletonize_package,
+                    package_dict["inputs"],
+                    package_dict,
+                    cran_url=cran_url,
+                    cran_index=cran_index,
+                    session=session,
+                    cran_layout_template=cran_layout_template,
+                    config=config,
+                    git_tag=git_tag,
+                    archive=archive,
+                    allow_archived=allow_archived,
+                    version_compare=version_compare,
+                    update_policy=update_policy,
+                    add_maintainer=add_maintainer,
+                    use_when_no_binary=use_when_no_binary,
+                    use_noarch_generic=use_noarch_generic,
+                    use_rtools_win=use_rtools_win,
+                    add_cross_r_base=add_cross_r_base,
+                    no_comments=no_comments,
+                    r_interp=r_interp,
+                    recursive=recursive,
                 )
-            )
-            if not available_artefact:
-                if use_when_no_binary == "error":
-                    print(
-                        "ERROR: --use-when-no-binary is error (and there is no binary)"
-                    )
-                    sys.exit(1)
-                elif use_when_no_binary.startswith("old"):
-                    if package not in archive_details["binaries"]:
-                        if use_when_no_binary.endswith("src"):
-                            available_artefact = False
-                            archive_details["use_this"] = False
-                            continue
-                        else:
-                            print(
-                                "ERROR: No binary nor old binary found "
-                                "(maybe pass --use-when-no-binary=old-src to fallback to source?)"
-                            )
-                            sys.exit(1)
-                    # Version needs to be stored in archive_details.
-                    archive_details["cranurl"] = archive_details["binaries"][package][
-                        -1
-                    ][1]
-                    archive_details["conda_version"] = archive_details["binaries"][
-                        package
-                    ][-1][0]
-                    archive_details["cran_version"] = archive_details[
-                        "conda_version"
-                    ].replace("_", "-")
-                    available_artefact = True
-            # We may need to inspect the file later to determine which compilers are needed.
-            cached_path = None
-            sha256 = hashlib.sha256()
-            if archive_details["use_this"] and available_artefact:
-                if is_tarfile:
-                    filename = basename(location)
-                    contrib_url = relpath(location, dir_path)
-                    contrib_url_rendered = package_url = contrib_url
-                    cached_path = location
-                elif not is_github_url or archive_type != "source":
-                    filename_rendered = "{}_{}{}".format(
-                        package, archive_details["cran_version"], archive_details["ext"]
-                    )
-                    filename = f"{package}_{{{{ version }}}}" + archive_details["ext"]
-                    contrib_url = "{{{{ cran_mirror }}}}/{}".format(
-                        archive_details["dir"]
-                    )
-                    contrib_url_rendered = cran_url + "/{}".format(
-                        archive_details["dir"]
-                    )
-                    package_url = contrib_url_rendered + filename_rendered
-                    print(f"Downloading {archive_type} from {package_url}")
-                    try:
-                        cached_path, _ = source.download_to_cache(
-                            config.src_cache,
-                            "",
-                            {
-                                "url": package_url,
-                                "fn": archive_type + "-" + filename_rendered,
-                            },
-                        )
-                    except:
-                        print(
-                            f"logic error, file {package_url} should exist, we found it in a dir listing earlier."
-                        )
-                        sys.exit(1)
-                    if description_path is None or archive_type == "source":
-                        description_path = cached_path
-                available_details = {}
-                available_details["selector"] = archive_details["selector"]
-                available_details["cran_version"] = archive_details["cran_version"]
-                available_details["conda_version"] = archive_details["conda_version"]
-                if cached_path:
-                    sha256.update(open(cached_path, "rb").read())
-                    archive_details["cranurl"] = package_url
-                    available_details["filename"] = filename
-                    available_details["contrib_url"] = contrib_url
-                    available_details["contrib_url_rendered"] = contrib_url_rendered
-                    available_details["hash_entry"] = f"sha256: {sha256.hexdigest()}"
-                    available_details["cached_path"] = cached_path
-                # This is rubbish; d[] should be renamed global[] and should be
-                #      merged into source and binaryN.
-                if archive_type == "source":
-                    if is_github_url:
-                        available_details["url_key"] = ""
-                        available_details["git_url_key"] = "git_url:"
-                        available_details["git_tag_key"] = "git_tag:"
-                        hash_msg = "# You can add a hash for the file here, (md5, sha1 or sha256)"
-                        available_details["hash_entry"] = hash_msg
-                        available_details["filename"] = ""
-                        available_details["cranurl"] = ""
-                        available_details["git_url"] = url
-                        available_details["git_tag"] = new_git_tag
-                        available_details["archive_keys"] = ""
-                    else:
-                        available_details["url_key"] = "url:"
-                        available_details["git_url_key"] = ""
-                        available_details["git_tag_key"] = ""
-                        available_details["cranurl"] = " " + contrib_url + filename
-                        available_details["git_url"] = ""
-                        available_details["git_tag"] = ""
-                else:
-                    available_details["cranurl"] = archive_details["cranurl"]
-
-                available_details["patches"] = d["patches"]
-                available[archive_type] = available_details
-
-        # Figure out the selectors according to what is available.
-        _all = ["linux", "win32", "win64", "osx"]
-        from_source = _all[:]
-        binary_id = 1
-        for archive_type, archive_details in available.items():
-            if archive_type == "source":
-                for k, v in archive_details.items():
-                    d[k] = v
-            else:
-                sel = archive_details["selector"]
-                # Does the file exist? If not we need to build from source.
-                from_source.remove(sel)
-                binary_id += 1
-        if from_source == _all:
-            sel_src = ""
-            sel_src_and_win = "  # [win]"
-            sel_src_not_win = "  # [not win]"
-        else:
-            sel_src = "  # [" + " or ".join(from_source) + "]"
-            sel_src_and_win = (
-                "  # ["
-                + " or ".join(fs for fs in from_source if fs.startswith("win"))
-                + "]"
-            )
-            sel_src_not_win = (
-                "  # ["
-                + " or ".join(fs for fs in from_source if not fs.startswith("win"))
-                + "]"
-            )
-        sel_cross = "  # [build_platform != target_platform]"
-        d["sel_src"] = sel_src
-        d["sel_src_and_win"] = sel_src_and_win
-        d["sel_src_not_win"] = sel_src_not_win
-        d["from_source"] = from_source
-
-        if "source" in available:
-            available_details = available["source"]
-            available_details["sel"] = sel_src
-            filename = available_details["filename"]
-            if "contrib_url" in available_details:
-                contrib_url = available_details["contrib_url"]
-                if archive:
-                    if is_tarfile:
-                        available_details["cranurl"] = INDENT + contrib_url
-                    elif not is_archive:
-                        available_details["cranurl"] = (
-                            INDENT
-                            + contrib_url
-                            + filename
-                            + sel_src
-                            + INDENT
-                            + contrib_url
-                            + f"Archive/{package}/"
-                            + filename
-                            + sel_src
+                for package_dict in batch
+            ]
+            for future in futures:
+                for lower_name in future.result():
+                    if lower_name not in package_dicts:
+                        inputs_dict = package_to_inputs_dict(
+                            output_dir, output_suffix, git_tag, lower_name, None
                         )
-                else:
-                    available_details["cranurl"] = (
-                        " " + contrib_url + filename + sel_src
-                    )
-            if not is_github_url:
-                available_details["archive_keys"] = (
-                    "{url_key}{sel}    {cranurl}\n  {hash_entry}{sel}"
-                ).format(**available_details)
-
-        # Extract the DESCRIPTION data from the source
-        if cran_package is None:
-            cran_package = get_archive_metadata(description_path)
-        d["cran_metadata"] = "\n".join(
-            [f"# {line}" for line in cran_package["orig_lines"] if line]
-        )
-
-        # Render the source and binaryN keys
-        binary_id = 1
-        d["version_binary1"] = d["version_binary2"] = ""
-        for archive_type, archive_details in available.items():
-            if archive_type == "source":
-                d["source"] = SOURCE_META.format(**archive_details)
-                d["version_source"] = VERSION_META.format(**archive_details)
-            else:
-                archive_details["sel"] = "  # [" + archive_details["selector"] + "]"
-                d["binary" + str(binary_id)] = BINARY_META.format(**archive_details)
-                d["version_binary" + str(binary_id)] = VERSION_META.format(
-                    **archive_details
-                )
-                binary_id += 1
-
-        license_info = get_license_info(
-            cran_package.get("License", "None"), allowed_license_families
-        )
-        d["license"], d["license_file"], d["license_family"] = license_info
-
-        if "License_is_FOSS" in cran_package:
-            d["license"] += " (FOSS)"
-        if cran_package.get("License_restricts_use") == "yes":
-            d["license"] += " (Restricts use)"
-
-        if "URL" in cran_package:
-            d["home_comment"] = ""
-            d["homeurl"] = " " + yaml_quote_string(cran_package["URL"])
-        else:
-            # use CRAN page as homepage if nothing has been specified
-            d["home_comment"] = ""
-            if is_github_url:
-                d["homeurl"] = f" {location}"
-            else:
-                d["homeurl"] = f" https://CRAN.R-project.org/package={package}"
-
-        if (
-            not use_noarch_generic
-            or cran_package.get("NeedsCompilation", "no") == "yes"
-        ):
-            d["noarch_generic"] = ""
-        else:
-            d["noarch_generic"] = "noarch: generic"
-
-        if "Description" in cran_package:
-            d["summary_comment"] = ""
-            d["summary"] = " " + yaml_quote_string(cran_package["Description"])
-
-        if "Suggests" in cran_package and not no_comments:
-            d["suggests"] = "# Suggests: {}".format(cran_package["Suggests"])
-        else:
-            d["suggests"] = ""
-
-        # Every package depends on at least R.
-        # I'm not sure what the difference between depends and imports is.
-        depends = [
-            s.strip() for s in cran_package.get("Depends", "").split(",") if s.strip()
-        ]
-        imports = [
-            s.strip() for s in cran_package.get("Imports", "").split(",") if s.strip()
-        ]
-        links = [
-            s.strip() for s in cran_package.get("LinkingTo", "").split(",") if s.strip()
-        ]
-
-        dep_dict = {}
-
-        seen = set()
-        for s in list(chain(imports, depends, links)):
-            match = VERSION_DEPENDENCY_REGEX.match(s)
-            if not match:
-                sys.exit(f"Could not parse version from dependency of {package}: {s}")
-            name = match.group("name")
-            if name in seen:
-                continue
-            seen.add(name)
-            archs = match.group("archs")
-            relop = match.group("relop") or ""
-            ver = match.group("version") or ""
-            ver = ver.replace("-", "_")
-            # If there is a relop there should be a version
-            assert not relop or ver
-
-            if archs:
-                sys.exit(
-                    "Don't know how to handle archs from dependency of "
-                    f"package {package}: {s}"
-                )
-
-            dep_dict[name] = f"{relop}{ver}"
-
-        if "R" not in dep_dict:
-            dep_dict["R"] = ""
-
-        os_type = cran_package.get("OS_type", "")
-        if os_type != "unix" and os_type != "windows" and os_type != "":
-            print(f"Unknown OS_type: {os_type} in CRAN package")
-            os_type = ""
-        if os_type == "unix":
-            d["skip_os"] = "skip: True  # [not unix]"
-            d["noarch_generic"] = ""
-        if os_type == "windows":
-            d["skip_os"] = "skip: True  # [not win]"
-            d["noarch_generic"] = ""
-        if os_type == "" and no_comments:
-            d["skip_os"] = ""
-        elif os_type == "":
-            d["skip_os"] = "# no skip"
-
-        need_git = is_github_url
-        if cran_package.get("NeedsCompilation", "no") == "yes":
-            with tarfile.open(available["source"]["cached_path"]) as tf:
-                need_f = any(
-                    [
-                        f.name.lower().endswith((".f", ".f90", ".f77", ".f95", ".f03"))
-                        for f in tf
-                    ]
-                )
-                # Fortran builds use CC to perform the link (they do not call the linker directly).
-                need_c = (
-                    True if need_f else any([f.name.lower().endswith(".c") for f in tf])
-                )
-                need_cxx = any(
-                    [
-                        f.name.lower().endswith((".cxx", ".cpp", ".cc", ".c++"))
-                        for f in tf
-                    ]
-                )
-                need_autotools = any(
-                    [f.name.lower().endswith("/configure") for f in tf]
-                )
-                need_make = (
-                    True
-                    if any((need_autotools, need_f, need_cxx, need_c))
-                    else any(
-                        [
-                            f.name.lower().endswith(("/makefile", "/makevars"))
-                            for f in tf
-                        ]
-                    )
-                )
-        else:
-            need_c = need_cxx = need_f = need_autotools = need_make = False
-
-        if "Rcpp" in dep_dict or "RcppArmadillo" in dep_dict:
-            need_cxx = True
-
-        if need_cxx:
-            need_c = True
-
-        for dep_type in ["build", "host", "run"]:
-            deps = []
-            # Put non-R dependencies first.
-            if dep_type == "build":
-                if need_c:
-                    deps.append(
-                        f"{INDENT}{{{{ compiler('c') }}}}            {sel_src_not_win}"
-                    )
-                    deps.append(
-                        f"{INDENT}{{{{ compiler('m2w64_c') }}}}      {sel_src_and_win}"
-                    )
-                if need_cxx:
-                    deps.append(
-                        f"{INDENT}{{{{ compiler('cxx') }}}}          {sel_src_not_win}"
-                    )
-                    deps.append(
-                        f"{INDENT}{{{{ compiler('m2w64_cxx') }}}}    {sel_src_and_win}"
-                    )
-                if need_f:
-                    deps.append(
-                        f"{INDENT}{{{{ compiler('fortran') }}}}      {sel_src_not_win}"
-                    )
-                    deps.append(
-                        f"{INDENT}{{{{ compiler('m2w64_fortran') }}}}{sel_src_and_win}"
-                    )
-                if use_rtools_win:
-                    need_c = need_cxx = need_f = need_autotools = need_make = False
-                    deps.append(f"{INDENT}rtools                   {sel_src_and_win}")
-                    # extsoft is legacy. R packages will download rwinlib subprojects
-                    # as necessary according to Jeroen Ooms. (may need to disable that
-                    # for non-MRO builds or maybe switch to Jeroen's toolchain?)
-                    # deps.append("{indent}{{{{native}}}}extsoft     {sel}".format(
-                    #     indent=INDENT, sel=sel_src_and_win))
-                if need_autotools or need_make or need_git:
-                    deps.append(
-                        f"{INDENT}{{{{ posix }}}}filesystem      {sel_src_and_win}"
-                    )
-                if need_git:
-                    deps.append(f"{INDENT}{{{{ posix }}}}git")
-                if need_autotools:
-                    deps.append(
-                        f"{INDENT}{{{{ posix }}}}sed             {sel_src_and_win}"
-                    )
-                    deps.append(
-                        f"{INDENT}{{{{ posix }}}}grep            {sel_src_and_win}"
-                    )
-                    deps.append(f"{INDENT}{{{{ posix }}}}autoconf        {sel_src}")
-                    deps.append(
-                        f"{INDENT}{{{{ posix }}}}automake        {sel_src_not_win}"
-                    )
-                    deps.append(
-                        f"{INDENT}{{{{ posix }}}}automake-wrapper{sel_src_and_win}"
-                    )
-                    deps.append(f"{INDENT}{{{{ posix }}}}pkg-config")
-                if need_make:
-                    deps.append(f"{INDENT}{{{{ posix }}}}make            {sel_src}")
-                    if not need_autotools:
-                        deps.append(
-                            f"{INDENT}{{{{ posix }}}}sed             {sel_src_and_win}"
+                        assert lower_name == inputs_dict["pkg-name"], (
+                            "name {} != inputs_dict['pkg-name'] {}".format(
+                                lower_name, inputs_dict["pkg-name"]
+                            )
                         )
-                    deps.append(
-                        f"{INDENT}{{{{ posix }}}}coreutils       {sel_src_and_win}"
-                    )
-                deps.append(f"{INDENT}{{{{ posix }}}}zip             {sel_src_and_win}")
-                if add_cross_r_base:
-                    deps.append(f"{INDENT}cross-r-base {{{{ r_base }}}}  {sel_cross}")
-            elif dep_type == "run":
-                if need_c or need_cxx or need_f:
-                    deps.append(
-                        f"{INDENT}{{{{native}}}}gcc-libs       {sel_src_and_win}"
-                    )
-
-            if dep_type == "host" or dep_type == "run":
-                for name in sorted(dep_dict):
-                    if name in R_BASE_PACKAGE_NAMES:
-                        continue
-                    if name == "R":
-                        # Put R first
-                        # Regarless of build or run, and whether this is a
-                        # recommended package or not, it can only depend on
-                        # r_interp since anything else can and will cause
-                        # cycles in the dependency graph. The cran metadata
-                        # lists all dependencies anyway, even those packages
-                        # that are in the recommended group.
-                        # We don't include any R version restrictions because
-                        # conda-build always pins r-base and mro-base version.
-                        deps.insert(0, f"{INDENT}{r_interp}")
-                    else:
-                        conda_name = "r-" + name.lower()
-
-                        if dep_dict[name]:
-                            deps.append(f"{INDENT}{conda_name} {dep_dict[name]}")
-                        else:
-                            deps.append(f"{INDENT}{conda_name}")
-                        if recursive:
-                            lower_name = name.lower()
-                            if lower_name not in package_dicts:
-                                inputs_dict = package_to_inputs_dict(
-                                    output_dir, output_suffix, git_tag, lower_name, None
-                                )
-                                assert lower_name == inputs_dict["pkg-name"], (
-                                    "name {} != inputs_dict['pkg-name'] {}".format(
-                                        name, inputs_dict["pkg-name"]
-                                    )
-                                )
-                                assert lower_name not in package_list
-                                package_dicts.update(
-                                    {lower_name: {"inputs": inputs_dict}}
-                                )
-                                package_list.append(lower_name)
-
-            d[f"{dep_type}_depends"] = "".join(deps)
+                        assert lower_name not in package_list
+                        package_dicts.update({lower_name: {"inputs": inputs_dict}})
+                        package_list.append(lower_name)
 
     if no_comments:
         global CRAN_BUILD_SH_SOURCE, CRAN_META
@@ -1609,7 +1762,9 @@ def skeletonize(
         elif update_policy == "skip-up-to-date":
             if cran_index is None:
                 session = get_session(output_dir)
-                cran_index = get_cran_index(cran_url, session)
+                cran_index = get_cran_index(
+                    cran_url, session, cache_dir=join(output_dir, ".web_cache")
+                )
             if up_to_date(cran_index, d["inputs"]["old-metadata"]):
                 continue
         elif update_policy == "skip-existing" and d["inputs"]["old-metadata"]:
@@ -1630,7 +1785,7 @@ def skeletonize(
             f.write(clear_whitespace(CRAN_META.format(**d)))
         if not exists(join(dir_path, "build.sh")) or update_policy == "overwrite":
             with open(join(dir_path, "build.sh"), "wb") as f:
-                if from_sources == _all:
+                if from_sources == ALL_PLATFORMS:
                     f.write(CRAN_BUILD_SH_SOURCE.format(**d).encode("utf-8"))
                 elif from_sources == []:
                     f.write(CRAN_BUILD_SH_BINARY.format(**d).encode("utf-8"))
@@ -7,20 +7,25 @@ Tools for converting PyPI packages to conda recipes.
 from __future__ import annotations
 
 import configparser
+import hashlib
+import json
 import keyword
 import logging
 import os
 import re
 import subprocess
 import sys
+import threading
 from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
-from os import chdir, getcwd, listdir, makedirs
+from os import listdir, makedirs
 from os.path import abspath, exists, isdir, isfile, join
 from shutil import copy2
-from tempfile import mkdtemp
+from tempfile import TemporaryDirectory, mkdtemp
 from typing import TYPE_CHECKING
 from urllib.parse import urljoin, urlsplit
+from urllib.request import url2pathname
 
 import pkginfo
 import requests
@@ -31,6 +36,7 @@ from conda.gateways.connection.download import download
 from conda.gateways.disk.read import compute_sum
 from conda.models.version import normalized_version
 from conda.utils import human_bytes
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from requests.packages.urllib3.util.url import parse_url
 
 from ..config import Config
@@ -121,7 +127,7 @@ DISTUTILS_PATCH = '''\
 diff core.py core.py
 --- core.py
 +++ core.py
-@@ -166,5 +167,42 @@ def setup (**attrs):
+@@ -166,5 +167,43 @@ def setup (**attrs):
  \n
 +# ====== BEGIN CONDA SKELETON PYPI PATCH ======
 +
@@ -153,7 +159,8 @@ diff core.py core.py
 +    data['name'] = kwargs.get('name', '??PACKAGE-NAME-UNKNOWN??')
 +    data['classifiers'] = kwargs.get('classifiers', None)
 +    data['version'] = kwargs.get('version', '??PACKAGE-VERSION-UNKNOWN??')
-+    with io.open(os.path.join("{}", "pkginfo.yaml"), 'w', encoding='utf-8') as fn:
++    pkginfo_dir = os.environ.get("CONDA_SKELETON_PKGINFO_DIR", "{}")
++    with io.open(os.path.join(pkginfo_dir, "pkginfo.yaml"), 'w', encoding='utf-8') as fn:
 +        _yaml = yaml.YAML(typ='safe', pure=True)
 +        _yaml.encoding = None
 +        _yaml.dump(data, fn)
@@ -185,6 +192,65 @@ def package_exists(package_name, pypi_url=None):
     return r.status_code != 404
 
 
+def _pypi_session(pool_size: int | None = None) -> requests.Session:
+    """A session whose connection pool is large enough for ``pool_size`` threads."""
+    pool_size = pool_size or DEFAULT_POOLSIZE
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.verify = not _ssl_no_verify()
+    return session
+
+
+def get_pypi_json(
+    url: str,
+    session: requests.Session | None = None,
+    cache_dir: str | None = None,
+) -> tuple[int, dict | None]:
+    """Fetch the JSON metadata at ``url``, returning the status code and the data.
+
+    Responses are cached in ``cache_dir`` and revalidated with their ETag, so unchanged
+    metadata is not downloaded again.  ``file://`` URLs (a local mirror of the JSON API)
+    are read directly.
+    """
+    if url.startswith("file:"):
+        try:
+            with open(url2pathname(urlsplit(url).path)) as f:
+                return 200, json.load(f)
+        except FileNotFoundError:
+            return 404, None
+
+    cached = None
+    cache_file = None
+    if cache_dir:
+        cache_file = join(cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    session = session or _pypi_session()
+    response = session.get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return 200, cached["data"]
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = response.json()
+    if cache_file and (etag := response.headers.get("ETag")):
+        makedirs(cache_dir, exist_ok=True)
+        tmp = f"{cache_file}.{threading.get_ident()}"
+        with open(tmp, "w") as f:
+            json.dump({"etag": etag, "data": data}, f)
+        os.replace(tmp, cache_file)
+    return 200, data
+
+
 def __print_with_indent(line, prefix="", suffix="", level=0, newline=True):
     output = ""
     if level:
@@ -275,6 +341,7 @@ def skeletonize(
     setup_options: str | Iterable[str] | None = None,
     extra_specs: str | Iterable[str] | None = None,
     pin_numpy: bool = False,
+    jobs: int | None = None,
 ) -> None:
     package_dicts = {}
 
@@ -287,118 +354,69 @@ def skeletonize(
     if not python_version:
         python_version = config.variant.get("python", context.default_python)
 
-    created_recipes = []
-    while packages:
-        package = packages.pop()
-        created_recipes.append(package)
-
-        is_url = ":" in package
-
-        if is_url:
-            package_pypi_url = ""
-        else:
-            package_pypi_url = urljoin(pypi_url, "/".join((package, "json")))
-
-        if not is_url:
-            dir_path = join(output_dir, package.lower())
-            if exists(dir_path) and not version_compare:
-                raise RuntimeError(f"directory already exists: {dir_path}")
-        d = package_dicts.setdefault(
-            package,
-            {
-                "packagename": package,
-                "run_depends": "",
-                "build_depends": "",
-                "entry_points": "",
-                "test_commands": "",
-                "tests_require": "",
-            },
-        )
-        if is_url:
-            del d["packagename"]
-
-        if is_url:
-            d["version"] = "UNKNOWN"
-            # Make sure there is always something to pass in for this
-            pypi_data = {}
-        else:
-            pypi_resp = requests.get(package_pypi_url, verify=not _ssl_no_verify())
+    # prompting for a choice only makes sense for one package at a time
+    if not noprompt:
+        jobs = 1
+    # the default of ThreadPoolExecutor, which is mostly waiting on the network here
+    jobs = jobs or min(32, (os.cpu_count() or 1) + 4)
+    session = _pypi_session(jobs)
 
-            if pypi_resp.status_code != 200:
-                sys.exit(
-                    "Request to fetch %s failed with status: %d"  # noqa: UP031
-                    % (package_pypi_url, pypi_resp.status_code)
+    created_recipes = []
+    with ThreadPoolExecutor(jobs) as executor:
+        # each round skeletonizes the packages found by the previous round concurrently
+        while packages:
+            futures = []
+            while packages:
+                package = packages.pop()
+                if package in created_recipes:
+                    continue
+                created_recipes.append(package)
+
+                is_url = ":" in package
+                if not is_url:
+                    dir_path = join(output_dir, package.lower())
+                    if exists(dir_path) and not version_compare:
+                        raise RuntimeError(f"directory already exists: {dir_path}")
+                d = package_dicts.setdefault(
+                    package,
+                    {
+                        "packagename": package,
+                        "run_depends": "",
+                        "build_depends": "",
+                        "entry_points": "",
+                        "test_commands": "",
+                        "tests_require": "",
+                    },
                 )
-
-            pypi_data = pypi_resp.json()
-
-            versions = sorted(pypi_data["releases"].keys(), key=parse_version)
-
-            if version_compare:
-                version_compare(versions)
-            if version:
-                if version not in versions:
-                    sys.exit(
-                        f"Error: Version {version} of {package} is not available on PyPI."
+                if is_url:
+                    del d["packagename"]
+
+                futures.append(
+                    executor.submit(
+                        _skeletonize_package,
+                        package,
+                        d,
+                        output_dir=output_dir,
+                        version=version,
+                        recursive=recursive,
+                        all_urls=all_urls,
+                        pypi_url=pypi_url,
+                        noprompt=noprompt,
+                        version_compare=version_compare,
+                        python_version=python_version,
+                        manual_url=manual_url,
+                        all_extras=all_extras,
+                        noarch_python=noarch_python,
+                        config=config,
+                        setup_options=setup_options,
+                        extra_specs=extra_specs,
+                        pin_numpy=pin_numpy,
+                        created_recipes=created_recipes,
+                        session=session,
                     )
-                d["version"] = version
-            else:
-                # select the most visible version from PyPI.
-                if not versions:
-                    sys.exit(f"Error: Could not find any versions of package {package}")
-                if len(versions) > 1:
-                    print(f"Warning, the following versions were found for {package}")
-                    for ver in versions:
-                        print(ver)
-                    print(f"Using {versions[-1]}")
-                    print("Use --version to specify a different version.")
-                d["version"] = versions[-1]
-
-        data, d["pypiurl"], d["filename"], d["digest"] = get_download_data(
-            pypi_data, package, d["version"], is_url, all_urls, noprompt, manual_url
-        )
-
-        d["import_tests"] = ""
-
-        # Get summary directly from the metadata returned
-        # from PyPI. summary will be pulled from package information in
-        # get_package_metadata or a default value set if it turns out that
-        # data['summary'] is empty.  Ignore description as it is too long.
-        d["summary"] = data.get("summary", "")
-        get_package_metadata(
-            package,
-            d,
-            data,
-            output_dir,
-            python_version,
-            all_extras,
-            recursive,
-            created_recipes,
-            noarch_python,
-            noprompt,
-            packages,
-            extra_specs,
-            config=config,
-            setup_options=setup_options,
-        )
-
-        # Set these *after* get_package_metadata so that the preferred hash
-        # can be calculated from the downloaded file, if necessary.
-        d["hash_type"] = d["digest"][0]
-        d["hash_value"] = d["digest"][1]
-
-        # Change requirements to use format that guarantees the numpy
-        # version will be pinned when the recipe is built and that
-        # the version is included in the build string.
-        if pin_numpy:
-            for depends in ["build_depends", "run_depends"]:
-                deps = d[depends]
-                numpy_dep = [idx for idx, dep in enumerate(deps) if "numpy" in dep]
-                if numpy_dep:
-                    # Turns out this needs to be inserted before the rest
-                    # of the numpy spec.
-                    deps.insert(numpy_dep[0], "numpy x.x")
-                    d[depends] = deps
+                )
+            for future in futures:
+                packages.extend(future.result())
 
     for package in package_dicts:
         d = package_dicts[package]
@@ -491,6 +509,118 @@ def skeletonize(
             f.write(rendered_recipe)
 
 
+def _skeletonize_package(
+    package: str,
+    d: dict,
+    output_dir: str,
+    version: str | None,
+    recursive: bool,
+    all_urls: bool,
+    pypi_url: str,
+    noprompt: bool,
+    version_compare: bool,
+    python_version: str,
+    manual_url: bool,
+    all_extras: bool,
+    noarch_python: bool,
+    config: Config,
+    setup_options: list[str],
+    extra_specs: list[str],
+    pin_numpy: bool,
+    created_recipes: list[str],
+    session: requests.Session,
+) -> list[str]:
+    """Fill in the recipe data ``d`` of ``package``, returning the dependencies still to
+    skeletonize when ``recursive``."""
+    is_url = ":" in package
+
+    if is_url:
+        d["version"] = "UNKNOWN"
+        # Make sure there is always something to pass in for this
+        pypi_data = {}
+    else:
+        package_pypi_url = urljoin(pypi_url, "/".join((package, "json")))
+        status_code, pypi_data = get_pypi_json(
+            package_pypi_url, session=session, cache_dir=config.pypi_cache
+        )
+
+        if status_code != 200:
+            sys.exit(
+                "Request to fetch %s failed with status: %d"  # noqa: UP031
+                % (package_pypi_url, status_code)
+            )
+
+        versions = sorted(pypi_data["releases"].keys(), key=parse_version)
+
+        if version_compare:
+            version_compare(versions)
+        if version:
+            if version not in versions:
+                sys.exit(
+                    f"Error: Version {version} of {package} is not available on PyPI."
+                )
+            d["version"] = version
+        else:
+            # select the most visible version from PyPI.
+            if not versions:
+                sys.exit(f"Error: Could not find any versions of package {package}")
+            if len(versions) > 1:
+                print(f"Warning, the following versions were found for {package}")
+                for ver in versions:
+                    print(ver)
+                print(f"Using {versions[-1]}")
+                print("Use --version to specify a different version.")
+            d["version"] = versions[-1]
+
+    data, d["pypiurl"], d["filename"], d["digest"] = get_download_data(
+        pypi_data, package, d["version"], is_url, all_urls, noprompt, manual_url
+    )
+
+    d["import_tests"] = ""
+
+    # Get summary directly from the metadata returned
+    # from PyPI. summary will be pulled from package information in
+    # get_package_metadata or a default value set if it turns out that
+    # data['summary'] is empty.  Ignore description as it is too long.
+    d["summary"] = data.get("summary", "")
+    new_packages = []
+    get_package_metadata(
+        package,
+        d,
+        data,
+        output_dir,
+        python_version,
+        all_extras,
+        recursive,
+        created_recipes,
+        noarch_python,
+        noprompt,
+        new_packages,
+        extra_specs,
+        config=config,
+        setup_options=setup_options,
+    )
+
+    # Set these *after* get_package_metadata so that the preferred hash
+    # can be calculated from the downloaded file, if necessary.
+    d["hash_type"] = d["digest"][0]
+    d["hash_value"] = d["digest"][1]
+
+    # Change requirements to use format that guarantees the numpy
+    # version will be pinned when the recipe is built and that
+    # the version is included in the build string.
+    if pin_numpy:
+        for depends in ["build_depends", "run_depends"]:
+            deps = d[depends]
+            numpy_dep = [idx for idx, dep in enumerate(deps) if "numpy" in dep]
+            if numpy_dep:
+                # Turns out this needs to be inserted before the rest
+                # of the numpy spec.
+                deps.insert(numpy_dep[0], "numpy x.x")
+                d[depends] = deps
+    return new_packages
+
+
 def add_parser(repos):
     """Modify repos in place, adding the PyPI option"""
     pypi = repos.add_parser(
@@ -603,6 +733,14 @@ def add_parser(repos):
         help="Extra specs for the build environment to extract the skeleton.",
     )
 
+    pypi.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of packages to skeletonize concurrently (default: one per CPU "
+        "plus four, at most 32).  Ignored with --prompt.",
+    )
+
 
 def get_download_data(
     pypi_data, package, version, is_url, all_urls, noprompt, manual_url
@@ -1324,16 +1462,92 @@ def get_pkginfo(
     return pkg_info
 
 
+# environments with a patched distutils, by the specs they were created with
+_setuppy_envs: dict[tuple[str, ...], str] = {}
+_setuppy_envs_lock = threading.Lock()
+
+
+def _setuppy_env(specs: list[str], python_version: str, config: Config) -> str:
+    """The prefix of an environment with ``specs`` and a patched distutils.
+
+    Each environment is created once per process and shared by all setup.py runs that
+    need the same specs.  The patched ``setup()`` writes pkginfo.yaml to the directory
+    in ``$CONDA_SKELETON_PKGINFO_DIR``, so runs in different directories don't collide.
+    """
+    key = tuple(specs)
+    with _setuppy_envs_lock:
+        if (prefix := _setuppy_envs.get(key)) and isdir(prefix):
+            return prefix
+
+        digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:8]
+        prefix = join(config.build_folder, f"_setuppy_env_{digest}")
+        rm_rf(prefix)
+        create_env(
+            prefix,
+            specs_or_precs=specs,
+            env="host",
+            subdir=config.host_subdir,
+            clear_cache=False,
+            config=config,
+        )
+        stdlib_dir = join(
+            prefix,
+            "Lib" if on_win else f"lib/python{python_version}",
+        )
+
+        with TemporaryDirectory() as tmp:
+            patch = join(tmp, "pypi-distutils.patch")
+            with open(patch, "wb") as f:
+                f.write(DISTUTILS_PATCH.format(os.curdir).encode("utf-8"))
+
+            # distutils deprecated in Python 3.10+, removed in Python 3.12+
+            distutils = join(stdlib_dir, "distutils")
+            if isdir(distutils):
+                if exists(join(distutils, "core.py-copy")):
+                    rm_rf(join(distutils, "core.py"))
+                    copy2(
+                        join(distutils, "core.py-copy"),
+                        join(distutils, "core.py"),
+                    )
+                    # Avoid race conditions. Invalidate the cache.
+                    rm_rf(
+                        join(
+                            distutils,
+                            "__pycache__",
+                            f"core.cpython-{sys.version_info[0]}{sys.version_info[1]}.pyc",
+                        )
+                    )
+                    rm_rf(
+                        join(
+                            distutils,
+                            "__pycache__",
+                            f"core.cpython-{sys.version_info[0]}{sys.version_info[1]}.pyo",
+                        )
+                    )
+                else:
+                    copy2(
+                        join(distutils, "core.py"),
+                        join(distutils, "core.py-copy"),
+                    )
+                apply_patch(distutils, patch, config=config)
+
+            setuptools = join(stdlib_dir, "site-packages", "setuptools", "_distutils")
+            if isdir(setuptools):
+                apply_patch(setuptools, patch, config=config)
+
+        _setuppy_envs[key] = prefix
+        return prefix
+
+
 def run_setuppy(src_dir, temp_dir, python_version, extra_specs, config, setup_options):
     """
-    Patch distutils and then run setup.py in a subprocess.
+    Run setup.py in a subprocess, in an environment with a patched distutils.
 
     :param src_dir: Directory containing the source code
     :type src_dir: str
     :param temp_dir: Temporary directory for doing for storing pkginfo.yaml
     :type temp_dir: str
     """
-    subdir = config.host_subdir
     specs = [
         f"python {python_version}*",
         "pip",
@@ -1351,59 +1565,7 @@ def run_setuppy(src_dir, temp_dir, python_version, extra_specs, config, setup_op
 
     specs.extend(extra_specs)
 
-    rm_rf(config.host_prefix)
-
-    create_env(
-        config.host_prefix,
-        specs_or_precs=specs,
-        env="host",
-        subdir=subdir,
-        clear_cache=False,
-        config=config,
-    )
-    stdlib_dir = join(
-        config.host_prefix,
-        "Lib" if on_win else f"lib/python{python_version}",
-    )
-
-    patch = join(temp_dir, "pypi-distutils.patch")
-    with open(patch, "wb") as f:
-        f.write(DISTUTILS_PATCH.format(temp_dir.replace("\\", "\\\\")).encode("utf-8"))
-
-    # distutils deprecated in Python 3.10+, removed in Python 3.12+
-    distutils = join(stdlib_dir, "distutils")
-    if isdir(distutils):
-        if exists(join(distutils, "core.py-copy")):
-            rm_rf(join(distutils, "core.py"))
-            copy2(
-                join(distutils, "core.py-copy"),
-                join(distutils, "core.py"),
-            )
-            # Avoid race conditions. Invalidate the cache.
-            rm_rf(
-                join(
-                    distutils,
-                    "__pycache__",
-                    f"core.cpython-{sys.version_info[0]}{sys.version_info[1]}.pyc",
-                )
-            )
-            rm_rf(
-                join(
-                    distutils,
-                    "__pycache__",
-                    f"core.cpython-{sys.version_info[0]}{sys.version_info[1]}.pyo",
-                )
-            )
-        else:
-            copy2(
-                join(distutils, "core.py"),
-                join(distutils, "core.py-copy"),
-            )
-        apply_patch(distutils, patch, config=config)
-
-    setuptools = join(stdlib_dir, "site-packages", "setuptools", "_distutils")
-    if isdir(setuptools):
-        apply_patch(setuptools, patch, config=config)
+    prefix = _setuppy_env(specs, python_version, config)
 
     # Save PYTHONPATH for later
     env = os.environ.copy()
@@ -1411,17 +1573,14 @@ def run_setuppy(src_dir, temp_dir, python_version, extra_specs, config, setup_op
         env["PYTHONPATH"] = str(src_dir + ":" + env["PYTHONPATH"])
     else:
         env["PYTHONPATH"] = str(src_dir)
-    cwd = getcwd()
-    chdir(src_dir)
-    cmdargs = [config.host_python, "setup.py", "install"]
+    env["CONDA_SKELETON_PKGINFO_DIR"] = temp_dir
+    cmdargs = [config.python_bin(prefix, config.host_platform), "setup.py", "install"]
     cmdargs.extend(setup_options)
     try:
-        check_call_env(cmdargs, env=env)
+        check_call_env(cmdargs, env=env, cwd=src_dir)
     except subprocess.CalledProcessError:
         print("$PYTHONPATH = {}".format(env["PYTHONPATH"]))
         sys.exit("Error: command failed: {}".format(" ".join(cmdargs)))
-    finally:
-        chdir(cwd)
 
 
 def make_entry_tests(entry_list):
@@ -5,10 +5,13 @@ from __future__ import annotations
 import argparse
 import gzip
 import hashlib
+import json
+import os
 import pickle
 import re
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
-from os import chmod, makedirs
+from os import chmod, cpu_count, makedirs
 from os.path import basename, dirname, exists, join, splitext
 from textwrap import wrap
 from typing import TYPE_CHECKING
@@ -235,6 +238,35 @@ def rpm_url_generate(url_dirname, rpm_name, version, release, platform, src_cach
     return url
 
 
+class RepoPrimary(dict):
+    """
+    Packages of a repository's primary metadata by name and then by arch, in the form
+    massage_primary() returns, along with the packages providing each capability.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # capability -> {package name: [archs]}
+        self.provides = {}
+
+    def index_provides(self):
+        self.provides = {}
+        for name, package in self.items():
+            for arch, entry in package.items():
+                for provide in entry.get("provides", ()):
+                    self.provides.setdefault(provide["name"], {}).setdefault(
+                        name, []
+                    ).append(arch)
+
+    def providers(self, capability, architectures):
+        """Names of the packages providing ``capability`` for one of ``architectures``."""
+        return [
+            name
+            for name, archs in self.provides.get(capability, {}).items()
+            if any(arch in archs for arch in architectures)
+        ]
+
+
 def find_repo_entry_and_arch(repo_primary, architectures, depend):
     dep_name = depend["name"]
     found_package_name = ""
@@ -243,17 +275,24 @@ def find_repo_entry_and_arch(repo_primary, architectures, depend):
         found_package = repo_primary[dep_name]
         found_package_name = dep_name
     except:
-        # Look through the provides of all packages.
-        for name, package in repo_primary.items():
-            for arch in architectures:
-                if arch in package:
-                    if "provides" in package[arch]:
-                        for provide in package[arch]["provides"]:
-                            if provide["name"] == dep_name:
-                                print(f"Found it in {name}")
-                                found_package = package
-                                found_package_name = name
-                                break
+        # Look through the provides of all packages, the last provider wins.
+        if isinstance(repo_primary, RepoPrimary):
+            providers = repo_primary.providers(dep_name, architectures)
+        else:
+            providers = [
+                name
+                for name, package in repo_primary.items()
+                if any(
+                    provide["name"] == dep_name
+                    for arch in architectures
+                    if arch in package
+                    for provide in package[arch].get("provides", ())
+                )
+            ]
+        if providers:
+            found_package_name = providers[-1]
+            found_package = repo_primary[found_package_name]
+            print(f"Found it in {found_package_name}")
 
     if found_package_name == "":
         print(
@@ -352,6 +391,105 @@ def get_repo_dict(repomd_url, data_type, dict_massager, cdt, src_cache):
     return dict({})
 
 
+def get_repo_primary(repomd_url, cdt, src_cache):
+    """
+    The primary metadata of the repository at ``repomd_url`` as a RepoPrimary. It is
+    parsed once per checksum of the metadata and then loaded from ``src_cache``.
+    """
+    xmlstring = urlopen(repomd_url).read()
+    # Remove the default namespace definition (xmlns="http://some/namespace")
+    xmlstring = re.sub(rb'\sxmlns="[^"]+"', b"", xmlstring, count=1)
+    repomd = ET.fromstring(xmlstring)
+    for child in repomd.findall("*[@type='primary']"):
+        open_csum = child.findall("open-checksum")[0].text
+        # the versions of requirements are expanded with the CDT's macros
+        macros = json.dumps(cdt["macros"], sort_keys=True).encode("utf-8")
+        macros_csum = hashlib.sha256(macros).hexdigest()[:8]
+        index_file = join(src_cache, f"{open_csum}.primary-{macros_csum}.p")
+        if exists(index_file):
+            with open(index_file, "rb") as f:
+                return pickle.load(f)
+
+        csum = child.findall("checksum")[0].text
+        location = child.findall("location")[0].attrib["href"]
+        xmlgz_file = dirname(dirname(repomd_url)) + "/" + location
+        cached_path, cached_csum = cache_file(
+            src_cache, xmlgz_file, None, cdt["checksummer"]
+        )
+        assert csum == cached_csum, (
+            f"Checksum for {xmlgz_file} does not match value in {repomd_url}"
+        )
+        with gzip.open(cached_path, "rb") as gz:
+            repo_primary = parse_primary(gz, cdt)
+        tmp = f"{index_file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(repo_primary, f)
+        os.replace(tmp, index_file)
+        return repo_primary
+    return RepoPrimary()
+
+
+def _local_name(tag):
+    return tag.rpartition("}")[2]
+
+
+def _children(elem):
+    children = {}
+    for child in elem:
+        children.setdefault(_local_name(child.tag), child)
+    return children
+
+
+def parse_primary(xml_file, cdt):
+    """
+    Stream the packages of a primary.xml file (or file object) into a RepoPrimary,
+    without building the whole document in memory.
+    """
+    repo_primary = RepoPrimary()
+    for _, elem in ET.iterparse(xml_file, events=("end",)):
+        if _local_name(elem.tag) != "package":
+            continue
+        package = _children(elem)
+        name = package["name"].text
+        arch = package["arch"].text
+        if arch == "src":
+            elem.clear()
+            continue
+        format = _children(package["format"])
+        description = package.get("description")
+        url = package.get("url")
+        capabilities = {}
+        for kind in ("provides", "requires"):
+            try:
+                entries = [dict(entry.attrib) for entry in format[kind]]
+                capabilities[kind] = massage_primary_requires(entries, cdt)
+            except:
+                capabilities[kind] = []
+        new_package = dict(
+            {
+                "checksum": package["checksum"].text,
+                "location": package["location"].attrib["href"],
+                "home": (url is not None and url.text) or "",
+                "source": format["sourcerpm"].text,
+                "version": dict(package["version"].attrib),
+                "summary": yaml_quote_string(package["summary"].text or ""),
+                "description": (description is not None and description.text) or "NA",
+                "license": format["license"].text,
+                "provides": capabilities["provides"],
+                "requires": capabilities["requires"],
+            }
+        )
+        if name in repo_primary:
+            if arch in repo_primary[name]:
+                print(f"WARNING: Duplicate packages exist for {name} for arch {arch}")
+            repo_primary[name][arch] = new_package
+        else:
+            repo_primary[name] = dict({arch: new_package})
+        elem.clear()
+    repo_primary.index_provides()
+    return repo_primary
+
+
 def massage_primary_requires(requires, cdt):
     for require in requires:
         require["name"] = require["name"]
@@ -494,40 +632,36 @@ def tidy_text(text, wrap_at=0):
     return stripped
 
 
-def write_conda_recipes(
+def collect_conda_recipes(
     recursive,
     repo_primary,
     package,
     architectures,
     cdt,
-    output_dir,
     override_arch,
-    src_cache,
+    recipes,
 ):
+    """
+    Resolve the entry and dependencies of ``package`` into ``recipes`` (keyed by package
+    name), along with those of its dependencies when ``recursive``. Returns the name
+    of the package that was found.
+    """
     entry, entry_name, arch = find_repo_entry_and_arch(
         repo_primary, architectures, dict({"name": package})
     )
     if not entry:
         return
+    package = entry_name
+    if package in recipes:
+        return package
     if override_arch:
         arch = architectures[0]
     else:
         arch = cdt["fname_architecture"]
-    package = entry_name
-    rpm_url = dirname(dirname(cdt["base_url"])) + "/" + entry["location"]
-    srpm_url = cdt["sbase_url"] + entry["source"]
-    _, _, _, _, _, sha256str = rpm_split_url_and_cache(rpm_url, src_cache)
-    try:
-        # We ignore the hash of source RPMs since they
-        # are not given in the source repository data.
-        _, _, _, _, _, _ = rpm_split_url_and_cache(srpm_url, src_cache)
-    except:
-        # Just pretend the binaries are sources.
-        if "allow_missing_sources" in cdt:
-            srpm_url = rpm_url
-        else:
-            raise
-    depends = [required for required in entry["requires"] if valid_depends(required)]
+    depends = [
+        copy(required) for required in entry["requires"] if valid_depends(required)
+    ]
+    recipes[package] = dict({"entry": entry, "arch": arch, "depends": depends})
 
     if package in cdt["dependency_add"]:
         for missing_dep in cdt["dependency_add"][package]:
@@ -561,17 +695,77 @@ def write_conda_recipes(
             if "epoch" in dep_entry["version"]:
                 depend["epoch"] = dep_entry["version"]["epoch"]
         if recursive:
-            depend["name"] = write_conda_recipes(
+            depend["name"] = collect_conda_recipes(
                 recursive,
                 repo_primary,
                 depend["name"],
                 architectures,
                 cdt,
-                output_dir,
                 override_arch,
-                src_cache,
+                recipes,
             )
+    return package
+
+
+def write_collected_recipes(recipes, cdt, output_dir, src_cache, jobs=None):
+    """
+    Write the recipes gathered by collect_conda_recipes(), after caching all their
+    RPMs and source RPMs concurrently.
+    """
+    urls = dict()
+    for package, recipe in recipes.items():
+        rpm_url = dirname(dirname(cdt["base_url"])) + "/" + recipe["entry"]["location"]
+        srpm_url = cdt["sbase_url"] + recipe["entry"]["source"]
+        urls[package] = rpm_url, srpm_url
+
+    makedirs(src_cache, exist_ok=True)
+    jobs = jobs or min(32, (cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(jobs) as executor:
+        # packages built from the same source RPM share it, cache each only once
+        cached = {
+            url: executor.submit(rpm_split_url_and_cache, url, src_cache)
+            for url in dict.fromkeys(url for pair in urls.values() for url in pair)
+        }
+
+    for package, recipe in recipes.items():
+        rpm_url, srpm_url = urls[package]
+        cached[rpm_url].result()
+        try:
+            # We ignore the hash of source RPMs since they
+            # are not given in the source repository data.
+            cached[srpm_url].result()
+        except:
+            # Just pretend the binaries are sources.
+            if "allow_missing_sources" in cdt:
+                srpm_url = rpm_url
+            else:
+                raise
+        write_recipe_files(
+            package, recipe, cdt, output_dir, rpm_url=rpm_url, srpm_url=srpm_url
+        )
+
 
+def write_conda_recipes(
+    recursive,
+    repo_primary,
+    package,
+    architectures,
+    cdt,
+    output_dir,
+    override_arch,
+    src_cache,
+    jobs=None,
+):
+    recipes = dict()
+    package = collect_conda_recipes(
+        recursive, repo_primary, package, architectures, cdt, override_arch, recipes
+    )
+    write_collected_recipes(recipes, cdt, output_dir, src_cache, jobs)
+    return package
+
+
+def write_recipe_files(package, recipe, cdt, output_dir, rpm_url, srpm_url):
+    entry, arch, depends = recipe["entry"], recipe["arch"], recipe["depends"]
     sn = cdt["short_name"] + "-" + arch
     dependsstr = ""
     if len(depends):
@@ -638,7 +832,6 @@ def write_conda_recipes(
     with open(buildsh, "wb") as f:
         chmod(buildsh, 0o755)
         f.write(BUILDSH.format(**d).encode("utf-8"))
-    return package
 
 
 # How do we map conda names to RPM names? The issue would be if two distros
@@ -654,6 +847,7 @@ def write_conda_recipe(
     override_arch: bool,
     dependency_add: list[str],
     config: Config | None,
+    jobs: int | None = None,
 ):
     cdt_name = distro
     bits = "32" if architecture in ("armv6", "armv7a", "i686", "i386") else "64"
@@ -698,20 +892,19 @@ def write_conda_recipe(
                 cdt["dependency_add"][as_list[0]] = as_list[1:]
 
     repomd_url = cdt["repomd_url"]
-    repo_primary = get_repo_dict(
-        repomd_url, "primary", massage_primary, cdt, config.src_cache
-    )
+    repo_primary = get_repo_primary(repomd_url, cdt, config.src_cache)
+    recipes = dict()
     for package in packages:
-        write_conda_recipes(
+        collect_conda_recipes(
             recursive,
             repo_primary,
             package,
             [architecture, "noarch"],
             cdt,
-            output_dir,
             override_arch,
-            config.src_cache,
+            recipes,
         )
+    write_collected_recipes(recipes, cdt, output_dir, config.src_cache, jobs)
 
 
 def skeletonize(
@@ -724,6 +917,7 @@ def skeletonize(
     dependency_add: str | Iterable[str] | None = None,
     config: Config | None = None,
     distro: str = default_distro,
+    jobs: int | None = None,
 ):
     dependency_add = ensure_list(dependency_add)
 
@@ -736,6 +930,7 @@ def skeletonize(
         override_arch,
         dependency_add,
         config,
+        jobs,
     )
 
 
@@ -804,3 +999,11 @@ def add_parser(repos):
         default=True,
         action="store_false",
     )
+
+    rpm.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="""Number of RPMs to download concurrently (default: one per CPU plus
+        four, at most 32).""",
+    )
@@ -23,6 +23,7 @@ from conda.utils import url_path
 
 from .exceptions import MissingDependency
 from .os_utils import external
+from .profiling import timed
 from .utils import (
     LoggingContext,
     check_call_env,
@@ -1023,6 +1024,7 @@ def apply_patch(src_dir, patch, config, git=None):
     )
 
 
+@timed("source")
 def provide(metadata):
     """
     given a recipe_dir:
@@ -23,6 +23,7 @@ import urllib.parse as urlparse
 import urllib.request as urllib
 from collections import OrderedDict, defaultdict
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from functools import cache, partial
 from glob import glob
 from io import StringIO
@@ -43,7 +44,7 @@ from os.path import (
     join,
 )
 from pathlib import Path
-from threading import Thread
+from threading import Lock, RLock, Thread
 from typing import TYPE_CHECKING, overload
 
 import conda_package_handling.api
@@ -194,6 +195,76 @@ class DummyPsutilProcess:
         return []
 
 
+class _EnvRewriter:
+    """Rewrites the values of env variables in a byte stream to $KEY (%KEY% on Windows).
+
+    Values are replaced longest first, so that longer values win over their common
+    prefixes, and only when present in the data at all.  (bytes.replace is several times
+    faster than one regex alternation of all the values.)  Data is released up to the
+    last newline fed so far, so that no value is split between two chunks; overlong lines
+    are released early, short of any value that straddles the cut.
+    """
+
+    max_pending = 1 << 16
+
+    def __init__(self, env, encoding=None):
+        encoding = encoding or getpreferredencoding()
+        replacement_t = "%{}%" if on_win else "${}"
+        # values spanning lines never matched line by line, empty ones match everywhere
+        replacements = {
+            value.encode(encoding): replacement_t.format(key).encode(encoding)
+            for key, value in env.items()
+            if value and "\n" not in value
+        }
+        self.replacements = sorted(
+            replacements.items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.max_len = max(map(len, replacements), default=1)
+        self.pending = b""
+
+    def _sub(self, data):
+        for value, replacement in self.replacements:
+            if value in data:
+                data = data.replace(value, replacement)
+        return data
+
+    def feed(self, chunk):
+        """Rewrite ``chunk`` (and whatever was held back before), returning what can be
+        written out already."""
+        data = self.pending + chunk
+        cut = data.rfind(b"\n") + 1
+        if len(data) - cut > self.max_pending:
+            # hold back enough for any value to be complete before the cut
+            cut = len(data) - self.max_len + 1
+            moved = True
+            while moved:
+                moved = False
+                for value, _ in self.replacements:
+                    start = data.find(
+                        value, max(cut - len(value) + 1, 0), cut + len(value) - 1
+                    )
+                    if 0 <= start < cut:
+                        cut = start
+                        moved = True
+        self.pending = data[cut:]
+        return self._sub(data[:cut])
+
+    def flush(self):
+        """Rewrite and return everything held back."""
+        data, self.pending = self.pending, b""
+        return self._sub(data)
+
+
+def _write_stdout_bytes(data):
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(data.decode(getpreferredencoding(), errors="replace"))
+    else:
+        sys.stdout.flush()
+        buffer.write(data)
+        buffer.flush()
+
+
 def _setup_rewrite_pipe(env):
     """Rewrite values of env variables back to $ENV in stdout
 
@@ -204,40 +275,19 @@ def _setup_rewrite_pipe(env):
 
     Returns an FD to be passed to Popen(stdout=...)
     """
-    # replacements is the env dict reversed,
-    # ordered by the length of the value so that longer replacements
-    # always occur first in case of common prefixes
-    replacements = OrderedDict()
-    for k, v in sorted(env.items(), key=lambda kv: len(kv[1]), reverse=True):
-        replacements[v] = k
-
+    rewriter = _EnvRewriter(env)
     r_fd, w_fd = os.pipe()
-    r = os.fdopen(r_fd, "rt")
-    if on_win:
-        replacement_t = "%{}%"
-    else:
-        replacement_t = "${}"
 
-    def rewriter():
-        while True:
-            try:
-                line = r.readline()
-                if not line:
-                    # reading done
-                    r.close()
-                    os.close(w_fd)
-                    return
-                for s, key in replacements.items():
-                    line = line.replace(s, replacement_t.format(key))
-                sys.stdout.write(line)
-            except UnicodeDecodeError:
-                try:
-                    txt = os.read(r, 10000)
-                    sys.stdout.write(txt or "")
-                except TypeError:
-                    pass
+    def rewrite():
+        with os.fdopen(r_fd, "rb", buffering=0) as r:
+            while chunk := r.read(1 << 16):
+                if data := rewriter.feed(chunk):
+                    _write_stdout_bytes(data)
+            if data := rewriter.flush():
+                _write_stdout_bytes(data)
+        os.close(w_fd)
 
-    t = Thread(target=rewriter)
+    t = Thread(target=rewrite)
     t.daemon = True
     t.start()
 
@@ -462,7 +512,10 @@ def get_recipe_abspath(recipe):
             if recipe.lower().endswith(CONDA_PACKAGE_EXTENSIONS):
                 import conda_package_handling.api
 
-                conda_package_handling.api.extract(recipe, recipe_dir)
+                # the recipe, tests and metadata are all in info/
+                conda_package_handling.api.extract(
+                    recipe, recipe_dir, components="info"
+                )
             else:
                 tar_xf(recipe, recipe_dir)
             # At some stage the old build system started to tar up recipes.
@@ -527,7 +580,63 @@ def try_acquire_locks(locks, timeout):
 # with each of these, we are copying less metadata.  This seems to be necessary
 #   to cope with some shared filesystems with some virtual machine setups.
 #  See https://github.com/conda/conda-build/issues/1426
+# from linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+
+def _copy_metadata(src, dst):
+    # like shutil.copy2, falling back to shutil.copy (see below)
+    try:
+        shutil.copystat(src, dst)
+    except OSError:
+        try:
+            shutil.copymode(src, dst)
+        except OSError:
+            pass
+
+
+def _clone_file(src, dst):
+    """Copy ``src`` to ``dst`` as a reflink (FICLONE) or, failing that, with
+    copy_file_range, both of which avoid moving the data through user space.
+
+    Returns (bytes copied, bytes cloned), or None when neither works here.
+    """
+    if not on_linux or os.path.isdir(dst):
+        return None
+    import fcntl
+
+    try:
+        # opening FIFOs blocks, they (and devices, sockets) are left to shutil
+        st = os.stat(src)
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        # opening dst for writing would truncate src if both are the same file
+        if os.path.lexists(dst) and os.path.samefile(src, dst):
+            return None
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                result = 0, st.st_size
+            except OSError:
+                if not hasattr(os, "copy_file_range"):
+                    return None
+                copied = 0
+                while n := os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    copied += n
+                # some file systems (procfs, FUSE) report 0 bytes before the end
+                if copied != st.st_size:
+                    return None
+                result = copied, 0
+    except OSError:
+        return None
+    _copy_metadata(src, dst)
+    return result
+
+
 def _copy_with_shell_fallback(src, dst):
+    """Copy the file ``src`` to ``dst``, returning (bytes copied, bytes cloned)."""
+    if (result := _clone_file(src, dst)) is not None:
+        return result
     is_copied = False
     for func in (shutil.copy2, shutil.copy, shutil.copyfile):
         try:
@@ -547,6 +656,7 @@ def _copy_with_shell_fallback(src, dst):
         except subprocess.CalledProcessError as e:
             if not os.path.isfile(dst):
                 raise OSError(f"Failed to copy {src} to {dst}.  Error was: {e}")
+    return os.path.getsize(dst if os.path.isfile(dst) else src), 0
 
 
 def get_prefix_replacement_paths(src, dst):
@@ -559,9 +669,20 @@ def get_prefix_replacement_paths(src, dst):
 
 
 def copy_into(
-    src, dst, timeout=900, symlinks=False, lock=None, locking=True, clobber=False
+    src,
+    dst,
+    timeout=900,
+    symlinks=False,
+    lock=None,
+    locking=True,
+    clobber=False,
+    stats=None,
 ):
-    """Copy all the files and directories in src to the directory dst"""
+    """Copy all the files and directories in src to the directory dst
+
+    Returns the number of files and the bytes copied and cloned (see merge_tree), and
+    adds them to ``stats``.
+    """
     log = get_logger(__name__)
     if symlinks and islink(src):
         try:
@@ -581,7 +702,7 @@ def copy_into(
         except:
             pass  # lchmod not available
     elif isdir(src):
-        merge_tree(
+        return merge_tree(
             src,
             dst,
             symlinks,
@@ -589,6 +710,7 @@ def copy_into(
             lock=lock,
             locking=locking,
             clobber=clobber,
+            stats=stats,
         )
 
     else:
@@ -623,11 +745,17 @@ def copy_into(
                 except OSError:
                     pass
             try:
-                _copy_with_shell_fallback(src, dst_fn)
+                copied, cloned = _copy_with_shell_fallback(src, dst_fn)
             except shutil.Error:
                 log.debug(
                     "skipping %s - already exists in %s", os.path.basename(src), dst
                 )
+                return None
+        copy_stats = {"files": 1, "bytes_copied": copied, "bytes_cloned": cloned}
+        if stats is not None:
+            for key, value in copy_stats.items():
+                stats[key] = stats.get(key, 0) + value
+        return copy_stats
 
 
 def move_with_fallback(src, dst):
@@ -644,42 +772,83 @@ def move_with_fallback(src, dst):
             )
 
 
+def _scan_tree(src, dst, symlinks=False, ignore=None):
+    """Walk ``src`` with os.scandir, returning the (src, dst) pairs of the directories,
+    files and symlinks to copy into ``dst``, and the dst paths of the top-level entries."""
+    dirs, files, links, top = [], [], [], []
+    pending = [(src, dst)]
+    while pending:
+        src_dir, dst_dir = pending.pop()
+        with os.scandir(src_dir) as it:
+            entries = list(it)
+        excl = ignore(src_dir, [entry.name for entry in entries]) if ignore else ()
+        for entry in entries:
+            # do not copy lock files
+            if entry.name in excl or entry.name == ".conda_lock":
+                continue
+            d = os.path.join(dst_dir, entry.name)
+            if src_dir == src:
+                top.append(d)
+            if symlinks and entry.is_symlink():
+                links.append((entry.path, d))
+            elif entry.is_dir():
+                dirs.append((entry.path, d))
+                pending.append((entry.path, d))
+            else:
+                files.append((entry.path, d))
+    return dirs, files, links, top
+
+
+def _copy_tree(src, dst, dirs, files, links, stats=None):
+    for s, d in [(src, dst), *dirs]:
+        if not os.path.exists(d):
+            os.makedirs(d)
+            shutil.copystat(s, d)
+
+    with ThreadPoolExecutor() as executor:
+        results = list(executor.map(_copy_with_shell_fallback, *zip(*files)))
+
+    for s, d in links:
+        if os.path.lexists(d):
+            os.remove(d)
+        os.symlink(os.readlink(s), d)
+        try:
+            st = os.lstat(s)
+            mode = stat.S_IMODE(st.st_mode)
+            os.lchmod(d, mode)
+        except:
+            pass  # lchmod not available
+
+    if stats is not None:
+        stats["files"] = stats.get("files", 0) + len(files)
+        stats["bytes_copied"] = stats.get("bytes_copied", 0) + sum(
+            copied for copied, _ in results
+        )
+        stats["bytes_cloned"] = stats.get("bytes_cloned", 0) + sum(
+            cloned for _, cloned in results
+        )
+
+
 # http://stackoverflow.com/a/22331852/1170370
-def copytree(src, dst, symlinks=False, ignore=None, dry_run=False):
+def copytree(src, dst, symlinks=False, ignore=None, dry_run=False, stats=None):
+    """Copy the tree ``src`` into ``dst``, returning the dst paths of the top-level entries.
+
+    The files are copied in parallel, as reflinks where the filesystem supports them, and
+    ``stats`` is updated with the number of files and the bytes copied and cloned.
+    """
     if not os.path.exists(dst):
         os.makedirs(dst)
         shutil.copystat(src, dst)
-    lst = os.listdir(src)
-    if ignore:
-        excl = ignore(src, lst)
-        lst = [x for x in lst if x not in excl]
-
-    # do not copy lock files
-    if ".conda_lock" in lst:
-        lst.remove(".conda_lock")
-
-    dst_lst = [os.path.join(dst, item) for item in lst]
-
-    if not dry_run:
-        for idx, item in enumerate(lst):
-            s = os.path.join(src, item)
-            d = dst_lst[idx]
-            if symlinks and os.path.islink(s):
-                if os.path.lexists(d):
-                    os.remove(d)
-                os.symlink(os.readlink(s), d)
-                try:
-                    st = os.lstat(s)
-                    mode = stat.S_IMODE(st.st_mode)
-                    os.lchmod(d, mode)
-                except:
-                    pass  # lchmod not available
-            elif os.path.isdir(s):
-                copytree(s, d, symlinks, ignore)
-            else:
-                _copy_with_shell_fallback(s, d)
+    if dry_run:
+        lst = os.listdir(src)
+        if ignore:
+            excl = ignore(src, lst)
+            lst = [x for x in lst if x not in excl]
+        return [os.path.join(dst, item) for item in lst if item != ".conda_lock"]
 
-    return dst_lst
+    dirs, files, links, top = _scan_tree(src, dst, symlinks, ignore)
+    _copy_tree(src, dst, dirs, files, links, stats)
+    return top
 
 
 def is_subdir(child, parent, strict=True):
@@ -694,14 +863,22 @@ def is_subdir(child, parent, strict=True):
 
 
 def merge_tree(
-    src, dst, symlinks=False, timeout=900, lock=None, locking=True, clobber=False
+    src,
+    dst,
+    symlinks=False,
+    timeout=900,
+    lock=None,
+    locking=True,
+    clobber=False,
+    stats=None,
 ):
     """
     Merge src into dst recursively by copying all files from src into dst.
-    Return a list of all files copied.
 
     Like copytree(src, dst), but raises an error if merging the two trees
-    would overwrite any files.
+    would overwrite any files.  Returns the number of files and the bytes copied
+    and cloned (``files``, ``bytes_copied`` and ``bytes_cloned``), which are
+    also added to ``stats``.
     """
     assert not is_subdir(dst, src, strict=False), (
         "Can't merge/copy source into subdirectory of itself.  "
@@ -710,19 +887,33 @@ def merge_tree(
         f"  dst: {dst}"
     )
 
-    new_files = copytree(src, dst, symlinks=symlinks, dry_run=True)
+    dirs, files, links, new_files = _scan_tree(src, dst, symlinks=symlinks)
     existing = [f for f in new_files if isfile(f)]
 
     if existing and not clobber:
         raise OSError(f"Can't merge {src} into {dst}: file exists: {existing[0]}")
 
+    # one lock for the whole tree, the files in it are copied without locking
     locks = []
     if locking:
         if not lock:
             lock = get_lock(src, timeout=timeout)
         locks = [lock]
+    copy_stats = {}
     with try_acquire_locks(locks, timeout):
-        copytree(src, dst, symlinks=symlinks)
+        _copy_tree(src, dst, dirs, files, links, stats=copy_stats)
+    get_logger(__name__).debug(
+        "Copied %d file(s) from %s to %s: %d bytes copied, %d bytes cloned",
+        copy_stats["files"],
+        src,
+        dst,
+        copy_stats["bytes_copied"],
+        copy_stats["bytes_cloned"],
+    )
+    if stats is not None:
+        for key, value in copy_stats.items():
+            stats[key] = stats.get(key, 0) + value
+    return copy_stats
 
 
 # purpose here is that we want *one* lock per location on disk.  It can be locked or unlocked
@@ -1157,7 +1348,91 @@ def get_skip_message(m: MetaData) -> str:
     )
 
 
+class PackageInfoReader:
+    """Reads ``info/`` files out of .conda and .tar.bz2 packages without extracting them.
+
+    Only the info component of a .conda is streamed, and the stream stops as soon as all
+    requested members have been seen or, for a .tar.bz2, at the first file after info/.
+    The files read are kept in an LRU cache keyed by the package's (path, size, mtime), so
+    a rebuilt package is read again.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._cache: OrderedDict[tuple, dict[str, bytes | None]] = OrderedDict()
+        self._lock = Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def read(
+        self, package_path: str | os.PathLike, *members: str
+    ) -> dict[str, bytes | None]:
+        """The contents of each of ``members`` (e.g. ``info/index.json``), None if absent."""
+        st = os.stat(package_path)
+        key = (os.path.abspath(package_path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._cache.get(key, {})
+        missing = [member for member in members if member not in entry]
+        if missing:
+            entry = {**entry, **self._stream(package_path, missing)}
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return {member: entry[member] for member in members}
+
+    def read_file(self, package_path: str | os.PathLike, member: str) -> bytes | None:
+        return self.read(package_path, member)[member]
+
+    @staticmethod
+    def _stream(
+        package_path: str | os.PathLike, members: Iterable[str]
+    ) -> dict[str, bytes | None]:
+        from conda_package_streaming.package_streaming import (
+            CondaComponent,
+            stream_conda_component,
+        )
+
+        found = dict.fromkeys(members)
+        wanted = set(found)
+        seen_info = False
+        stream = stream_conda_component(package_path, component=CondaComponent.info)
+        try:
+            for tar, member in stream:
+                if member.name.startswith("info/"):
+                    seen_info = True
+                elif seen_info:
+                    # a .tar.bz2 is streamed whole, but conda-build writes info/ first
+                    break
+                if member.name in wanted and member.isfile():
+                    found[member.name] = tar.extractfile(member).read()
+                    wanted.discard(member.name)
+                    if not wanted:
+                        break
+        finally:
+            stream.close()
+        return found
+
+
+package_info_reader = PackageInfoReader()
+
+
 def package_has_file(package_path, file_path, refresh_mode="modified"):
+    if file_path.startswith("info/") and str(package_path).endswith(
+        CONDA_PACKAGE_EXTENSIONS
+    ):
+        content = package_info_reader.read_file(package_path, file_path)
+        if content is None:
+            return False
+        # TODO :: Remove this text-mode load. Files are binary.
+        try:
+            return content.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        except UnicodeDecodeError:
+            return content
+
     # This version does nothing to the package cache.
     with TemporaryDirectory() as td:
         if file_path.startswith("info"):
@@ -1437,6 +1712,11 @@ def get_installed_packages(path):
     return installed
 
 
+# capture() and LoggingContext swap process-wide state (sys.stdout/stderr and logger
+#     levels), callers that may run on several threads hold this lock around them
+output_redirect_lock = RLock()
+
+
 # http://stackoverflow.com/a/10743550/1170370
 @contextlib.contextmanager
 def capture():
@@ -5,11 +5,13 @@ ending up with a configuration matrix"""
 
 from __future__ import annotations
 
+import hashlib
 import os.path
 import re
 import sys
+import threading
 from collections import OrderedDict
-from copy import copy
+from copy import copy, deepcopy
 from functools import cache
 from itertools import product
 from pathlib import Path
@@ -17,6 +19,7 @@ from typing import TYPE_CHECKING
 
 import yaml
 from conda.base.context import context
+from frozendict import deepfreeze
 
 from .utils import ensure_list, get_logger, islist, on_win, trim_empty_keys
 from .version import _parse as parse_version
@@ -137,15 +140,75 @@ def get_default_variant(config):
     return base
 
 
+# the libyaml-backed BaseLoader is much faster on large pin files; fall back to the
+#    pure-Python implementation when PyYAML was built without libyaml
+ConfigLoader = getattr(yaml, "CBaseLoader", yaml.BaseLoader)
+
+# parsed config files, keyed by (path, (mtime, size), selector namespace hash) so that a
+#    pin file shared by many recipes is read and parsed once per platform and variant
+_parsed_config_files: dict[tuple[str, tuple[int, int], str], dict] = {}
+
+# combined specs, keyed by the ordered (source, spec) pairs they were combined from
+_combined_specs: dict[tuple, dict] = {}
+
+# bound on the entries of each of the caches above
+CONFIG_CACHE_SIZE = 256
+
+
+# guards the caches above, configs are parsed and combined by concurrent renders
+_config_cache_lock = threading.Lock()
+
+
+def _cache_get(cache_dict, key):
+    with _config_cache_lock:
+        return cache_dict.get(key)
+
+
+def _cache_put(cache_dict, key, value):
+    with _config_cache_lock:
+        if key not in cache_dict and len(cache_dict) >= CONFIG_CACHE_SIZE:
+            # evict the oldest entry
+            del cache_dict[next(iter(cache_dict))]
+        cache_dict[key] = value
+
+
+def _selector_namespace_hash(namespace):
+    # modules, classes and functions are the same for every config, only plain values
+    #    (platform flags, variant values, environment variables) decide the selection
+    items = sorted(
+        (key, repr(value))
+        for key, value in namespace.items()
+        if not callable(value) and value is not os.environ
+    )
+    return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()
+
+
+def clear_config_file_cache():
+    """Forget all cached parsed config files and combined specs."""
+    with _config_cache_lock:
+        _parsed_config_files.clear()
+        _combined_specs.clear()
+
+
 def parse_config_file(path, config):
     from .metadata import get_selectors, select_lines
 
-    with open(path) as f:
-        contents = f.read()
-    contents = select_lines(contents, get_selectors(config), variants_in_place=False)
-    content = yaml.load(contents, Loader=yaml.loader.BaseLoader) or {}
-    trim_empty_keys(content)
-    return content
+    namespace = get_selectors(config)
+    stat = os.stat(path)
+    key = (
+        path,
+        (stat.st_mtime_ns, stat.st_size),
+        _selector_namespace_hash(namespace),
+    )
+    if (spec := _cache_get(_parsed_config_files, key)) is None:
+        with open(path) as f:
+            contents = f.read()
+        contents = select_lines(contents, namespace, variants_in_place=False)
+        spec = yaml.load(contents, Loader=ConfigLoader) or {}
+        trim_empty_keys(spec)
+        _cache_put(_parsed_config_files, key, spec)
+    # callers mutate the returned spec while combining, hand out a private copy
+    return deepcopy(spec)
 
 
 def validate_spec(src, spec):
@@ -249,7 +312,8 @@ def find_config_files(metadata_or_path, config):
 
     files.extend([resolve(f) for f in ensure_list(config.variant_config_files)])
 
-    return files
+    # a file listed twice is only read once, at its first position
+    return list(dict.fromkeys(files))
 
 
 def _combine_spec_dictionaries(
@@ -359,7 +423,31 @@ def combine_specs(specs, log_output=True):
     specs: list of dictionaries.  Keys are arbitrary, but correspond to variable
            names used in Jinja2 templated recipes.  Values can be either single
            values (strings or integers), or collections (lists, tuples, sets).
+
+    Results are memoized by the ordered specs, callers get a private copy.
     """
+    try:
+        key = tuple((source, deepfreeze(spec)) for source, spec in specs.items())
+        hash(key)
+    except TypeError:
+        # values that can't be frozen, combine without memoizing
+        key = None
+    if log_output:
+        # logged here rather than while combining, so that cache hits log the same
+        log = get_logger(__name__)
+        for source, spec in specs.items():
+            if spec:
+                log.info(f"Adding in variants from {source}")
+    if key is not None and (values := _cache_get(_combined_specs, key)) is not None:
+        return deepcopy(values)
+    # the combination shares values with the specs, don't let the cache alias them
+    values = deepcopy(_combine_specs(specs))
+    if key is not None:
+        _cache_put(_combined_specs, key, values)
+    return deepcopy(values)
+
+
+def _combine_specs(specs):
     extend_keys = DEFAULT_VARIANTS["extend_keys"][:]
     extend_keys.extend(
         [
@@ -374,10 +462,10 @@ def combine_specs(specs, log_output=True):
     #   below, keeping the size of related fields identical, or else the zipping makes no sense
 
     zip_keys = _combine_spec_dictionaries(
-        specs, extend_keys=extend_keys, filter_keys=["zip_keys"], log_output=log_output
+        specs, extend_keys=extend_keys, filter_keys=["zip_keys"], log_output=False
     ).get("zip_keys", [])
     values = _combine_spec_dictionaries(
-        specs, extend_keys=extend_keys, zip_keys=zip_keys, log_output=log_output
+        specs, extend_keys=extend_keys, zip_keys=zip_keys, log_output=False
     )
     return values
 
@@ -551,6 +639,24 @@ def explode_variants(spec):
     :return: Exploded specification
     :rtype: `list` of `dict`
     """
+    return list(iter_explode_variants(spec))
+
+
+def iter_explode_variants(spec, used_keys=None):
+    """
+    Generator version of :func:`explode_variants`, yielding one variant at a time.
+
+    With ``used_keys``, only the keys in it (along with their zip_keys partners) are
+    exploded.  Every other key keeps just its first value, so the product only spans
+    the dimensions that the recipe can vary over.
+
+    :param spec: Specification to explode
+    :type spec: `dict`
+    :param used_keys: Keys to explode, or None to explode all of them
+    :type used_keys: `set`, optional
+    :return: Iterator of exploded variants
+    :rtype: `Iterator` of `dict`
+    """
     zip_keys = _get_zip_keys(spec)
 
     # key/values from spec that do not explode
@@ -567,18 +673,22 @@ def explode_variants(spec):
         {zg: list(zip(*(ensure_list(spec[k]) for k in zg))) for zg in zip_keys}
     )
     trim_empty_keys(explode)
+    if used_keys is not None:
+        used_keys = set(used_keys)
+        explode = {
+            zg: values if used_keys.intersection(zg) else values[:1]
+            for zg, values in explode.items()
+        }
 
     # Cartesian Product of dict of lists
     # http://stackoverflow.com/a/5228294/1170370
     # dict.keys() and dict.values() orders are the same even prior to Python 3.6
-    variants = []
     for values in product(*explode.values()):
         variant = {k: copy(v) for k, v in passthru.items()}
         variant.update(
             {k: v for zg, zv in zip(explode, values) for k, v in zip(zg, zv)}
         )
-        variants.append(variant)
-    return variants
+        yield variant
 
 
 # temporary backport for other places in cond_build
@@ -667,15 +777,14 @@ def get_package_combined_spec(recipedir_or_metadata, config=None, variants=None)
     return combined_spec, specs
 
 
-def filter_combined_spec_to_used_keys(combined_spec, specs):
+def filter_combined_spec_to_used_keys(combined_spec, specs, used_keys=None):
     extend_keys = _get_extend_keys(combined_spec)
 
     # delete the default specs, so that they don't unnecessarily limit the matrix
     specs = specs.copy()
     del specs["internal_defaults"]
 
-    # TODO: act here?
-    combined_spec = explode_variants(combined_spec)
+    combined_spec = list(iter_explode_variants(combined_spec, used_keys))
     # seen_keys makes sure that a setting from a lower-priority spec doesn't clobber
     # the same setting that has been redefined in a higher-priority spec.
     seen_keys = set()
@@ -694,11 +803,84 @@ def filter_combined_spec_to_used_keys(combined_spec, specs):
     return combined_spec
 
 
-def get_package_variants(recipedir_or_metadata, config=None, variants=None):
+def get_package_variants(
+    recipedir_or_metadata, config=None, variants=None, prune_unused=False
+):
+    """
+    The variants of a recipe.  With ``prune_unused``, keys that the recipe can not use
+    (see :func:`find_candidate_variables_in_recipe`) are not exploded and keep only
+    their first value.
+    """
     combined_spec, specs = get_package_combined_spec(
         recipedir_or_metadata, config=config, variants=variants
     )
-    return filter_combined_spec_to_used_keys(combined_spec, specs=specs)
+    used_keys = None
+    if prune_unused:
+        recipe_dir = getattr(recipedir_or_metadata, "path", recipedir_or_metadata)
+        if os.path.isfile(recipe_dir):
+            recipe_dir = os.path.dirname(recipe_dir)
+        used_keys = find_candidate_variables_in_recipe(recipe_dir, combined_spec)
+    return filter_combined_spec_to_used_keys(
+        combined_spec, specs=specs, used_keys=used_keys
+    )
+
+
+# keys that conda-build uses whether or not a recipe mentions them
+# keys that MetaData.get_used_vars adds on its own, that come with the compilers, or
+#     that reach the build scripts as CONDA_<suffix> environment variables
+ALWAYS_USED_KEYS = {
+    "target_platform",
+    "channel_targets",
+    "CONDA_BUILD_SYSROOT",
+    *SUFFIX_MAP.values(),
+}
+
+# the files of a recipe that get_used_vars searches, besides the output scripts the
+#     recipe names
+RECIPE_FILES = ("meta.yaml", "conda.yaml", "build.sh", "bld.bat")
+OUTPUT_SCRIPT_RE = re.compile(
+    r"^[\s-]*script:\s*[\'\"]?([^\'\"#\n]*\.(?:sh|bat))\b", flags=re.MULTILINE
+)
+
+
+def find_candidate_variables_in_recipe(
+    recipe_dir: str | os.PathLike | Path,
+    variables: Iterable[str],
+) -> set[str]:
+    """
+    Variables that the recipe in ``recipe_dir`` may use, from a plain text search of its
+    meta.yaml, build scripts and output scripts.
+
+    This is a superset of what :meth:`MetaData.get_used_vars` finds after rendering:
+    a variable not mentioned in any of the files it looks at can't be used by it.  When
+    an output script can't be found (e.g. its name is templated), all variables are
+    candidates.
+    """
+
+    def read(name: str) -> str:
+        try:
+            return Path(recipe_dir, name).read_text(errors="ignore")
+        except OSError:
+            return ""
+
+    texts = [read(name) for name in RECIPE_FILES]
+    scripts = dict.fromkeys(OUTPUT_SCRIPT_RE.findall("\n".join(texts)))
+    if not all(Path(recipe_dir, script).is_file() for script in scripts):
+        return set(variables)
+    texts.extend(read(script) for script in scripts)
+    text = "\n".join(texts)
+    # requirements may spell underscores in variable names as dashes
+    dashless_text = text.replace("-", "_")
+    return {
+        var
+        for var in variables
+        if var in ALWAYS_USED_KEYS
+        or var in text
+        or var in dashless_text
+        # compilers are matched by their language, e.g. {{ compiler('c') }}
+        or re.match(r"(.*?)_(compiler|stdlib)(_version)?$", var)
+        or (var.startswith("cdt_") and "cdt(" in text)
+    }
 
 
 def get_vars(
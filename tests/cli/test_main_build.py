@@ -370,14 +370,44 @@ def test_build_skip_existing_croot(
 
 
 @pytest.mark.sanity
-def test_package_test(testing_workdir, testing_metadata):
+@pytest.mark.parametrize("jobs", ([], ["--jobs", "2"]))
+def test_package_test(testing_workdir, testing_metadata, jobs):
     """Test calling conda build -t <package file> - rather than <recipe dir>"""
     api.output_yaml(testing_metadata, "recipe/meta.yaml")
     output = api.build(testing_workdir, config=testing_metadata.config, notest=True)[0]
-    args = ["-t", output]
+    args = ["-t", *jobs, output]
     main_build.execute(args)
 
 
+@pytest.mark.parametrize("args,jobs", ((["-t"], None), (["-t", "-j", "3"], 3)))
+def test_parse_args_test_jobs(args, jobs):
+    _, parsed = main_build.parse_args([*args, "package.conda"])
+    assert parsed.jobs == jobs
+
+
+@pytest.mark.parametrize("keep_going", (True, False))
+def test_test_many_action_keep_going(
+    mocker: MockerFixture, testing_config: Config, keep_going: bool
+):
+    mocker.patch(
+        "conda_build.api.test_many",
+        return_value=iter(
+            [
+                {"package": "a.conda", "passed": False, "error": "TESTS FAILED: a"},
+                {"package": "b.conda", "passed": False, "error": "TESTS FAILED: b"},
+            ]
+        ),
+    )
+    if keep_going:
+        failed = main_build.test_many_action(
+            ["a.conda", "b.conda"], testing_config, 2, None, keep_going=True
+        )
+        assert failed == ["a.conda", "b.conda"]
+    else:
+        with pytest.raises(CondaBuildUserError, match="TESTS FAILED: a"):
+            main_build.test_many_action(["a.conda", "b.conda"], testing_config, 2, None)
+
+
 def test_activate_scripts_not_included(testing_workdir):
     recipe = os.path.join(metadata_dir, "_activate_scripts_not_included")
     args = [
@@ -158,3 +158,28 @@ def test_render_with_python_arg_CLI_reduces_subspace(capfd):
     main_render.execute(args)
     out, err = capfd.readouterr()
     assert len(out.splitlines()) == 1
+
+
+def test_render_multiple_recipes(testing_config, capfd):
+    recipes = [
+        os.path.join(metadata_dir, name) for name in ("empty_sections", "build_number")
+    ]
+    expected = sorted(
+        os.path.basename(path)
+        for recipe in recipes
+        for path in api.get_output_file_paths(recipe, config=testing_config)
+    )
+    capfd.readouterr()
+
+    assert main_render.execute([*recipes, "--output", "--jobs=2"]) == 0
+    output, error = capfd.readouterr()
+    assert sorted(os.path.basename(path) for path in output.splitlines()) == expected
+
+
+def test_render_multiple_recipes_rejects_file(tmp_path: Path) -> None:
+    recipes = [
+        os.path.join(metadata_dir, name) for name in ("empty_sections", "build_number")
+    ]
+    with pytest.raises(SystemExit):
+        main_render.execute([*recipes, "--file", str(tmp_path / "meta.yaml")])
+    assert not (tmp_path / "meta.yaml").exists()
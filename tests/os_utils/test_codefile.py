@@ -7,13 +7,22 @@ from typing import TYPE_CHECKING
 
 import pytest
 
+from conda_build.os_utils import pyldd
 from conda_build.os_utils.liefldd import codefile_class as liefldd_codefile_class
-from conda_build.os_utils.pyldd import DLLfile, EXEfile, elffile, machofile
+from conda_build.os_utils.pyldd import (
+    DLLfile,
+    EXEfile,
+    classify_files,
+    elffile,
+    machofile,
+)
 from conda_build.os_utils.pyldd import codefile_class as pyldd_codefile_class
 
 if TYPE_CHECKING:
     from typing import Callable
 
+    from pytest_mock import MockerFixture
+
 LDD = Path(__file__).parent.parent / "data" / "ldd"
 
 
@@ -41,3 +50,42 @@ def test_codefile_class(
     codefile_class: Callable,
 ):
     assert codefile_class(path) == expect
+
+
+def test_classify_files(tmp_path: Path, mocker: MockerFixture):
+    for name in ("clear.elf", "clear.macho", "jansi.dll"):
+        (tmp_path / name).write_bytes((LDD / name).read_bytes())
+    (tmp_path / "link.elf").symlink_to("clear.elf")
+    (tmp_path / "empty").touch()
+    read_magic = mocker.spy(pyldd, "_read_magic")
+
+    pyldd.clear_codefile_class_cache()
+    files = ["clear.elf", "clear.macho", "jansi.dll", "link.elf", "empty", "missing"]
+    assert classify_files(tmp_path, files) == {
+        "clear.elf": elffile,
+        "clear.macho": machofile,
+        "jansi.dll": DLLfile,
+        "link.elf": None,
+        "empty": None,
+        "missing": None,
+    }
+    assert read_magic.call_count == 2
+
+    # later lookups are served from the cache
+    assert pyldd_codefile_class(tmp_path / "clear.elf") == elffile
+    assert pyldd_codefile_class(tmp_path / "link.elf") == elffile
+    assert read_magic.call_count == 2
+
+    # until the file changes
+    (tmp_path / "clear.elf").write_bytes(b"#!/bin/sh\n")
+    assert pyldd_codefile_class(tmp_path / "clear.elf") is None
+    assert read_magic.call_count == 3
+
+
+def test_codefile_class_cache_bounded(tmp_path: Path, mocker: MockerFixture):
+    mocker.patch.object(pyldd, "CODEFILE_CLASS_CACHE_SIZE", 2)
+    pyldd.clear_codefile_class_cache()
+    for name in ("a.elf", "b.elf", "c.elf"):
+        (tmp_path / name).write_bytes((LDD / "clear.elf").read_bytes())
+        assert pyldd_codefile_class(tmp_path / name) == elffile
+    assert len(pyldd._codefile_classes) == 2
@@ -0,0 +1,67 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+from __future__ import annotations
+
+import shutil
+import struct
+from pathlib import Path
+
+from conda_build.os_utils.pyldd import (
+    DT_NEEDED,
+    codefile,
+    elfdynamic,
+    get_elf_rpath,
+    set_elf_rpath,
+)
+
+LDD = Path(__file__).parent.parent / "data" / "ldd"
+
+
+def test_get_elf_rpath():
+    assert get_elf_rpath(LDD / "clear.elf") == ["$ORIGIN/../lib"]
+    assert get_elf_rpath(LDD / "clear.macho") is None
+    assert get_elf_rpath(__file__) is None
+
+
+def test_set_elf_rpath(tmp_path: Path):
+    elf = tmp_path / "clear"
+    shutil.copy(LDD / "clear.elf", elf)
+    original = elf.read_bytes()
+
+    # longer rpaths don't fit in the dynamic string table
+    assert not set_elf_rpath(elf, "$ORIGIN/../lib:$ORIGIN/../lib64")
+    assert elf.read_bytes() == original
+
+    assert set_elf_rpath(elf, "$ORIGIN/lib")
+    assert get_elf_rpath(elf) == ["$ORIGIN/lib"]
+    assert len(elf.read_bytes()) == len(original)
+    with elf.open("rb") as f:
+        assert codefile(f).dt_needed == [
+            "libtinfow.so.6",
+            "libc.so.6",
+            "ld-linux-aarch64.so.1",
+        ]
+
+    # the space freed up above is padding now, it can't be reclaimed
+    assert not set_elf_rpath(elf, "$ORIGIN/../lib")
+    assert set_elf_rpath(elf, "$ORIGIN")
+    assert get_elf_rpath(elf) == ["$ORIGIN"]
+
+
+def test_set_elf_rpath_tail_merged(tmp_path: Path):
+    elf = tmp_path / "clear"
+    shutil.copy(LDD / "clear.elf", elf)
+    with elf.open("r+b") as f:
+        dynamic = elfdynamic(f)
+        ((_, _, val),) = dynamic.rpath_entries()
+        needed = next(offset for offset, tag, _ in dynamic.entries if tag == DT_NEEDED)
+        ehdr = dynamic.elf.ehdr
+        # turn a DT_NEEDED entry into "x$ORIGIN/../lib", which ends in the rpath string
+        f.seek(dynamic.strtab_offset + val - 1)
+        f.write(b"x")
+        f.seek(needed)
+        f.write(struct.pack(ehdr.endian + ehdr.ptr_type * 2, DT_NEEDED, val - 1))
+    original = elf.read_bytes()
+
+    assert not set_elf_rpath(elf, "$ORIGIN/lib")
+    assert elf.read_bytes() == original
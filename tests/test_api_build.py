@@ -534,11 +534,18 @@ def test_jinja_typo(testing_config):
 def test_skip_existing(testing_config, capfd, conda_build_test_recipe_envvar: str):
     # build the recipe first
     api.build(str(metadata_path / "empty_sections"), config=testing_config)
+    stats = {}
     api.build(
-        str(metadata_path / "empty_sections"), config=testing_config, skip_existing=True
+        str(metadata_path / "empty_sections"),
+        config=testing_config,
+        skip_existing=True,
+        stats=stats,
     )
     output, error = capfd.readouterr()
     assert "are already built" in output
+    assert "Skipped 1 existing package(s)" in output
+    assert stats["skip_existing"]["skipped"] == 1
+    assert stats["skip_existing"]["checks"] >= 1
 
 
 @pytest.mark.sanity
@@ -36,6 +36,20 @@ def test_api_render():
     assert argspec.defaults == (None, None, True, True, False)
 
 
+def test_api_render_many():
+    argspec = getargspec(api.render_many)
+    assert argspec.args == [
+        "recipe_paths",
+        "config",
+        "variants",
+        "workers",
+        "permit_unsatisfiable_variants",
+        "finalize",
+        "bypass_env_check",
+    ]
+    assert argspec.defaults == (None, None, None, True, True, False)
+
+
 def test_api_output_yaml():
     argspec = getargspec(api.output_yaml)
     assert argspec.args == ["metadata", "file_path", "suppress_outputs"]
@@ -81,8 +95,16 @@ def test_api_test():
         "move_broken",
         "config",
         "stats",
+        "jobs",
+        "results_file",
     ]
-    assert argspec.defaults == (True, None, None)
+    assert argspec.defaults == (True, None, None, None, None)
+
+
+def test_api_test_many():
+    argspec = getargspec(api.test_many)
+    assert argspec.args == ["packages", "move_broken", "config", "stats", "jobs"]
+    assert argspec.defaults == (True, None, None, None)
 
 
 def test_api_list_skeletons():
@@ -129,8 +151,19 @@ def test_api_convert():
         "verbose",
         "quiet",
         "dry_run",
+        "jobs",
     ]
-    assert argspec.defaults == (".", False, None, False, None, False, True, False)
+    assert argspec.defaults == (
+        ".",
+        False,
+        None,
+        False,
+        None,
+        False,
+        True,
+        False,
+        None,
+    )
 
 
 def test_api_installable():
@@ -2,10 +2,12 @@
 # SPDX-License-Identifier: BSD-3-Clause
 import csv
 import hashlib
+import io
 import json
 import os
 import tarfile
 
+import conda_package_handling.api
 import pytest
 from conda.gateways.connection.download import download
 
@@ -353,3 +355,71 @@ def test_renaming_executables(base_platform, package):
             if expected_paths_json:
                 assert package_has_file(package, "info/paths.json")
                 assert_package_paths_matches_files(package)
+
+
+def make_unix_package(directory, name):
+    """Create a minimal pure-python linux-64 package."""
+    files = {
+        f"lib/python2.7/site-packages/{name}.py": "VERSION = 1\n",
+        f"bin/{name}": f"#!/opt/anaconda1anaconda2anaconda3/bin/python\nimport {name}\n",
+    }
+    index = {
+        "name": name,
+        "version": "1.0",
+        "build": "py27_0",
+        "build_number": 0,
+        "platform": "linux",
+        "arch": "x86_64",
+        "subdir": "linux-64",
+        "depends": ["python 2.7*"],
+    }
+    paths = {
+        "paths": [{"_path": path, "path_type": "hardlink"} for path in sorted(files)],
+        "paths_version": 1,
+    }
+    files.update(
+        {
+            "info/index.json": json.dumps(index),
+            "info/files": "".join(f"{path}\n" for path in sorted(files)),
+            "info/paths.json": json.dumps(paths),
+        }
+    )
+    fn = os.path.join(directory, f"{name}-1.0-py27_0.tar.bz2")
+    with tarfile.open(fn, "w:bz2") as tar:
+        for path, content in files.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return fn
+
+
+def test_convert_many_packages(testing_workdir):
+    packages = [make_unix_package(testing_workdir, name) for name in ("foo", "bar")]
+
+    api.convert(packages, platforms=["osx-64", "linux-aarch64", "win-64"], jobs=4)
+
+    for package in packages:
+        name = os.path.basename(package).split("-")[0]
+        for platform in ("osx-64", "linux-aarch64"):
+            converted = os.path.join(platform, os.path.basename(package))
+            assert package_has_file(converted, f"lib/python2.7/site-packages/{name}.py")
+            index = json.loads(package_has_file(converted, "info/index.json"))
+            assert index["subdir"] == platform
+        converted = os.path.join("win-64", os.path.basename(package))
+        assert package_has_file(converted, f"Lib/site-packages/{name}.py")
+        assert package_has_file(converted, f"Scripts/{name}-script.py")
+        assert_package_paths_matches_files(converted)
+
+
+def test_convert_conda_package(testing_workdir):
+    package = make_unix_package(testing_workdir, "foo")
+    conda_package_handling.api.transmute(package, ".conda", out_folder=testing_workdir)
+    package = package[: -len(".tar.bz2")] + ".conda"
+
+    api.convert(package, platforms=["osx-64"])
+
+    converted = os.path.join("osx-64", os.path.basename(package))
+    assert package_has_file(converted, "lib/python2.7/site-packages/foo.py")
+    index = json.loads(package_has_file(converted, "info/index.json"))
+    assert index["subdir"] == "osx-64"
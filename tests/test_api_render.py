@@ -252,8 +252,9 @@ def test_setting_condarc_vars_with_env_var_expansion(testing_workdir, mocker):
     )[0][0]
     # this one should have gotten clobbered by the values in the recipe
     assert metadata.config.variant["python"] not in python_versions
-    # this confirms that we loaded the config file correctly
-    assert len(metadata.config.squished_variants["bzip2"]) == 2
+    # this confirms that we loaded the config file correctly, bzip2 isn't used by the
+    #    recipe so it keeps only its first value
+    assert metadata.config.squished_variants["bzip2"] == ["0.9"]
 
 
 def test_self_reference_run_exports_pin_subpackage_picks_up_version_correctly():
@@ -396,3 +397,30 @@ def test_api_render_missing_jinja2(testing_config, testing_workdir):
             bypass_env_check=True,
             trim_skip=False,
         )
+
+
+def test_api_render_many(testing_config, testing_workdir):
+    recipes = [
+        os.path.join(metadata_dir, name)
+        for name in ("empty_sections", "build_number", "entry_points")
+    ]
+    broken = os.path.join(testing_workdir, "broken")
+    os.makedirs(broken)
+    with open(os.path.join(broken, "meta.yaml"), "w") as f:
+        f.write("package: [unclosed\n")
+
+    results = dict(
+        api.render_many(
+            [*recipes, broken],
+            config=testing_config,
+            workers=2,
+            bypass_env_check=True,
+        )
+    )
+    assert set(results) == {*recipes, broken}
+    assert isinstance(results.pop(broken), BaseException)
+    for recipe, metadata_tuples in results.items():
+        expected = api.render(recipe, config=testing_config, bypass_env_check=True)
+        assert [m.dist() for m, _, _ in metadata_tuples] == [
+            m.dist() for m, _, _ in expected
+        ]
@@ -5,6 +5,8 @@ Integrative tests of the CRAN skeleton that start from
 conda_build.api.skeletonize and check the output files
 """
 
+import io
+import tarfile
 from collections.abc import Sequence
 from pathlib import Path
 
@@ -94,3 +96,33 @@ def test_cran_no_comments(tmp_path: Path, testing_config):
     build_sh_text = (tmp_path / f"r-{package.lower()}" / "build.sh").read_text()
     assert build_sh_comment not in build_sh_text
     assert build_sh_shebang in build_sh_text
+
+
+def test_cran_local_mirror(tmp_path: Path, testing_config):
+    contrib = tmp_path / "mirror" / "src" / "contrib"
+    contrib.mkdir(parents=True)
+    packages = []
+    for name, version, imports in (("abc", "1.0", "def"), ("def", "2.0", "")):
+        description = (
+            f"Package: {name}\nVersion: {version}\nLicense: MIT\n"
+            f"Imports: {imports}\nNeedsCompilation: no\n"
+        ).encode()
+        with tarfile.open(contrib / f"{name}_{version}.tar.gz", "w:gz") as tar:
+            info = tarfile.TarInfo(f"{name}/DESCRIPTION")
+            info.size = len(description)
+            tar.addfile(info, io.BytesIO(description))
+        packages.append(f"Package: {name}\nVersion: {version}\n")
+    (contrib / "PACKAGES").write_text("\n".join(packages))
+
+    output_dir = tmp_path / "recipes"
+    api.skeletonize(
+        packages="abc",
+        repo="cran",
+        output_dir=str(output_dir),
+        cran_url=str(tmp_path / "mirror"),
+        recursive=True,
+        jobs=2,
+        config=testing_config,
+    )
+    assert "r-def" in (output_dir / "r-abc" / "meta.yaml").read_text()
+    assert (output_dir / "r-def" / "meta.yaml").is_file()
@@ -4,6 +4,7 @@
 This module tests the test API.  These are high-level integration tests.
 """
 
+import json
 import os
 
 import pytest
@@ -23,6 +24,27 @@ def test_package_test(testing_config):
     api.test(outputs[0], config=metadata.config)
 
 
+def test_api_test_many(testing_config, tmp_path):
+    recipe = os.path.join(metadata_dir, "has_prefix_files")
+    metadata = api.render(recipe, config=testing_config)[0][0]
+    output = api.build(metadata, notest=True, anaconda_upload=False)[0]
+    missing = os.path.join(os.path.dirname(output), "missing-1.0-0.tar.bz2")
+    results_file = tmp_path / "results.jsonl"
+
+    assert not api.test(
+        [output, missing], config=metadata.config, jobs=2, results_file=results_file
+    )
+
+    results = {
+        result["package"]: result
+        for result in map(json.loads, results_file.read_text().splitlines())
+    }
+    assert results[output]["passed"]
+    assert not results[output]["error"]
+    assert not results[missing]["passed"]
+    assert results[missing]["error"]
+
+
 def test_package_test_without_recipe_in_package(testing_metadata):
     """Can't test packages after building if recipe is not included.  Not enough info to go on."""
     testing_metadata.config.include_recipe = False
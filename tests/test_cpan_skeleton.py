@@ -4,11 +4,17 @@
 Unit tests of the CPAN skeleton utility functions
 """
 
+import time
 from pathlib import Path
 
 import pytest
 
-from conda_build.skeletons.cpan import get_core_modules_for_this_perl_version
+from conda_build.skeletons import cpan
+from conda_build.skeletons.cpan import (
+    MetaCPANCache,
+    dists_for_modules,
+    get_core_modules_for_this_perl_version,
+)
 from conda_build.variants import get_default_variant
 
 
@@ -25,3 +31,50 @@ def test_core_modules(testing_config):
     core_modules = get_core_modules_for_this_perl_version(perl_version, str(cache_dir))
     assert "Config" in core_modules
     assert "Module::Build" not in core_modules
+
+
+def test_metacpan_cache(tmp_path: Path, mocker):
+    metacpan_cache = MetaCPANCache(str(tmp_path / "metacpan.sqlite"), max_age=60)
+    metacpan_cache.set("url:a", {"distribution": "A"})
+    metacpan_cache.set("perl-core-modules:5.32", ["Config"], expires=False)
+    assert metacpan_cache.get("url:a") == {"distribution": "A"}
+    assert metacpan_cache.get("missing", "default") == "default"
+
+    # entries are shared through the database file
+    reopened = MetaCPANCache(metacpan_cache.path, max_age=60)
+    assert reopened.get("url:a") == {"distribution": "A"}
+
+    # expired entries are ignored, entries without expiry are kept
+    mocker.patch("time.time", return_value=time.time() + 120)
+    assert reopened.get("url:a") is None
+    assert reopened.get("perl-core-modules:5.32") == ["Config"]
+    func = mocker.Mock(return_value=False)
+    assert reopened.get_or_set("url:a", func) is False
+    assert reopened.get_or_set("url:a", func) is False
+    func.assert_called_once()
+
+    reopened.purge()
+    assert reopened.get("perl-core-modules:5.32") == ["Config"]
+
+
+def test_dists_for_modules(tmp_path: Path, mocker):
+    search = mocker.patch.object(
+        cpan,
+        "search_module_distributions",
+        return_value={"Moose::Role": "Moose", "Try::Tiny": "Try-Tiny"},
+    )
+    modules = ["Config", "Moose::Role", "Try::Tiny", "Moose::Role", "Not::Found"]
+    expected = {
+        "Config": "perl",
+        "Moose::Role": "Moose",
+        "Try::Tiny": "Try-Tiny",
+    }
+
+    assert dists_for_modules("cpan", str(tmp_path), ["Config"], modules) == expected
+    search.assert_called_once_with("cpan", ["Moose::Role", "Try::Tiny", "Not::Found"])
+
+    # resolved modules are cached, only the missing one is searched for again
+    search.reset_mock()
+    search.return_value = {}
+    assert dists_for_modules("cpan", str(tmp_path), ["Config"], modules) == expected
+    search.assert_called_once_with("cpan", ["Not::Found"])
@@ -5,13 +5,17 @@ Unit tests of the CRAN skeleton utility functions
 """
 
 import os
+from pathlib import Path
 
 import pytest
 from conda.auxlib.ish import dals
 
 from conda_build.license_family import allowed_license_families
 from conda_build.skeletons.cran import (
+    get_cran_archive_versions,
+    get_cran_index,
     get_license_info,
+    parse_packages_file,
     read_description_contents,
     remove_comments,
 )
@@ -153,3 +157,38 @@ def test_remove_comments():
         """
     )
     assert remove_comments(with_comments) == without_comments
+
+
+def test_parse_packages_file():
+    packages = dals(
+        """
+        Package: A3
+        Version: 1.0.0
+        Depends: R (>= 2.15.0), xtable,
+                pbapply
+        License: GPL (>= 2)
+
+        Package: abc
+        Version: 2.2.1
+        """
+    )
+    assert parse_packages_file(packages) == {
+        "a3": ("A3", "1.0.0"),
+        "abc": ("abc", "2.2.1"),
+    }
+
+
+def test_cran_index_local_mirror(tmp_path: Path):
+    contrib = tmp_path / "src" / "contrib"
+    (contrib / "Archive" / "abc").mkdir(parents=True)
+    (contrib / "Archive" / "gone").mkdir()
+    (contrib / "Archive" / "abc" / "abc_2.0.tar.gz").touch()
+    (contrib / "PACKAGES").write_text("Package: abc\nVersion: 2.2.1\n")
+
+    cran_url = tmp_path.as_uri()
+    assert get_cran_index(cran_url, session=None) == {
+        "abc": ("abc", "2.2.1"),
+        "gone": ("gone", None),
+    }
+    assert get_cran_archive_versions(cran_url, None, "abc") == ["2.0"]
+    assert get_cran_archive_versions(cran_url, None, "missing") == []
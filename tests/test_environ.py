@@ -2,6 +2,10 @@
 # SPDX-License-Identifier: BSD-3-Clause
 import os
 
+from conda.core.prefix_data import PrefixData
+from conda.models.enums import NoarchType
+
+from conda_build import environ
 from conda_build.environ import create_env
 
 
@@ -15,3 +19,55 @@ def test_environment_creation_preserves_PATH(testing_workdir, testing_config):
         subdir=testing_config.build_subdir,
     )
     assert os.environ["PATH"] == ref_path
+
+
+def test_update_env_only_links_the_difference(testing_workdir, testing_config, mocker):
+    kwargs = dict(env="host", config=testing_config, subdir=testing_config.host_subdir)
+    create_env(testing_workdir, ["python"], **kwargs)
+    precs = environ.get_package_records(
+        f"{testing_workdir}_solve",
+        ("python", "six"),
+        "host",
+        subdir=testing_config.host_subdir,
+    )
+    execute_actions = mocker.spy(environ, "_execute_actions")
+
+    environ.update_env(testing_workdir, precs, **kwargs)
+
+    _, link_precs, unlink_precs = execute_actions.call_args.args
+    assert [prec.name for prec in link_precs] == ["six"]
+    assert not unlink_precs
+    PrefixData._cache_.clear()
+    installed = {prec.name for prec in PrefixData(testing_workdir).iter_records()}
+    assert installed == {prec.name for prec in precs}
+
+    # nothing to do the second time around
+    environ.update_env(testing_workdir, precs, **kwargs)
+    assert execute_actions.call_count == 1
+
+
+def test_update_env_relinks_noarch_python(testing_workdir, testing_config, mocker):
+    kwargs = dict(env="host", config=testing_config, subdir=testing_config.host_subdir)
+    precs = environ.get_package_records(
+        f"{testing_workdir}_solve",
+        ("python 3.11.*", "six"),
+        "host",
+        subdir=testing_config.host_subdir,
+    )
+    six = next(prec for prec in precs if prec.name == "six")
+    assert six.noarch == NoarchType.python
+    create_env(testing_workdir, precs, **kwargs)
+
+    precs = environ.get_package_records(
+        f"{testing_workdir}_solve",
+        ("python 3.12.*", f"six {six.version} {six.build}"),
+        "host",
+        subdir=testing_config.host_subdir,
+    )
+    execute_actions = mocker.spy(environ, "_execute_actions")
+    environ.update_env(testing_workdir, precs, **kwargs)
+
+    # six is kept as is, but has to move to the site-packages of the new python
+    _, link_precs, unlink_precs = execute_actions.call_args.args
+    assert {"python", "six"} <= {prec.name for prec in link_precs}
+    assert {"python", "six"} <= {prec.name for prec in unlink_precs}
@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 import pytest
 from conda.base.context import context
 
-from conda_build.index import get_build_index
+from conda_build.index import BuildIndex, get_build_index
 
 if TYPE_CHECKING:
     from conda_build.metadata import MetaData
@@ -23,3 +23,101 @@ def test_get_build_index(testing_metadata: MetaData) -> None:
         omit_defaults=True,
         channel_urls=["local", "conda-forge", "defaults"],
     )
+
+
+def test_get_build_index_refresh_local(testing_metadata: MetaData) -> None:
+    kwargs = dict(
+        subdir=context.subdir,
+        bldpkgs_dir=testing_metadata.config.bldpkgs_dir,
+        output_folder=testing_metadata.config.output_folder,
+        omit_defaults=True,
+        channel_urls=["local"],
+    )
+    index, _, _ = get_build_index(clear_cache=True, **kwargs)
+    remote = index.remote
+
+    # refreshing the local channel keeps the remote records
+    refreshed, _, _ = get_build_index(refresh_local=True, **kwargs)
+    assert refreshed is index
+    assert refreshed.remote is remote
+
+    # clearing the cache reloads everything
+    cleared, _, _ = get_build_index(clear_cache=True, **kwargs)
+    assert cleared is not index
+
+
+def test_build_index_overlay() -> None:
+    index = BuildIndex(
+        remote={"a": "remote-a", "b": "remote-b"},
+        local={"c": "local-c"},
+        local_url=None,
+        subdir=context.subdir,
+        last_channel_urls=[],
+    )
+    assert len(index) == 3
+    assert list(index) == ["c", "a", "b"]
+    assert index["a"] == "remote-a"
+    assert index["c"] == "local-c"
+    assert index.copy() == {"a": "remote-a", "b": "remote-b", "c": "local-c"}
+    assert isinstance(index.copy(), dict)
+
+
+def test_build_index_get_record() -> None:
+    from conda.models.records import PackageRecord
+
+    def record(channel: str) -> PackageRecord:
+        return PackageRecord(
+            name="pkg",
+            version="1.0",
+            build="0",
+            build_number=0,
+            channel=channel,
+            subdir="noarch",
+            fn="pkg-1.0-0.conda",
+        )
+
+    remote, local = record("conda-forge"), record("local")
+    index = BuildIndex(
+        remote={remote: remote},
+        local={local: local},
+        local_url=None,
+        subdir=context.subdir,
+        last_channel_urls=[],
+    )
+    assert index.get_record("pkg", "1.0", "0") is local
+    assert index.get_record("pkg", "1.0", "1") is None
+
+
+def test_build_index_local_layer() -> None:
+    from conda.models.records import PackageRecord
+
+    def record(channel: str, version: str) -> PackageRecord:
+        return PackageRecord(
+            name="pkg",
+            version=version,
+            build="0",
+            build_number=0,
+            channel=channel,
+            subdir="noarch",
+            fn=f"pkg-{version}-0.conda",
+        )
+
+    local_url = "file:///croot"
+    remote = record("https://conda.anaconda.org/conda-forge", "1.0")
+    stale, fresh = record(local_url, "2.0"), record(local_url, "3.0")
+    index = BuildIndex(
+        # the remote layer also has the local channel's records as of when it was loaded
+        remote={remote: remote, stale: stale},
+        local={fresh: fresh},
+        local_url=local_url,
+        subdir=context.subdir,
+        last_channel_urls=[],
+    )
+    assert list(index) == [fresh, remote]
+    assert len(index) == 2
+    assert index[remote] is remote
+    with pytest.raises(KeyError):
+        index[stale]
+    assert index.get_record("pkg", "2.0", "0") is None
+    # the merged view is only computed once
+    assert index.records is index.records
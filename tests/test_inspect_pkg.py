@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import os
+import shutil
 from pathlib import Path
 from uuid import uuid4
 
@@ -11,8 +12,15 @@ import pytest
 from conda.core.prefix_data import PrefixData
 
 from conda_build.exceptions import CondaBuildUserError
-from conda_build.inspect_pkg import inspect_linkages, inspect_objects, which_package
-from conda_build.utils import on_mac, on_win
+from conda_build.inspect_pkg import (
+    inspect_linkages,
+    inspect_objects,
+    iter_linkages,
+    linkages_to_json,
+    prefix_ownership,
+    which_package,
+)
+from conda_build.utils import on_linux, on_mac, on_win
 
 
 def test_which_package(tmp_path: Path):
@@ -295,3 +303,60 @@ def test_inspect_linkages_not_installed():
 def test_inspect_objects_not_on_mac():
     with pytest.raises(CondaBuildUserError):
         inspect_objects([])
+
+
+def write_package_record(prefix: Path, name: str, files: list[str]) -> None:
+    (prefix / "conda-meta").mkdir(exist_ok=True)
+    (prefix / "conda-meta" / f"{name}-1-0.json").write_text(
+        json.dumps(
+            {
+                "build": "0",
+                "build_number": 0,
+                "channel": f"{name}-channel",
+                "files": files,
+                "name": name,
+                "paths_data": {
+                    "paths": [
+                        {"_path": file, "path_type": "hardlink", "size_in_bytes": 0}
+                        for file in files
+                    ],
+                    "paths_version": 1,
+                },
+                "version": "1",
+            }
+        )
+    )
+
+
+def test_prefix_ownership(tmp_path: Path):
+    write_package_record(tmp_path, "packageA", ["lib/a", "lib/shared"])
+    write_package_record(tmp_path, "packageB", ["lib/b", "lib/shared"])
+    PrefixData._cache_.clear()
+
+    ownership = prefix_ownership(tmp_path)
+
+    for file in ("lib/a", "lib/b", "lib/shared"):
+        assert ownership[os.path.normcase(file)] == list(which_package(file, tmp_path))
+    assert len(ownership[os.path.normcase("lib/shared")]) == 2
+    assert os.path.normcase("lib/missing") not in ownership
+
+
+@pytest.mark.skipif(not on_linux, reason="uses an ELF test binary")
+def test_iter_linkages(tmp_path: Path):
+    (tmp_path / "bin").mkdir()
+    shutil.copy2(
+        Path(__file__).parent / "data" / "ldd" / "clear.elf", tmp_path / "bin" / "clear"
+    )
+    write_package_record(tmp_path, "clear", ["bin/clear"])
+    PrefixData._cache_.clear()
+
+    ((name, depmap),) = iter_linkages(["clear"], prefix=tmp_path)
+
+    assert name == "clear"
+    links = [link for links in depmap.values() for link in links]
+    assert links
+    assert all(binary == "bin/clear" for _, _, binary in links)
+
+    line = json.loads(linkages_to_json(name, depmap))
+    assert line["package"] == "clear"
+    assert sorted(line["linkages"]) == sorted(map(str, depmap))
@@ -12,6 +12,7 @@ from typing import TYPE_CHECKING
 
 import evalidate
 import pytest
+import yaml
 from conda import __version__ as conda_version
 from conda.base.context import context
 from packaging.version import Version
@@ -22,11 +23,14 @@ from conda_build.exceptions import CondaBuildUserError
 from conda_build.metadata import (
     FIELDS,
     OPTIONALLY_ITERABLE_FIELDS,
+    CStringifyNumbersLoader,
     MetaData,
     OSModuleSubset,
+    PyStringifyNumbersLoader,
     _hash_dependencies,
     check_bad_chrs,
     eval_selector,
+    eval_selectors,
     get_selectors,
     sanitize,
     select_lines,
@@ -212,6 +216,41 @@ def test_select_malicious(testing_config, expression, unsafe):
         )
 
 
+@pytest.mark.parametrize("unsafe", (True, False))
+def test_eval_selector_unknown_names(unsafe):
+    namespace = {"win": True, "py": 312}
+    assert eval_selector("win and foo", namespace, False, unsafe=unsafe) is False
+    assert eval_selector("win or foo", namespace, False, unsafe=unsafe) is True
+    assert eval_selector("not foo_bar", namespace, False, unsafe=unsafe) is True
+    assert eval_selector("py >= 38 and not foo", namespace, False, unsafe=unsafe)
+    # the name is only unknown as long as it isn't in the namespace
+    assert eval_selector("win and foo", {**namespace, "foo": 1}, False, unsafe=unsafe)
+
+
+def test_eval_selector_compiled_once():
+    from conda_build.metadata import _compile_selector, _compile_selector_without
+
+    _compile_selector.cache_clear()
+    _compile_selector_without.cache_clear()
+    for value in (True, False) * 5:
+        assert eval_selector("linux and arm64", {"linux": value}, False) is False
+        assert eval_selector("linux", {"linux": value}, False) is value
+    assert _compile_selector.cache_info().misses == 2
+    assert _compile_selector_without.cache_info().misses == 1
+
+
+def test_eval_selectors():
+    namespace = {"win": False, "osx": True, "py": 312}
+    assert eval_selectors(
+        ["win", "osx and py<313", "win", "unknown"], namespace, False
+    ) == {"win": False, "osx and py<313": True, "unknown": False}
+
+
+def test_select_lines_invalid_selector():
+    with pytest.raises(CondaBuildUserError, match="meta.yaml line 3"):
+        select_lines("a\nb [win]\nc [1 +]\n", {"win": True}, False)
+
+
 @pytest.mark.benchmark
 def test_select_lines_battery():
     test_foo = "test [foo]"
@@ -533,6 +572,32 @@ def test_yamlize_versions():
     assert yml == ["1.2.3", "1.2.3.4"]
 
 
+@pytest.mark.skipif(
+    CStringifyNumbersLoader is None, reason="PyYAML built without libyaml"
+)
+def test_yamlize_c_loader_matches_python_loader():
+    text = textwrap.dedent(
+        """
+        package:
+          name: foo
+          version: 1.0
+        build:
+          number: 0
+          skip: true
+        requirements:
+          run:
+            - python >=3.10
+        extra:
+          numbers: [0, 0., +1, -1.2, 1.2.3, 1e5, 0x10]
+          flags: [true, false, null, ~]
+          date: 2020-01-01
+        """
+    )
+    assert yaml.load(text, Loader=CStringifyNumbersLoader) == yaml.load(
+        text, Loader=PyStringifyNumbersLoader
+    )
+
+
 OS_ARCH: tuple[str, ...] = (
     "aarch64",
     "arm",
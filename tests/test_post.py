@@ -11,6 +11,7 @@ import pytest
 
 import conda_build.utils
 from conda_build import api, post
+from conda_build.os_utils.pyldd import get_elf_rpath
 from conda_build.utils import (
     get_site_packages,
     on_linux,
@@ -21,6 +22,8 @@ from conda_build.utils import (
 
 from .utils import add_mangling, metadata_dir, raises_after, subpackage_path
 
+LDD = Path(__file__).parent / "data" / "ldd"
+
 
 @pytest.mark.skipif(
     sys.version_info >= (3, 10),
@@ -78,6 +81,48 @@ def test_fix_shebang():
     assert (os.stat(fname).st_mode & 0o777) == 0o775
 
 
+@pytest.mark.skipif(on_win, reason="fix_shebang is not executed on win32")
+def test_fix_files(tmp_path):
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "lib").mkdir()
+    script = tmp_path / "bin" / "script"
+    script.write_text("#!/usr/bin/python\nprint('hello')\n")
+    script.chmod(0o644)
+    shell = tmp_path / "bin" / "shell"
+    shell.write_text("#!/bin/sh\necho hello\n")
+    shell.chmod(0o755)
+    data = tmp_path / "lib" / "data"
+    data.write_text("data")
+    data.chmod(0o600)
+    os.link(data, tmp_path / "linked")
+    (tmp_path / "lib" / "symlink").symlink_to("data")
+
+    changed = post.fix_files(
+        ["bin/script", "bin/shell", "lib/data", "lib/symlink"],
+        str(tmp_path),
+        build_python="/test/python",
+    )
+    assert changed == {
+        "hardlink": ["lib/data"],
+        "shebang": ["bin/script"],
+        "permissions": ["bin/script", "bin/shell", "lib/data"],
+    }
+    assert script.read_text() == f"#!{tmp_path}/bin/python\nprint('hello')\n"
+    assert shell.read_text() == "#!/bin/sh\necho hello\n"
+    assert os.stat(script).st_mode & 0o777 == 0o775
+    assert os.stat(data).st_mode & 0o777 == 0o664
+    assert os.stat(data).st_nlink == 1
+
+    # nothing left to do
+    assert post.fix_files(
+        ["bin/script", "lib/data"], str(tmp_path), build_python="/test/python"
+    ) == {
+        "hardlink": [],
+        "shebang": [],
+        "permissions": [],
+    }
+
+
 def test_postlink_script_in_output_explicit(testing_config):
     recipe = os.path.join(metadata_dir, "_post_link_in_output")
     pkg = api.build(recipe, config=testing_config, notest=True)[0]
@@ -236,3 +281,31 @@ def test_rpath_symlink(mocker, testing_config):
     )
     # Should only be called on the actual binary, not its symlinks. (once per variant)
     assert mk_relative.call_count == 2
+
+
+def test_mk_relative_linux_in_process(mocker, tmp_path):
+    elf = tmp_path / "bin" / "clear"
+    elf.parent.mkdir()
+    shutil.copy(LDD / "clear.elf", elf)
+    call = mocker.patch("conda_build.post.call")
+    check_output = mocker.spy(post, "check_output")
+
+    # the existing rpath is rewritten in-process
+    post.mk_relative_linux("bin/clear", str(tmp_path), patchelf="patchelf")
+    assert get_elf_rpath(elf) == ["$ORIGIN/../lib"]
+    call.assert_not_called()
+    check_output.assert_not_called()
+
+    # patchelf is only needed when the new rpath doesn't fit
+    post.mk_relative_linux(
+        "bin/clear", str(tmp_path), rpaths=("lib", "lib64"), patchelf="patchelf"
+    )
+    call.assert_called_once_with(
+        [
+            "patchelf",
+            "--force-rpath",
+            "--set-rpath",
+            "$ORIGIN/../lib:$ORIGIN/../lib64",
+            str(elf),
+        ]
+    )
@@ -0,0 +1,80 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+from __future__ import annotations
+
+import json
+import pstats
+from threading import Thread
+from typing import TYPE_CHECKING
+
+from conda_build.profiling import PhaseTimer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_phase_timer_summary() -> None:
+    timer = PhaseTimer()
+
+    @timer.timed("outer")
+    def outer():
+        with timer.phase("inner", package="foo"):
+            pass
+
+    outer()
+    outer()
+
+    summary = timer.summary()
+    assert summary.keys() == {"outer", "inner"}
+    assert summary["outer"]["count"] == summary["inner"]["count"] == 2
+    assert summary["outer"]["time"] >= summary["inner"]["time"]
+    assert [record["depth"] for record in timer.records] == [1, 0, 1, 0]
+
+    timer.reset()
+    assert timer.summary() == {}
+
+
+def test_phase_timer_records_failed_phases() -> None:
+    timer = PhaseTimer()
+    try:
+        with timer.phase("failing"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert timer.summary()["failing"]["count"] == 1
+
+
+def test_phase_timer_trace_events() -> None:
+    timer = PhaseTimer()
+    threads = [Thread(target=timer.timed("threaded")(lambda: None)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with timer.phase("main", package="foo"):
+        pass
+
+    events = timer.trace_events()
+    assert len(events) == 4
+    assert all(event["ph"] == "X" for event in events)
+    assert all(event["dur"] >= 0 for event in events)
+    assert [event["ts"] for event in events] == sorted(event["ts"] for event in events)
+    assert events[-1]["args"] == {"package": "foo"}
+    # must be serializable into the stats file
+    json.dumps({"traceEvents": events})
+
+
+def test_phase_timer_profile(tmp_path: Path) -> None:
+    timer = PhaseTimer()
+    timer.reset(profile=True)
+
+    def work():
+        return sum(range(100))
+
+    with timer.phase("outer"):
+        with timer.phase("inner"):
+            work()
+
+    timer.dump_profile(profile := tmp_path / "build.prof")
+    functions = {func for _, _, func in pstats.Stats(str(profile)).stats}
+    assert "work" in functions
@@ -1,5 +1,8 @@
 # Copyright (C) 2014 Anaconda, Inc
 # SPDX-License-Identifier: BSD-3-Clause
+import json
+from pathlib import Path
+
 import pytest
 from conda.auxlib.ish import dals
 
@@ -86,3 +89,32 @@ def test_print_dict():
         """  # yes, the trailing extra newline is necessary
     )
     assert _print_dict(recipe_metadata, order=recipe_order) == recipe_yaml
+
+
+def test_get_pypi_json_local_index(tmp_path: Path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "json").write_text(json.dumps({"info": {}, "releases": {}}))
+
+    url = f"{tmp_path.as_uri()}/pkg/json"
+    assert pypi.get_pypi_json(url) == (200, {"info": {}, "releases": {}})
+    assert pypi.get_pypi_json(f"{tmp_path.as_uri()}/missing/json") == (404, None)
+
+
+def test_get_pypi_json_cache(tmp_path: Path, mocker):
+    url = "https://pypi.example.com/pypi/pkg/json"
+    session = mocker.Mock()
+    session.get.return_value = mocker.Mock(
+        status_code=200, headers={"ETag": '"v1"'}, json=lambda: {"releases": {}}
+    )
+    assert pypi.get_pypi_json(url, session, cache_dir=str(tmp_path)) == (
+        200,
+        {"releases": {}},
+    )
+
+    # unchanged metadata is revalidated instead of downloaded again
+    session.get.return_value = mocker.Mock(status_code=304)
+    assert pypi.get_pypi_json(url, session, cache_dir=str(tmp_path)) == (
+        200,
+        {"releases": {}},
+    )
+    session.get.assert_called_with(url, headers={"If-None-Match": '"v1"'})
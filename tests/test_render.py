@@ -11,8 +11,11 @@ from uuid import uuid4
 import pytest
 
 from conda_build.api import get_output_file_paths
+from conda_build.exceptions import CondaBuildUserError
+from conda_build.index import BuildIndex
 from conda_build.render import (
     _simplify_to_exact_constraints,
+    execute_download_actions,
     find_pkg_dir_or_file_in_pkgs_dirs,
     get_pin_from_build,
     open_recipe,
@@ -121,6 +124,17 @@ def test_find_package(
     )
     assert package is found is None or package.samefile(found)
 
+    # packages archived on demand are cached
+    if files_only:
+        mtime = package.stat().st_mtime_ns
+        found = find_pkg_dir_or_file_in_pkgs_dirs(
+            distribution,
+            testing_metadata,
+            files_only=files_only,
+        )
+        assert package.samefile(found)
+        assert package.stat().st_mtime_ns == mtime
+
 
 def test_open_recipe(tmp_path: Path):
     path = tmp_path / "missing"
@@ -148,3 +162,27 @@ def test_render_recipe(testing_config: Config) -> None:
         assert len(recipes) == 48
     else:
         assert len(recipes) == 16
+
+
+def test_execute_download_actions_record_not_in_index(
+    testing_metadata: MetaData, mocker
+) -> None:
+    from conda.models.records import PackageRecord
+
+    prec = PackageRecord(
+        name="not-anywhere",
+        version="1.0",
+        build="0",
+        build_number=0,
+        channel="conda-forge",
+        subdir="noarch",
+        fn="not-anywhere-1.0-0.conda",
+    )
+    empty = BuildIndex({}, {}, None, testing_metadata.config.host_subdir, [])
+    mocker.patch(
+        "conda_build.render.find_pkg_dir_or_file_in_pkgs_dirs", return_value=None
+    )
+    mocker.patch("conda_build.render.get_build_index", return_value=(empty, 0, None))
+
+    with pytest.raises(CondaBuildUserError, match="not-anywhere-1.0-0"):
+        execute_download_actions(testing_metadata, [prec], "host")
@@ -0,0 +1,138 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+"""
+Unit tests of the RPM skeleton utility functions
+"""
+
+import gzip
+import hashlib
+import re
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from conda.auxlib.ish import dals
+
+from conda_build.skeletons import rpm
+from conda_build.skeletons.rpm import (
+    RepoPrimary,
+    dictify,
+    find_repo_entry_and_arch,
+    get_repo_primary,
+    massage_primary,
+    parse_primary,
+)
+
+PRIMARY_XML = dals(
+    """
+    <metadata xmlns="http://linux.duke.edu/metadata/common" xmlns:rpm="http://linux.duke.edu/metadata/rpm" packages="3">
+    <package type="rpm">
+      <name>libjpeg-turbo</name>
+      <arch>x86_64</arch>
+      <version epoch="0" ver="1.2.1" rel="3.el6_5"/>
+      <checksum type="sha256" pkgid="YES">abc123</checksum>
+      <summary>A MMX/SSE2 accelerated library for manipulating JPEG image files</summary>
+      <description>The libjpeg-turbo package contains a library of functions.</description>
+      <url>http://sourceforge.net/projects/libjpeg-turbo</url>
+      <location href="Packages/libjpeg-turbo-1.2.1-3.el6_5.x86_64.rpm"/>
+      <format>
+        <rpm:license>wxWidgets</rpm:license>
+        <rpm:sourcerpm>libjpeg-turbo-1.2.1-3.el6_5.src.rpm</rpm:sourcerpm>
+        <rpm:provides>
+          <rpm:entry name="libjpeg-turbo" flags="EQ" epoch="0" ver="1.2.1" rel="3.el6_5"/>
+          <rpm:entry name="libjpeg" flags="EQ" epoch="0" ver="6b" rel="47"/>
+        </rpm:provides>
+        <rpm:requires>
+          <rpm:entry name="libc.so.6()(64bit)"/>
+          <rpm:entry name="python" flags="GE" ver="%{pyver}"/>
+        </rpm:requires>
+      </format>
+    </package>
+    <package type="rpm">
+      <name>libjpeg-turbo-devel</name>
+      <arch>x86_64</arch>
+      <version epoch="0" ver="1.2.1" rel="3.el6_5"/>
+      <checksum type="sha256" pkgid="YES">def456</checksum>
+      <summary>Headers for the libjpeg-turbo library</summary>
+      <description/>
+      <url/>
+      <location href="Packages/libjpeg-turbo-devel-1.2.1-3.el6_5.x86_64.rpm"/>
+      <format>
+        <rpm:license>wxWidgets</rpm:license>
+        <rpm:sourcerpm>libjpeg-turbo-1.2.1-3.el6_5.src.rpm</rpm:sourcerpm>
+        <rpm:requires>
+          <rpm:entry name="libjpeg-turbo" flags="EQ" epoch="0" ver="1.2.1" rel="3.el6_5"/>
+        </rpm:requires>
+      </format>
+    </package>
+    <package type="rpm">
+      <name>libjpeg-turbo</name>
+      <arch>src</arch>
+      <version epoch="0" ver="1.2.1" rel="3.el6_5"/>
+      <checksum type="sha256" pkgid="YES">0123ab</checksum>
+      <summary>Sources</summary>
+      <location href="SPackages/libjpeg-turbo-1.2.1-3.el6_5.src.rpm"/>
+      <format/>
+    </package>
+    </metadata>
+    """
+)
+
+CDT = {"macros": {"pyver": "2.6.6"}, "checksummer": hashlib.sha256}
+
+
+def test_parse_primary(tmp_path: Path):
+    xml_file = tmp_path / "primary.xml"
+    xml_file.write_text(PRIMARY_XML)
+
+    repo_primary = parse_primary(str(xml_file), CDT)
+    assert isinstance(repo_primary, RepoPrimary)
+
+    # same result as parsing the whole document with dictify()
+    xmlstring = re.sub(r'\sxmlns="[^"]+"', "", PRIMARY_XML, count=1)
+    xmlstring = re.sub(r'\sxmlns:([a-zA-Z]*)="[^"]+"', r' xmlns:\1="\1"', xmlstring)
+    expected = massage_primary(dictify(ET.fromstring(xmlstring.encode())), None, CDT)
+    assert repo_primary == expected
+    assert repo_primary["libjpeg-turbo"]["x86_64"]["requires"][1]["ver"] == "2.6.6"
+
+    assert repo_primary.providers("libjpeg", ["x86_64", "noarch"]) == ["libjpeg-turbo"]
+    assert repo_primary.providers("libjpeg", ["i686"]) == []
+    for primary in (repo_primary, dict(repo_primary)):
+        entry, name, arch = find_repo_entry_and_arch(
+            primary, ["x86_64", "noarch"], {"name": "libjpeg"}
+        )
+        assert (name, arch) == ("libjpeg-turbo", "x86_64")
+        assert entry is repo_primary["libjpeg-turbo"]["x86_64"]
+
+
+def test_get_repo_primary(tmp_path: Path, mocker):
+    repodata = tmp_path / "repodata"
+    repodata.mkdir()
+    primary_gz = repodata / "primary.xml.gz"
+    primary_gz.write_bytes(gzip.compress(PRIMARY_XML.encode()))
+    open_csum = hashlib.sha256(PRIMARY_XML.encode()).hexdigest()
+    csum = hashlib.sha256(primary_gz.read_bytes()).hexdigest()
+    repomd = repodata / "repomd.xml"
+    repomd.write_text(
+        dals(
+            f"""
+            <repomd xmlns="http://linux.duke.edu/metadata/repo">
+              <data type="primary">
+                <checksum type="sha256">{csum}</checksum>
+                <open-checksum type="sha256">{open_csum}</open-checksum>
+                <location href="repodata/primary.xml.gz"/>
+              </data>
+            </repomd>
+            """
+        )
+    )
+    src_cache = tmp_path / "src_cache"
+
+    repo_primary = get_repo_primary(repomd.as_uri(), CDT, str(src_cache))
+    assert sorted(repo_primary) == ["libjpeg-turbo", "libjpeg-turbo-devel"]
+
+    # the parsed index is persisted for this checksum of the primary metadata
+    parse = mocker.spy(rpm, "parse_primary")
+    cached = get_repo_primary(repomd.as_uri(), CDT, str(src_cache))
+    assert cached == repo_primary
+    assert cached.provides == repo_primary.provides
+    parse.assert_not_called()
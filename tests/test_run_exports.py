@@ -0,0 +1,57 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+import json
+from pathlib import Path
+
+from conda.models.records import PackageRecord
+from conda.utils import url_path
+
+from conda_build.run_exports import RunExportsIndex
+
+
+def make_record(channel: str, build: str = "0", sha256: str = "a" * 64):
+    return PackageRecord(
+        name="pkg",
+        version="1.0",
+        build=build,
+        build_number=0,
+        channel=channel,
+        subdir="noarch",
+        fn=f"pkg-1.0-{build}.conda",
+        sha256=sha256,
+    )
+
+
+def test_run_exports_index_sidecar(tmp_path: Path):
+    (tmp_path / "noarch").mkdir()
+    (tmp_path / "noarch" / "run_exports.json").write_text(
+        json.dumps(
+            {
+                "info": {"subdir": "noarch", "version": 0},
+                "packages": {},
+                "packages.conda": {
+                    "pkg-1.0-0.conda": {"run_exports": {"weak": ["pkg >=1.0"]}}
+                },
+            }
+        )
+    )
+    index = RunExportsIndex()
+    channel = url_path(str(tmp_path))
+    assert index.get(make_record(channel)) == {"weak": ["pkg >=1.0"]}
+    assert index.get(make_record(channel, build="1")) is None
+
+
+def test_run_exports_index_persisted(tmp_path: Path):
+    record = make_record("https://example.com/channel")
+    index = RunExportsIndex(tmp_path)
+    assert index.get(record) is None
+    index.update(record, {"strong": ["pkg"]})
+    index.save()
+
+    # a new process reads the persisted index
+    index = RunExportsIndex(tmp_path)
+    assert index.get(record) == {"strong": ["pkg"]}
+    # a package rebuilt under the same name has to be read again
+    assert (
+        index.get(make_record("https://example.com/channel", sha256="b" * 64)) is None
+    )
@@ -0,0 +1,63 @@
+# Copyright (C) 2014 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+import json
+import tarfile
+from pathlib import Path
+
+import pytest
+from conda_package_handling.api import create
+
+from conda_build import tarcheck
+from conda_build.tarcheck import TarCheck, check_all, check_prefix_lengths
+
+
+@pytest.fixture(params=[".tar", ".tar.bz2", ".conda"])
+def package(request, tmp_path: Path) -> Path:
+    prefix = tmp_path / "prefix"
+    files = ["bin/script", "lib/data.bin"]
+    for file in files:
+        (prefix / file).parent.mkdir(parents=True, exist_ok=True)
+        (prefix / file).write_text(file)
+    info = prefix / "info"
+    info.mkdir()
+    (info / "files").write_text("\n".join(files) + "\n")
+    (info / "has_prefix").write_text("/opt/placeholder binary lib/data.bin\n")
+    (info / "index.json").write_text(
+        json.dumps(
+            {"name": "pkg", "version": "1.0", "build_number": 0, "subdir": "noarch"}
+        )
+    )
+    fn = "pkg-1.0-0" + request.param
+    members = ["info/files", "info/has_prefix", "info/index.json", *files]
+    if request.param == ".tar":
+        with tarfile.open(tmp_path / fn, "w") as tar:
+            for member in members:
+                tar.add(prefix / member, member)
+    else:
+        create(str(prefix), members, fn, out_folder=str(tmp_path))
+    return tmp_path / fn
+
+
+def test_tarcheck(package: Path, testing_config):
+    check_all(str(package), testing_config)
+
+    with TarCheck(str(package), testing_config) as tar:
+        assert {"bin/script", "lib/data.bin", "info/index.json"} <= tar.paths
+        assert tar.index["name"] == "pkg"
+        assert tar.prefix_length() == len("/opt/placeholder")
+
+    testing_config.prefix_length = 255
+    assert check_prefix_lengths([str(package)], testing_config) == {
+        str(package): len("/opt/placeholder")
+    }
+
+
+def test_tarcheck_reads_info_first(package: Path, testing_config, mocker):
+    stream = mocker.spy(tarcheck, "_stream_members")
+    check_all(str(package), testing_config, check_files=False)
+    assert stream.call_count == 1
+
+    with TarCheck(str(package), testing_config) as tar:
+        assert "lib/data.bin" in tar.paths
+    # only the pkg component of a .conda is read separately
+    assert stream.call_count == (3 if package.suffix == ".conda" else 2)
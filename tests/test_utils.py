@@ -1,6 +1,7 @@
 # Copyright (C) 2014 Anaconda, Inc
 # SPDX-License-Identifier: BSD-3-Clause
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -50,6 +51,16 @@ def test_merge_namespace_trees(namespace_setup):
     assert os.path.isfile(dep)
 
 
+def test_clone_file_same_file(tmp_path: Path):
+    src = tmp_path / "src"
+    src.write_text("data")
+    dst = tmp_path / "dst"
+    os.link(src, dst)
+    # cloning onto a hardlink of itself must not truncate the source
+    assert utils._clone_file(str(src), str(dst)) is None
+    assert src.read_text() == "data"
+
+
 @pytest.fixture(scope="function")
 def namespace_setup(testing_workdir: os.PathLike) -> os.PathLike:
     module = Path(testing_workdir, "namespace", "package", "module.py")
@@ -71,6 +82,62 @@ def test_disallow_merge_conflicts(namespace_setup: os.PathLike):
         )
 
 
+def test_merge_tree_stats(testing_workdir):
+    src = Path(testing_workdir, "src")
+    Path(src, "sub", "subsub").mkdir(parents=True)
+    Path(src, "sub", "subsub", "data").write_bytes(b"x" * 1000)
+    Path(src, "top").write_text("top")
+    Path(src, "link").symlink_to("top")
+    Path(src, ".conda_lock").touch()
+    dst = Path(testing_workdir, "dst")
+
+    stats = {}
+    assert utils.merge_tree(str(src), str(dst), symlinks=True, stats=stats) == stats
+
+    assert stats["files"] == 2
+    assert stats["bytes_copied"] + stats["bytes_cloned"] == 1003
+    assert Path(dst, "sub", "subsub", "data").read_bytes() == b"x" * 1000
+    assert Path(dst, "top").read_text() == "top"
+    assert os.readlink(Path(dst, "link")) == "top"
+    assert not Path(dst, ".conda_lock").exists()
+
+    with pytest.raises(IOError):
+        utils.merge_tree(str(src), str(dst))
+    utils.merge_tree(str(src), str(dst), symlinks=True, clobber=True)
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="no FIFOs on this platform")
+def test_merge_tree_special_files(testing_workdir):
+    import stat
+
+    src = Path(testing_workdir, "src")
+    src.mkdir()
+    Path(src, "data").write_text("data")
+    os.mkfifo(Path(src, "fifo"))
+    dst = Path(testing_workdir, "dst")
+
+    # reading the FIFO would block, it is copied as a FIFO instead
+    copy_stats = utils.merge_tree(str(src), str(dst))
+    assert copy_stats["files"] == 2
+    assert copy_stats["bytes_copied"] + copy_stats["bytes_cloned"] == 4
+    assert stat.S_ISFIFO(os.lstat(Path(dst, "fifo")).st_mode)
+    assert Path(dst, "data").read_text() == "data"
+
+
+def test_copytree_ignore(testing_workdir):
+    src = Path(testing_workdir, "src")
+    Path(src, "keep").mkdir(parents=True)
+    Path(src, "keep", "file").touch()
+    Path(src, "keep", "file.pyc").touch()
+    Path(src, "file.pyc").touch()
+    dst = Path(testing_workdir, "dst")
+
+    top = utils.copytree(str(src), str(dst), ignore=shutil.ignore_patterns("*.pyc"))
+
+    assert top == [str(Path(dst, "keep"))]
+    assert sorted(os.listdir(Path(dst, "keep"))) == ["file"]
+
+
 @pytest.mark.sanity
 def test_is_subdir(testing_workdir):
     assert not utils.is_subdir(testing_workdir, testing_workdir)
@@ -479,3 +546,135 @@ def test_prefix_files(tmp_path: Path):
 
     paths = {str(path.relative_to(prefix)) for path in (file1, file2, file3, link1)}
     assert paths == utils.prefix_files(str(prefix))
+
+
+REWRITE_ENV = {
+    "PREFIX": "/opt/conda-bld/pkg/_h_env",
+    "PLACEHOLDER": "/opt/conda-bld/pkg/_h_env_placehold",
+    "SRC_DIR": "/opt/conda-bld/pkg/work",
+    "EMPTY": "",
+}
+REWRITE_OUTPUT = (
+    b"cc -I/opt/conda-bld/pkg/_h_env/include /opt/conda-bld/pkg/work/main.c "
+    b"-o /opt/conda-bld/pkg/_h_env_placehold/bin/main\n"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 1 << 16])
+def test_env_rewriter(chunk_size: int):
+    rewriter = utils._EnvRewriter(REWRITE_ENV)
+    rewriter.max_pending = 50
+    data = REWRITE_OUTPUT * 100 + b"unterminated /opt/conda-bld/pkg/work"
+    rewritten = b"".join(
+        rewriter.feed(data[i : i + chunk_size]) for i in range(0, len(data), chunk_size)
+    )
+    rewritten += rewriter.flush()
+    sep = "%" if utils.on_win else "$"
+    prefix, placeholder, src_dir = (
+        f"{sep}{key}{'%' if utils.on_win else ''}".encode()
+        for key in ("PREFIX", "PLACEHOLDER", "SRC_DIR")
+    )
+    assert (
+        rewritten
+        == (
+            b"cc -I" + prefix + b"/include " + src_dir + b"/main.c "
+            b"-o " + placeholder + b"/bin/main\n"
+        )
+        * 100
+        + b"unterminated "
+        + src_dir
+    )
+
+
+@pytest.mark.benchmark
+def test_env_rewriter_benchmark():
+    env = {**os.environ, **REWRITE_ENV}
+    rewriter = utils._EnvRewriter(env)
+    data = REWRITE_OUTPUT * 100_000
+    chunk_size = 1 << 16
+    for i in range(0, len(data), chunk_size):
+        rewriter.feed(data[i : i + chunk_size])
+    rewriter.flush()
+
+
+@pytest.mark.parametrize("ext", [".tar.bz2", ".conda"])
+def test_package_info_reader(tmp_path: Path, mocker, ext: str):
+    from conda_package_handling.api import create
+
+    prefix = tmp_path / "prefix"
+    (prefix / "info").mkdir(parents=True)
+    (prefix / "info" / "index.json").write_text('{"name": "pkg"}')
+    (prefix / "info" / "run_exports.json").write_text('{"weak": ["pkg"]}')
+    (prefix / "lib").mkdir()
+    (prefix / "lib" / "data").write_text("data")
+    create(
+        str(prefix),
+        ["info/index.json", "info/run_exports.json", "lib/data"],
+        "pkg-1.0-0" + ext,
+        out_folder=str(tmp_path),
+    )
+    package = tmp_path / f"pkg-1.0-0{ext}"
+
+    reader = utils.PackageInfoReader()
+    stream = mocker.spy(reader, "_stream")
+    assert reader.read(package, "info/index.json", "info/run_exports") == {
+        "info/index.json": b'{"name": "pkg"}',
+        "info/run_exports": None,
+    }
+    assert reader.read_file(package, "info/index.json") == b'{"name": "pkg"}'
+    assert stream.call_count == 1
+    assert reader.read_file(package, "info/run_exports.json") == b'{"weak": ["pkg"]}'
+    assert stream.call_count == 2
+
+    assert utils.package_has_file(package, "info/index.json") == '{"name": "pkg"}'
+    assert not utils.package_has_file(package, "info/missing")
+
+
+def test_package_info_reader_stops_after_info(tmp_path: Path, mocker):
+    from conda_package_handling.api import create
+    from conda_package_streaming import package_streaming
+
+    prefix = tmp_path / "prefix"
+    (prefix / "info").mkdir(parents=True)
+    (prefix / "info" / "index.json").write_text('{"name": "pkg"}')
+    (prefix / "lib").mkdir()
+    files = ["info/index.json"]
+    for i in range(10):
+        (prefix / "lib" / f"data{i}").write_text("data" * i)
+        files.append(f"lib/data{i}")
+    create(str(prefix), files, "pkg-1.0-0.tar.bz2", out_folder=str(tmp_path))
+
+    streamed = []
+    stream_conda_component = package_streaming.stream_conda_component
+
+    def _stream(*args, **kwargs):
+        for tar, member in stream_conda_component(*args, **kwargs):
+            streamed.append(member.name)
+            yield tar, member
+
+    mocker.patch.object(package_streaming, "stream_conda_component", _stream)
+    reader = utils.PackageInfoReader()
+    assert reader.read(
+        tmp_path / "pkg-1.0-0.tar.bz2", "info/index.json", "info/run_exports.json"
+    ) == {"info/index.json": b'{"name": "pkg"}', "info/run_exports.json": None}
+    # the members after info/ are not read for the missing run_exports.json
+    assert len([name for name in streamed if not name.startswith("info")]) == 1
+
+
+def test_capture_under_output_redirect_lock():
+    from concurrent.futures import ThreadPoolExecutor
+    from time import sleep
+
+    stdout, stderr = sys.stdout, sys.stderr
+
+    def _captured(delay):
+        with utils.output_redirect_lock, utils.capture() as out:
+            print("captured")
+            sleep(delay)
+        return out[0]
+
+    with ThreadPoolExecutor(4) as executor:
+        outputs = list(executor.map(_captured, (0.05, 0.01, 0.03, 0)))
+
+    assert outputs == ["captured\n"] * 4
+    assert (sys.stdout, sys.stderr) == (stdout, stderr)
@@ -5,23 +5,29 @@ import os
 import platform
 import re
 import sys
+from copy import deepcopy
 from pathlib import Path
 
 import pytest
 import yaml
-from conda.common.compat import on_mac
+from conda.common.compat import on_mac, on_win
 
 from conda_build import api, exceptions
+from conda_build.metadata import select_lines
 from conda_build.utils import ensure_list, package_has_file
 from conda_build.variants import (
+    _combine_specs,
     combine_specs,
     dict_of_lists_to_list_of_dicts,
     filter_combined_spec_to_used_keys,
+    find_candidate_variables_in_recipe,
     find_used_variables_in_batch_script,
     find_used_variables_in_shell_script,
     find_used_variables_in_text,
     get_package_variants,
     get_vars,
+    iter_explode_variants,
+    parse_config_file,
     validate_spec,
 )
 
@@ -807,6 +813,84 @@ def test_zip_key_filtering(
     assert filter_combined_spec_to_used_keys(combined_spec, specs=specs) == expected
 
 
+def test_iter_explode_variants_used_keys():
+    spec = {
+        "python": ["3.11", "3.12"],
+        "numpy": ["1.26", "2.0"],
+        "zip_keys": [["python", "numpy"]],
+        "openssl": ["1.1", "3"],
+        "libpng": ["1.6"],
+        "unused": ["a", "b", "c"],
+    }
+
+    variants = iter_explode_variants(spec, used_keys={"numpy", "openssl"})
+    assert not isinstance(variants, list)
+    variants = list(variants)
+    assert len(variants) == 4
+    assert {(v["python"], v["numpy"]) for v in variants} == {
+        ("3.11", "1.26"),
+        ("3.12", "2.0"),
+    }
+    assert {v["openssl"] for v in variants} == {"1.1", "3"}
+    assert {v["unused"] for v in variants} == {"a"}
+    assert {v["libpng"] for v in variants} == {"1.6"}
+
+    assert len(list(iter_explode_variants(spec))) == 12
+
+
+def test_find_candidate_variables_in_recipe(tmp_path: Path):
+    (tmp_path / "meta.yaml").write_text(
+        "requirements:\n"
+        "  host:\n"
+        "    - pthread-stubs\n"
+        "    - {{ compiler('c') }}\n"
+        "    - libpng {{ libpng }}\n"
+        "outputs:\n"
+        "  - name: lib\n"
+        "    script: install-lib.sh\n"
+    )
+    (tmp_path / "build.sh").write_text("echo ${openssl}\n")
+    (tmp_path / "install-lib.sh").write_text("echo ${hdf5}\n")
+    (tmp_path / "conda_build_config.yaml").write_text("zlib:\n  - 1.3\n")
+    # files get_used_vars doesn't look at, e.g. of a recipe at the root of a project
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "configure.sh").write_text("echo ${boost}\n")
+    (tmp_path / "environment.yaml").write_text("dependencies:\n  - icu\n")
+
+    assert find_candidate_variables_in_recipe(
+        tmp_path,
+        [
+            *("libpng", "pthread_stubs", "openssl", "hdf5", "c_compiler"),
+            *("zlib", "boost", "icu", "unused"),
+        ],
+    ) == {"libpng", "pthread_stubs", "openssl", "hdf5", "c_compiler"}
+
+
+def test_find_candidate_variables_in_recipe_templated_script(tmp_path: Path):
+    (tmp_path / "meta.yaml").write_text(
+        "outputs:\n  - name: lib\n    script: build_{{ name }}.sh\n"
+    )
+    (tmp_path / "build_lib.sh").write_text("echo ${hdf5}\n")
+
+    # the script the output runs isn't known before rendering, nothing is pruned
+    variables = {"hdf5", "unused"}
+    assert find_candidate_variables_in_recipe(tmp_path, variables) == variables
+
+
+def test_get_package_variants_prune_unused(testing_config):
+    recipe = os.path.join(variants_dir, "19_used_variables")
+    variants = get_package_variants(recipe, testing_config)
+    pruned = get_package_variants(recipe, testing_config, prune_unused=True)
+
+    assert {variant["unused_var"] for variant in variants} == {"abc", "123"}
+    assert {variant["unused_var"] for variant in pruned} == {"abc"}
+    assert len(pruned) == len(variants) // 2
+    used = ("python", "some_package", "zipped_var")
+    assert {tuple(v[key] for key in used) for v in pruned} == {
+        tuple(v[key] for key in used) for v in variants
+    }
+
+
 def test_get_vars():
     variants = [
         {
@@ -1058,3 +1142,106 @@ def test_combine_specs_zip_lengths():
     )
 
     combine_specs(specs, log_output=True)
+
+
+def test_parse_config_file_cached(tmp_path: Path, testing_config) -> None:
+    config_file = tmp_path / "conda_build_config.yaml"
+    config_file.write_text(
+        "python:\n"
+        "  - 3.10\n"
+        "  - 3.11\n"
+        "pin_run_as_build:\n"
+        "  python:\n"
+        "    max_pin: x.x\n"
+        "unix_only: 1.0  # [unix]\n"
+        "win_only: 2.0  # [win]\n"
+    )
+    first = parse_config_file(config_file, testing_config)
+    assert first["python"] == ["3.10", "3.11"]
+    assert first["pin_run_as_build"] == {"python": {"max_pin": "x.x"}}
+    assert ("win_only" in first) is on_win
+    assert ("unix_only" in first) is not on_win
+
+    # cached results are handed out as independent copies
+    first["python"].append("3.12")
+    first["pin_run_as_build"]["python"]["min_pin"] = "x"
+    second = parse_config_file(config_file, testing_config)
+    assert second["python"] == ["3.10", "3.11"]
+    assert second["pin_run_as_build"] == {"python": {"max_pin": "x.x"}}
+
+    # modifying the file invalidates the cache
+    config_file.write_text("python:\n  - 3.12\n")
+    os.utime(config_file, ns=(0, 0))
+    assert parse_config_file(config_file, testing_config) == {"python": ["3.12"]}
+
+
+def test_parse_config_file_cached_per_selector_namespace(
+    tmp_path: Path, testing_config, mocker
+) -> None:
+    config_file = tmp_path / "conda_build_config.yaml"
+    config_file.write_text("unix_only: 1.0  # [unix]\nwin_only: 2.0  # [win]\n")
+    selected = mocker.patch("conda_build.metadata.select_lines", wraps=select_lines)
+
+    testing_config.host_subdir = "linux-64"
+    assert parse_config_file(config_file, testing_config) == {"unix_only": "1.0"}
+    assert parse_config_file(config_file, testing_config) == {"unix_only": "1.0"}
+    assert selected.call_count == 1
+
+    # another platform selects other lines
+    testing_config.host_subdir = "win-64"
+    assert parse_config_file(config_file, testing_config) == {"win_only": "2.0"}
+    assert selected.call_count == 2
+
+
+def test_combine_specs_memoized(mocker) -> None:
+    specs = {
+        "low_prio": {"python": ["3.11", "3.12"], "zlib": ["1.2"]},
+        "high_prio": {"zlib": ["1.3"]},
+    }
+    combine = mocker.patch("conda_build.variants._combine_specs", wraps=_combine_specs)
+
+    first = combine_specs(specs, log_output=False)
+    assert first == {"python": ["3.11", "3.12"], "zlib": ["1.3"]}
+    first["python"].append("3.13")
+
+    # equal specs reuse the combination, as a private copy
+    second = combine_specs(deepcopy(specs), log_output=False)
+    assert second == {"python": ["3.11", "3.12"], "zlib": ["1.3"]}
+    assert combine.call_count == 1
+
+    # the order of the specs matters
+    assert combine_specs(dict(reversed(specs.items())), log_output=False) == {
+        "python": ["3.11", "3.12"],
+        "zlib": ["1.2"],
+    }
+    assert combine.call_count == 2
+
+
+def test_combine_specs_memoized_logs_sources(caplog) -> None:
+    specs = {"empty": {}, "pins": {"zlib": ["1.3"]}, "recipe": {"python": ["3.12"]}}
+    for _ in range(2):
+        caplog.clear()
+        with caplog.at_level("INFO", logger="conda_build.variants"):
+            combine_specs(deepcopy(specs), log_output=True)
+        assert {record.getMessage() for record in caplog.records} == {
+            "Adding in variants from pins",
+            "Adding in variants from recipe",
+        }
+
+
+def test_config_caches_concurrent_eviction(mocker) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from conda_build import variants
+
+    mocker.patch.object(variants, "CONFIG_CACHE_SIZE", 8)
+    mocker.patch.object(variants, "_combined_specs", {})
+
+    def _combine(i):
+        return combine_specs({"spec": {"n": [str(i % 32)]}}, log_output=False)
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(_combine, range(2000)))
+
+    assert results == [{"n": [str(i % 32)]} for i in range(2000)]
+    assert len(variants._combined_specs) <= 8